@@ -1,74 +1,70 @@
+from index_proverbes import EXACT, INCONNU
+from noeuds import Display, ElseIfCondition, Avertissement
+from regles import REGLES
+
+
 class SemanticAnalyzer:
-    def __init__(self, proverbes):
+    """
+    Analyseur sémantique amélioré avec vérification des correspondances
+    entre conditions et proverbes affichés.
+
+    Attributs:
+        errors (list): Liste des erreurs sémantiques détectées
+        warnings (list): Liste des avertissements sémantiques
+        symbol_table (dict): Table des symboles (variables déclarées)
+        used_proverbs (set): Ensemble des proverbes utilisés
+        proverbes (dict): Dictionnaire des proverbes disponibles
+        index_themes (IndexThemes): Index précalculé des thèmes attendus
+        themes_attendus (dict): Règles de correspondance condition/proverbe
+    """
+
+    def __init__(self, proverbes, index_themes=None):
+        """
+        Initialise l'analyseur avec les proverbes disponibles
+
+        Args:
+            proverbes (dict): Dictionnaire des proverbes disponibles
+            index_themes (IndexThemes): Règles à appliquer (défaut: la table
+                en service, rechargée si son fichier a changé)
+        """
+        if index_themes is None:
+            index_themes = REGLES.actuelles()
         self.errors = []
         self.warnings = []
         self.symbol_table = {}
         self.used_proverbs = set()
         self.proverbes = proverbes
-        self.themes_attendus = {
-            # Conditions string avec valeurs possibles et thèmes attendus
-            "humeur": {
-                "triste": ["CONSEIL", "PATIENCE", "SOLIDARITE"],
-                "joyeuse": ["BIENETRE", "SATISFACTION", "FIERTE"],
-                "colere": ["PRUDENCE", "MODERATION", "TEMPERANCE"],
-                "peur": ["COURAGE", "DETERMINATION", "TEMERITE"]
-            },
-            "besoin": {
-                "conseil": ["CONSEIL", "SAGESSE", "EXPERIENCE"],
-                "aide": ["SOLIDARITE", "GENEROSITE", "CHARITE"],
-                "argent": ["RICHESSE", "DETTE", "SATISFACTION"],
-                "sante": ["SANTE", "BIENETRE", "PATIENCE"]
-            },
-            "situation": {
-                "difficile": ["PERSEVERANCE", "PATIENCE", "ESPOIR"],
-                "facile": ["MODERATION", "PRUDENCE", "HUMILITE"],
-                "dangereuse": ["COURAGE", "PRUDENCE", "PREVENTION"],
-                "incertaine": ["PATIENCE", "SAGESSE", "PREVOYANCE"]
-            },
-            # Conditions numériques avec seuils et thèmes attendus
-            "age": {
-                (0, 18): ["JEUNESSE", "EDUCATION", "DISCIPLINE"],
-                (19, 40): ["AMBITION", "TRAVAIL", "OPPORTUNITE"],
-                (41, 60): ["SAGESSE", "EXPERIENCE", "PRUDENCE"],
-                (61, 150): ["AGE", "PATIENCE", "SATISFACTION"]
-            },
-            "richesse": {
-                (0, 1000): ["SATISFACTION", "GENEROSITE", "TRAVAIL"],
-                (1001, 10000): ["RICHESSE", "PRUDENCE", "MODERATION"],
-                (10001, 100000): ["GENEROSITE", "CHARITE", "HONNETETE"],
-                (100001, float('inf')): ["AVARICE", "OPPORTUNISME", "HYPOCRISIE"]
-            }
-        }
-
-    def get_expected_themes(self, var, val=None):
-        """Retourne les thèmes attendus pour une variable et valeur donnée"""
-        expected = []
-
-        # Pour les variables string
-        if var in self.themes_attendus and isinstance(self.themes_attendus[var], dict):
-            if val and val in self.themes_attendus[var]:
-                expected.extend(self.themes_attendus[var][val])
-            else:
-                # Si pas de valeur spécifique, prendre tous les thèmes possibles
-                for themes in self.themes_attendus[var].values():
-                    expected.extend(themes)
-
-        # Pour les variables numériques
-        elif var in self.themes_attendus and isinstance(self.themes_attendus[var], dict):
-            if isinstance(val, (int, float)):
-                for (min_val, max_val), themes in self.themes_attendus[var].items():
-                    if min_val <= val <= max_val:
-                        expected.extend(themes)
-            else:
-                # Si pas de valeur spécifique, prendre tous les thèmes possibles
-                for themes in self.themes_attendus[var].values():
-                    expected.extend(themes)
-
-        return list(set(expected))  # Éliminer les doublons
-
-    def check_condition_proverb_match(self, var, val, proverb_theme):
-        """Vérifie la cohérence sémantique entre condition et proverbe"""
-        expected_themes = self.get_expected_themes(var, val)
+        self.index_themes = index_themes
+        self.themes_attendus = index_themes.themes_attendus
+
+    def get_expected_themes(self, var, val=None, op=None):
+        """
+        Retourne les thèmes attendus pour une variable et valeur donnée
+
+        Args:
+            var (str): Nom de la variable conditionnelle
+            val (str/int/float): Valeur de la variable (optionnel)
+            op (str): Opérateur de la condition (optionnel)
+
+        Returns:
+            frozenset: Thèmes de proverbes attendus
+        """
+        return self.index_themes.themes(var, val, op)
+
+    def check_condition_proverb_match(self, var, val, proverb_theme, op=None):
+        """
+        Vérifie la cohérence sémantique entre condition et proverbe
+
+        Args:
+            var (str): Variable de la condition
+            val (str/int/float): Valeur de la condition
+            proverb_theme (str): Thème du proverbe à afficher
+            op (str): Opérateur de la condition (optionnel)
+
+        Returns:
+            bool: True si la correspondance est valide, False sinon
+        """
+        expected_themes = self.get_expected_themes(var, val, op)
 
         if not expected_themes:
             self.warnings.append(f"Aucun thème attendu défini pour la variable '{var}'")
@@ -77,17 +73,28 @@ class SemanticAnalyzer:
         if proverb_theme not in expected_themes:
             self.errors.append(
                 f"Incohérence sémantique: le proverbe '{proverb_theme}' ({self.proverbes[proverb_theme]}) "
-                f"ne correspond pas à la condition '{var} == {val}'. "
-                f"Thèmes attendus: {', '.join(expected_themes)}"
+                f"ne correspond pas à la condition '{var} {op or '=='} {val}'. "
+                f"Thèmes attendus: {', '.join(sorted(expected_themes))}"
             )
             return False
         return True
 
     def check_condition(self, condition):
-        """Analyse sémantique d'une condition avec vérification renforcée"""
-        if len(condition) == 5:  # SI condition
-            var, op, val, actions = condition[1], condition[2], condition[3], condition[4]
+        """
+        Analyse sémantique d'une condition avec vérification renforcée
+
+        Args:
+            condition (Condition): Condition à analyser (ou ElseIfCondition)
+        """
+        var, op, val, actions = condition.var, condition.op, condition.val, condition.actions
 
+        if isinstance(condition, ElseIfCondition):  # SINON SI condition
+            if var not in self.symbol_table:
+                self.symbol_table[var] = 'number'
+            elif self.symbol_table[var] != 'number':
+                self.errors.append(f"Type incompatible pour {var} (attendu: number)")
+
+        else:  # SI condition
             # Vérification déclaration variable
             if var not in self.symbol_table:
                 self.symbol_table[var] = 'string' if op == '==' else 'number'
@@ -98,32 +105,33 @@ class SemanticAnalyzer:
             elif op == '>' and self.symbol_table.get(var) != 'number':
                 self.errors.append(f"Type incompatible pour {var} (attendu: number)")
 
-            # Vérifier les actions
-            self.check_actions(var, val, actions)
+        # Vérifier les actions
+        self.check_actions(var, val, actions, op)
 
-        else:  # SINON SI condition
-            var, op, val, actions = condition[3], condition[4], condition[5], condition[6]
+    def check_actions(self, condition_var, condition_val, actions, condition_op=None):
+        """
+        Analyse sémantique des actions avec vérification des proverbes
 
-            if var not in self.symbol_table:
-                self.symbol_table[var] = 'number'
-            elif self.symbol_table[var] != 'number':
-                self.errors.append(f"Type incompatible pour {var} (attendu: number)")
+        Seuls les proverbes reconnus exactement sont vérifiés : un proverbe
+        partiel fait déjà l'objet d'un avertissement du parser.
 
-            # Vérifier les actions
-            self.check_actions(var, val, actions)
-
-    def check_actions(self, condition_var, condition_val, actions):
-        """Analyse sémantique des actions avec vérification des proverbes"""
+        Args:
+            condition_var (str): Variable de la condition parente
+            condition_val (str/int/float): Valeur de la condition parente
+            actions (list): Nœuds Display/Avertissement à analyser
+            condition_op (str): Opérateur de la condition parente (optionnel)
+        """
         for action in actions:
-            if action[0] == 'AFFICHER':
-                if "PROVERBE INCONNU" in action[1]:
-                    self.errors.append(f"Proverbe inconnu: {action[1]}")
-                else:
-                    # Extraire le thème du proverbe vérifié
-                    parts = action[1].split(':')
-                    if len(parts) > 0:
-                        proverb_theme = parts[0].strip()
-                        if proverb_theme in self.proverbes:
-                            self.used_proverbs.add(proverb_theme)
-                            # Vérifier la cohérence sémantique
-                            self.check_condition_proverb_match(condition_var, condition_val, proverb_theme)
\ No newline at end of file
+            if not isinstance(action, Display):
+                continue
+            if action.statut == INCONNU:
+                self.errors.append(f"Proverbe inconnu: {action.verifie}")
+            elif action.statut == EXACT and action.theme in self.proverbes:
+                self.used_proverbs.add(action.theme)
+                # Vérifier la cohérence sémantique
+                self.check_condition_proverb_match(condition_var, condition_val,
+                                                   action.theme, condition_op)
+
+    def collect_warnings(self, condition):
+        """Ajoute aux avertissements ceux que le parser a placés dans les actions"""
+        self.warnings.extend(action.message for action in condition.actions if isinstance(action, Avertissement))
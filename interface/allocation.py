@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+"""
+Allocation des registres par balayage linéaire (linear scan)
+
+Chaque temporaire du code intermédiaire a un intervalle de vie [définition,
+dernière lecture] sur l'ordre des instructions (étendu jusqu'au saut
+arrière d'une boucle qu'il traverse). Les intervalles sont parcourus par
+début croissant : un temporaire reçoit un registre libre, ou, s'il n'y en a
+plus, l'intervalle actif qui finit le plus tard est placé dans un
+emplacement de la pile (Poletto et Sarkar, 1999).
+
+Les appels (printf, strcmp) écrasent eax, ecx et edx (convention cdecl) :
+un temporaire vivant pendant un appel ne peut occuper que ebx, esi ou edi.
+eax reste libre pour les calculs du générateur de code cible.
+"""
+
+import heapq
+from bisect import bisect_right
+
+from instructions import COMPARAISONS, SAUTS, Op, Temp
+
+# Registres conservés par les appels, puis registres écrasés par les appels
+REGISTRES_CONSERVES = ('ebx', 'esi', 'edi')
+REGISTRES_VOLATILS = ('ecx', 'edx')
+
+
+def est_appel(instr):
+    """Vrai si la traduction de l'instruction appelle une fonction C"""
+    if instr.op is Op.SYSTEME:
+        return True
+    return (type(instr.arg1) is str or type(instr.arg2) is str) and instr.op in COMPARAISONS
+
+
+class Intervalle:
+    """
+    Intervalle de vie d'un temporaire
+
+    Attributs:
+        temp (Temp): Temporaire
+        debut (int): Indice de l'instruction qui le définit
+        fin (int): Indice de sa dernière lecture
+        traverse_appel (bool): Vivant pendant un appel de fonction
+    """
+
+    __slots__ = ('temp', 'debut', 'fin', 'traverse_appel')
+
+    def __init__(self, temp, debut):
+        self.temp = temp
+        self.debut = debut
+        self.fin = debut
+        self.traverse_appel = False
+
+
+def intervalles_de_vie(code):
+    """
+    Calcule les intervalles de vie des temporaires
+
+    Returns:
+        list: Intervalles, par début croissant
+    """
+    intervalles = {}
+    labels = {}
+    appels = []
+    for i, instr in enumerate(code):
+        for temp in (instr.arg1, instr.arg2):
+            if type(temp) is Temp:
+                intervalle = intervalles.get(temp)
+                if intervalle is None:  # lu sans être défini : vivant depuis l'entrée
+                    intervalle = intervalles[temp] = Intervalle(temp, 0)
+                intervalle.fin = i
+        if type(instr.resultat) is Temp and instr.resultat not in intervalles:
+            intervalles[instr.resultat] = Intervalle(instr.resultat, i)
+        if instr.op is Op.LABEL:
+            labels[instr.arg1] = i
+        elif est_appel(instr):
+            appels.append(i)
+
+    # Un temporaire vivant au début d'une boucle l'est jusqu'au saut arrière
+    arrieres = [(labels[instr.resultat], i) for i, instr in enumerate(code)
+                if instr.op in SAUTS and labels.get(instr.resultat, i) < i]
+    modifie = bool(arrieres)
+    while modifie:
+        modifie = False
+        for debut_boucle, fin_boucle in arrieres:
+            for intervalle in intervalles.values():
+                if intervalle.debut < debut_boucle <= intervalle.fin < fin_boucle:
+                    intervalle.fin = fin_boucle
+                    modifie = True
+
+    for intervalle in intervalles.values():
+        # Un appel strictement à l'intérieur de l'intervalle
+        k = bisect_right(appels, intervalle.debut)
+        intervalle.traverse_appel = k < len(appels) and appels[k] < intervalle.fin
+    return sorted(intervalles.values(), key=lambda intervalle: intervalle.debut)
+
+
+class Allocation:
+    """
+    Emplacement de chaque temporaire : registre ou emplacement de pile
+
+    Attributs:
+        registres (dict): Temporaire -> nom du registre
+        emplacements (dict): Temporaire -> numéro d'emplacement de pile (0, 1, ...)
+        nb_emplacements (int): Nombre d'emplacements de pile utilisés
+    """
+
+    def __init__(self):
+        self.registres = {}
+        self.emplacements = {}
+        self.nb_emplacements = 0
+
+
+def vivants_par_position(intervalles, n):
+    """
+    Temporaires vivants entre chaque instruction et la suivante
+
+    Args:
+        intervalles (list): Intervalles de vie, par début croissant (voir
+            intervalles_de_vie)
+        n (int): Nombre d'instructions du code
+
+    Yields:
+        set: Pour i = 0 .. n - 1, temporaires définis au plus tard par
+             l'instruction i et lus après elle (le même ensemble, mis à
+             jour, est rendu à chaque position)
+    """
+    par_fin = sorted(intervalles, key=lambda intervalle: intervalle.fin)
+    vivants = set()
+    k = j = 0
+    for i in range(n):
+        while k < len(intervalles) and intervalles[k].debut <= i:
+            if intervalles[k].fin > intervalles[k].debut:
+                vivants.add(intervalles[k].temp)
+            k += 1
+        while j < len(par_fin) and par_fin[j].fin <= i:
+            vivants.discard(par_fin[j].temp)
+            j += 1
+        yield vivants
+
+
+def allouer_registres(code, conserves=REGISTRES_CONSERVES, volatils=REGISTRES_VOLATILS, intervalles=None):
+    """
+    Alloue registres et emplacements de pile aux temporaires
+
+    Args:
+        code (list): Instructions (Quadruplet)
+        conserves (tuple): Registres conservés par les appels
+        volatils (tuple): Registres écrasés par les appels
+        intervalles (list): Intervalles de vie déjà calculés (optionnel)
+
+    Returns:
+        Allocation: Emplacement de chaque temporaire
+    """
+    allocation = Allocation()
+    actifs = []  # intervalles en registre, par fin croissante
+    libres = set(conserves) | set(volatils)
+    debordes = []
+
+    def choisir(intervalle):
+        """Registre libre utilisable (volatil de préférence s'il ne traverse aucun appel)"""
+        ordre = conserves if intervalle.traverse_appel else volatils + conserves
+        return next((r for r in ordre if r in libres), None)
+
+    if intervalles is None:
+        intervalles = intervalles_de_vie(code)
+    for intervalle in intervalles:
+        # Libère les registres des intervalles terminés (la lecture d'un
+        # opérande précède l'écriture du résultat dans une même instruction)
+        while actifs and actifs[0].fin <= intervalle.debut:
+            libres.add(allocation.registres[actifs.pop(0).temp])
+
+        registre = choisir(intervalle)
+        if registre is None:
+            # Débordement : l'intervalle compatible qui finit le plus tard va sur la pile
+            candidats = [a for a in actifs
+                         if not intervalle.traverse_appel or allocation.registres[a.temp] in conserves]
+            victime = max(candidats, key=lambda a: a.fin, default=None)
+            if victime is None or victime.fin <= intervalle.fin:
+                debordes.append(intervalle)
+                continue
+            registre = allocation.registres.pop(victime.temp)
+            actifs.remove(victime)
+            debordes.append(victime)
+        libres.discard(registre)
+        allocation.registres[intervalle.temp] = registre
+        k = bisect_right([a.fin for a in actifs], intervalle.fin)
+        actifs.insert(k, intervalle)
+
+    # Emplacements de pile : les intervalles disjoints partagent un emplacement
+    occupes = []  # tas des (fin, emplacement)
+    reutilisables = []
+    for intervalle in sorted(debordes, key=lambda i: i.debut):
+        while occupes and occupes[0][0] <= intervalle.debut:
+            reutilisables.append(heapq.heappop(occupes)[1])
+        if reutilisables:
+            emplacement = reutilisables.pop()
+        else:
+            emplacement = allocation.nb_emplacements
+            allocation.nb_emplacements += 1
+        allocation.emplacements[intervalle.temp] = emplacement
+        heapq.heappush(occupes, (intervalle.fin, emplacement))
+    return allocation
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""
+Ré-analyse incrémentale d'un conseil en cours d'édition
+
+Le texte est découpé en blocs, un bloc commençant à chaque ligne "si ..." ou
+"sinon si ...". Les résultats sont mis en cache :
+- analyse lexicale et syntaxique par texte de bloc (tokens et nœuds de l'AST,
+  numéros de ligne des tokens relatifs au début du bloc ; les nœuds gardent
+  la position du bloc lors de sa première analyse)
+- analyse sémantique par texte de bloc et types déjà connus des variables
+  qu'il utilise (seule dépendance d'un bloc envers les blocs précédents) ;
+  ce cache est vidé quand la table des règles sémantiques est rechargée
+
+Après une modification d'une ligne, seul le bloc modifié est réanalysé ; les
+autres blocs ne coûtent qu'une consultation de dictionnaire.
+"""
+
+import re
+import time
+
+from analyseur import construire_lexer, parse
+from chaines import CHAINES
+from regles import REGLES
+from SemanticAnalyzer import SemanticAnalyzer
+
+# Une ligne qui commence un nouveau bloc condition
+DEBUT_BLOC = re.compile(r'[ \t]*(si|sinon)\b', re.IGNORECASE)
+
+
+def decouper_blocs(code):
+    """
+    Découpe le code en blocs condition
+
+    Les lignes qui précèdent le premier "si" sont rattachées au premier bloc.
+
+    Returns:
+        list: Couples (numéro de la première ligne, texte du bloc)
+    """
+    blocs = []
+    lignes = code.split('\n')
+    debut = 0
+    for numero, ligne in enumerate(lignes):
+        if numero > 0 and DEBUT_BLOC.match(ligne) and '\n'.join(lignes[debut:numero]).strip():
+            blocs.append((debut + 1, '\n'.join(lignes[debut:numero])))
+            debut = numero
+    dernier = '\n'.join(lignes[debut:])
+    if dernier.strip():
+        blocs.append((debut + 1, dernier))
+    return blocs
+
+
+class ResultatIncremental:
+    """
+    Résultat complet d'une analyse incrémentale
+
+    Attributs:
+        ast (list): Conditions de tous les blocs analysés sans erreur
+        tokens_blocs (list): Couples (première ligne, tokens relatifs) de ces blocs
+        symbol_table (dict): Table des symboles
+        errors (list): Erreurs syntaxiques et sémantiques
+        warnings (list): Avertissements
+        used_proverbs (set): Thèmes des proverbes utilisés
+        blocs (int): Nombre de blocs du texte
+        reanalyses (int): Nombre de blocs réellement (ré)analysés
+        duree_ms (float): Durée de l'analyse
+    """
+
+    def __init__(self):
+        self.ast = []
+        self.tokens_blocs = []
+        self.symbol_table = {}
+        self.errors = []
+        self.warnings = []
+        self.used_proverbs = set()
+        self.blocs = 0
+        self.reanalyses = 0
+        self.duree_ms = 0.0
+
+    def iter_tokens(self):
+        """Produit les tokens (type, valeur, ligne) avec leur numéro de ligne absolu"""
+        for ligne, tokens in self.tokens_blocs:
+            for typ, val, rel in tokens:
+                yield typ, val, ligne + rel
+
+
+class AnalyseIncrementale:
+    """
+    Analyseur incrémental réutilisant les résultats des blocs inchangés
+
+    Attributs:
+        index (ProverbIndex): Index du catalogue de proverbes
+        cache_syntaxe (dict): Texte du bloc -> (tokens, conditions, variables)
+        cache_erreurs (dict): (texte, ligne) -> message d'erreur syntaxique
+        cache_semantique (dict): (texte, types connus) -> résultat sémantique
+        regles (IndexThemes): Règles avec lesquelles le cache sémantique a été rempli
+        generation (int): Génération de la table des chaînes des conditions
+            en cache (voir chaines)
+    """
+
+    def __init__(self, index):
+        self.index = index
+        self.lexer = construire_lexer()
+        self.cache_syntaxe = {}
+        self.cache_erreurs = {}
+        self.cache_semantique = {}
+        self.regles = None
+        self.generation = CHAINES.generation
+
+    def _analyser_syntaxe(self, ligne, texte):
+        """
+        Analyse lexicale et syntaxique d'un bloc commençant à la ligne donnée
+
+        Les messages d'erreur portent les numéros de ligne du fichier ; les
+        tokens conservés sont numérotés relativement au début du bloc pour
+        rester valides si le bloc est déplacé.
+        """
+        tokens = []
+        conditions = parse(texte, self.index, lexer=self.lexer, premiere_ligne=ligne,
+                           observateur=lambda tok: tokens.append((tok.type, tok.value, tok.lineno - ligne)))
+        conditions = conditions or []
+        variables = tuple(dict.fromkeys(condition.var for condition in conditions))
+        return tokens, conditions, variables
+
+    def _analyser_semantique(self, conditions, types_connus):
+        """Analyse sémantique d'un bloc à partir des types déjà connus"""
+        analyzer = SemanticAnalyzer(self.index.proverbes, self.regles)
+        analyzer.symbol_table.update((var, typ) for var, typ in types_connus if typ is not None)
+        connus = set(analyzer.symbol_table)
+        for condition in conditions:
+            analyzer.check_condition(condition)
+            analyzer.collect_warnings(condition)
+        nouveaux = {var: typ for var, typ in analyzer.symbol_table.items() if var not in connus}
+        return analyzer.errors, analyzer.warnings, analyzer.used_proverbs, nouveaux
+
+    def analyser(self, code):
+        """
+        Analyse le code en réutilisant les résultats des blocs inchangés
+
+        Args:
+            code (str): Texte complet de l'éditeur
+
+        Returns:
+            ResultatIncremental: Résultat de l'analyse
+        """
+        debut = time.perf_counter()
+        resultat = ResultatIncremental()
+        syntaxe, erreurs, semantique = {}, {}, {}
+
+        # Règles rechargées : les résultats sémantiques en cache sont périmés
+        regles = REGLES.actuelles()
+        if regles is not self.regles:
+            self.regles = regles
+            self.cache_semantique = {}
+        # Table des chaînes vidée : les conditions en cache sont périmées
+        if self.generation != CHAINES.generation:
+            self.generation = CHAINES.generation
+            self.cache_syntaxe = {}
+
+        for ligne, texte in decouper_blocs(code):
+            resultat.blocs += 1
+
+            # Analyse syntaxique (ou erreur déjà connue pour ce bloc)
+            cle_erreur = (texte, ligne)
+            if cle_erreur in self.cache_erreurs:
+                erreurs[cle_erreur] = self.cache_erreurs[cle_erreur]
+                resultat.errors.append(erreurs[cle_erreur])
+                continue
+            if texte in self.cache_syntaxe:
+                analyse = self.cache_syntaxe[texte]
+            else:
+                resultat.reanalyses += 1
+                try:
+                    analyse = self._analyser_syntaxe(ligne, texte)
+                except SyntaxError as e:
+                    erreurs[cle_erreur] = str(e)
+                    resultat.errors.append(erreurs[cle_erreur])
+                    continue
+            syntaxe[texte] = analyse
+            tokens, conditions, variables = analyse
+            resultat.tokens_blocs.append((ligne, tokens))
+            resultat.ast.extend(conditions)
+
+            # Analyse sémantique, qui ne dépend que des types déjà connus
+            cle = (texte, tuple((var, resultat.symbol_table.get(var)) for var in variables))
+            if cle not in self.cache_semantique:
+                self.cache_semantique[cle] = self._analyser_semantique(conditions, cle[1])
+            semantique[cle] = self.cache_semantique[cle]
+            errors, warnings, used, nouveaux = semantique[cle]
+            resultat.errors.extend(errors)
+            resultat.warnings.extend(warnings)
+            resultat.used_proverbs.update(used)
+            resultat.symbol_table.update(nouveaux)
+
+        # Seules les entrées encore utiles sont conservées
+        self.cache_syntaxe, self.cache_erreurs, self.cache_semantique = syntaxe, erreurs, semantique
+        resultat.duree_ms = (time.perf_counter() - debut) * 1000
+        return resultat
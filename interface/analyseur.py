@@ -0,0 +1,404 @@
+# -*- coding: utf-8 -*-
+"""
+Analyseur lexical et syntaxique des conseils
+
+Le lexer et le parser sont construits une seule fois, à l'import du module :
+les règles sont définies au niveau du module et les tables LALR sont lues
+dans le module précompilé tables_conseil.py, livré avec le code. L'import
+n'écrit aucun fichier et échoue si les tables ne correspondent pas à la
+grammaire. Le catalogue de proverbes (ProverbIndex) et la table des
+symboles sont fournis à chaque analyse, ce qui permet de recharger le
+catalogue sans reconstruire le parser.
+
+Utilisation:
+    index = ProverbIndex(proverbes)
+    ast = parse(code, index)
+
+Après une modification de la grammaire (règles p_*, tokens), les tables
+sont régénérées par l'étape de construction :
+    python analyseur.py
+"""
+
+import copy
+import os
+import py_compile
+import tempfile
+from functools import partial
+
+from ply.lex import lex
+from ply.yacc import LRParser, LRTable, ParserReflect, VersionError, yacc
+
+from chaines import CHAINES
+from diagnostics import LEXICALE, SYNTAXIQUE
+from index_proverbes import PARTIEL
+from noeuds import Condition, Display, ElseIfCondition, Avertissement
+
+# ==================== Début ANALYSEUR LEXICAL ====================
+
+# Définition des tokens
+tokens = ('SI', 'SINON', 'EGAL', 'SUPERIEUR', 'AFFICHER', 'ET',
+          'PROVERBE', 'NOMBRE', 'STRING', 'NOM', 'DPOINTS')
+
+# Définition des expressions régulières pour les tokens simples
+t_EGAL = r'=='
+t_SUPERIEUR = r'>'
+t_DPOINTS = r':'
+t_ignore = ' \t'
+
+# Mots réservés
+reserved = {
+    'si': 'SI',
+    'sinon': 'SINON',
+    'afficher': 'AFFICHER',
+    'et': 'ET'
+}
+
+
+# Fonctions de traitement des tokens complexes
+# Tokenise les appels de proverbes (PROVERBE("texte")) et extrait le contenu
+def t_PROVERBE(t):
+    r'PROVERBE\(\s*"([^"]+)"\s*\)'
+    t.value = t.value[9:-1].strip('"\' ')
+    t.fin = t.lexer.lexpos  # fin de l'appel, pour la position du nœud Display
+    return t
+
+
+# Tokenise les nombres entiers et les convertit en type int
+def t_NOMBRE(t):
+    r'\d+'
+    t.value = int(t.value)
+    return t
+
+
+# Tokenise les chaînes entre guillemets et supprime les guillemets
+# (exemplaire partagé de la table des chaînes)
+def t_STRING(t):
+    r'"[^"]+"'
+    t.value = CHAINES.canonique(t.value[1:-1])
+    return t
+
+
+# Tokenise les identifiants et vérifie s'ils sont des mots réservés
+def t_NOM(t):
+    r'[a-zA-Z_éèà][a-zA-Z0-9_éèà]*'
+    t.type = reserved.get(t.value.lower(), 'NOM')
+    if t.type == 'NOM':
+        t.value = CHAINES.canonique(t.value)
+    return t
+
+
+# Gère les sauts de ligne (la numérotation commence à lexer.lineno, fixé par parse)
+def t_newline(t):
+    r'\n+'
+    t.lexer.lineno += len(t.value)
+
+
+# Gère les erreurs lexicales en levant une exception avec le caractère fautif
+# (avec reprise, voir parse : erreur signalée et caractère ignoré)
+def t_error(t):
+    message = f"Erreur lexicale: '{t.value[0]}' (ligne {t.lineno})"
+    if t.lexer.diagnostics is None:
+        raise SyntaxError(message)
+    t.lexer.diagnostics.signaler(LEXICALE, message, t.lexpos)
+    t.lexer.skip(1)
+
+# ==================== FIN ANALYSEUR LEXICAL ====================
+
+# ==================== DEBUT ANALYSEUR  SYNTAXIQUE ====================
+
+# Définition de la grammaire
+# Règle de grammaire pour la structure principale d'un conseil (peut contenir une ou plusieurs conditions)
+
+
+def p_conseil(p):
+    '''conseil : condition
+              | conseil condition'''
+    recepteur = p.lexer.recepteur
+    condition = p[len(p) - 1]
+    if recepteur is not None:
+        # Compilation seule : la condition est transmise, l'arbre n'est pas construit
+        if condition is not None:
+            recepteur(condition)
+    elif len(p) == 2:
+        p[0] = [condition] if condition is not None else []
+    else:
+        p[0] = p[1]
+        if condition is not None:  # None : condition abandonnée (p_condition_erreur)
+            p[0].append(condition)
+
+
+# Règle de grammaire pour les conditions SI/SINON SI avec gestion de la table des symboles
+def p_condition(p):
+    '''condition : SI NOM EGAL STRING DPOINTS actions
+                | SI NOM SUPERIEUR NOMBRE DPOINTS actions
+                | SINON SI NOM SUPERIEUR NOMBRE DPOINTS actions'''
+    symbol_table = p.lexer.symbol_table
+    actions = p[len(p) - 1]
+    if len(p) == 7:
+        if p[2] not in symbol_table:
+            symbol_table[p[2]] = 'string' if p[3] == '==' else 'number'
+        p[0] = Condition(p[2], p[3], p[4], actions, p.lineno(1), p.lexpos(1), actions[-1].fin)
+    else:
+        if p[3] not in symbol_table:
+            symbol_table[p[3]] = 'number'
+        p[0] = ElseIfCondition(p[3], p[4], p[5], actions, p.lineno(1), p.lexpos(1), actions[-1].fin)
+
+
+# Règle de grammaire pour les actions d'affichage (simple ou multiples avec ET)
+def p_actions(p):
+    '''actions : AFFICHER PROVERBE
+            | actions ET PROVERBE'''
+    if len(p) == 3:
+        p[0] = actions = []
+    else:
+        p[0] = actions = p[1]
+    token = p.slice[len(p) - 1]
+    statut, theme, texte = p.lexer.index.resoudre(token.value)
+    actions.append(Display(theme, texte, statut, token.lineno, token.lexpos, token.fin))
+    if statut == PARTIEL:
+        # Afficher un warning pour les proverbes partiels
+        actions.append(Avertissement("Le proverbe saisi est partiel", token.lineno, token.lexpos, token.fin))
+
+
+# Règle de reprise (panic mode) : après une erreur, les tokens sont sautés
+# jusqu'au prochain SI / SINON (ou la fin du texte) et la condition en cours
+# est abandonnée
+def p_condition_erreur(p):
+    '''condition : error'''
+    # La prochaine erreur sera de nouveau signalée (PLY tairait sinon celles
+    # des trois tokens suivants)
+    p.parser.errok()
+
+
+# Tokens qui commencent une condition : points de reprise après une erreur
+SYNCHRONISATION = ('SI', 'SINON')
+
+
+# Gestion des erreurs syntaxiques avec localisation précise ; parse fournit
+# le lexer (p est None à la fin du texte) et le parser de l'analyse en cours
+def p_error(p, *, lexer=None, parser=None):
+    if p:
+        message = f"Erreur syntaxique ligne {p.lineno}: '{p.value}'"
+    else:
+        message = "Erreur: Fin de fichier inattendue"
+    if lexer is None and p:
+        lexer = p.lexer
+    diagnostics = getattr(lexer, 'diagnostics', None)
+    if diagnostics is None or parser is None:
+        raise SyntaxError(message)
+
+    # Reprise (voir p_condition_erreur)
+    debut_texte = len(parser.statestack) <= 1
+    if p is None:
+        # Texte vide, ou qui se termine au milieu d'une condition (une suite
+        # de tokens sans aucune condition est déjà signalée)
+        if not (debut_texte and len(diagnostics)):
+            diagnostics.signaler(SYNTAXIQUE, message, None)
+        return None
+    diagnostics.signaler(SYNTAXIQUE, message, p.lexpos, max(lexer.lexpos, p.lexpos + 1))
+    if debut_texte:
+        # Aucune condition commencée : PLY abandonnerait ce token sans passer
+        # par la règle de reprise, les tokens sont sautés ici
+        tok = parser.token()
+        while tok is not None and tok.type not in SYNCHRONISATION:
+            tok = parser.token()
+        parser.errok()
+        return tok
+    return None
+
+# ==================== FIN ANALYSEUR  SYNTAXIQUE ====================
+
+# ==================== CONSTRUCTION (une fois par processus) ====================
+
+
+# Module des tables LALR, généré dans le dossier du module (quel que soit le
+# répertoire courant) par generer_tables
+TABLES_DIR = os.path.dirname(os.path.abspath(__file__))
+MODULE_TABLES = 'tables_conseil'
+
+
+def _grammaire():
+    """Règles, tokens et p_error du module, tels que yacc les collecte"""
+    infos = ParserReflect(globals())
+    infos.get_all()
+    return infos
+
+
+def charger_parser():
+    """
+    Parser LALR depuis le module de tables précompilé
+
+    Rien n'est écrit (ni tables, ni parser.out) : plusieurs processus
+    peuvent démarrer en même temps depuis un dossier en lecture seule.
+
+    Raises:
+        RuntimeError: Module de tables absent, ou construit pour une autre
+            grammaire ou une autre version de PLY (signature différente)
+    """
+    infos = _grammaire()
+    tables = LRTable()
+    try:
+        signature = tables.read_table(MODULE_TABLES)
+    except ImportError:
+        raise RuntimeError(f"Tables LALR absentes ({MODULE_TABLES}.py) : "
+                           f"lancez 'python analyseur.py' pour les générer") from None
+    except VersionError:
+        signature = None
+    if signature != infos.signature():
+        raise RuntimeError(f"Tables LALR périmées ({MODULE_TABLES}.py ne correspond pas à la grammaire) : "
+                           f"lancez 'python analyseur.py' pour les régénérer")
+    tables.bind_callables(infos.pdict)
+    parser = LRParser(tables, infos.error_func)
+    # Après le token error, condition : error n'est pas réduite d'office :
+    # les tokens sont d'abord sautés jusqu'à un SI / SINON (ou la fin), sans
+    # quoi le token en erreur serait repris aussitôt (et l'erreur répétée)
+    for etat, regle in list(parser.defaulted_states.items()):
+        if parser.productions[-regle].str == 'condition -> error':
+            del parser.defaulted_states[etat]
+    return parser
+
+
+def generer_tables(dossier=TABLES_DIR):
+    """
+    Étape de construction : génère le module de tables (MODULE_TABLES) et
+    son bytecode dans dossier
+
+    Le module est écrit à côté puis renommé (un processus qui l'importe au
+    même moment lit l'ancienne ou la nouvelle version, jamais un fichier
+    partiel) et mis en lecture seule.
+
+    Returns:
+        str: Chemin du module écrit
+    """
+    chemin = os.path.join(dossier, MODULE_TABLES + '.py')
+    with tempfile.TemporaryDirectory(dir=dossier) as temporaire:
+        # Nom de module introuvable à l'import : yacc construit toujours les tables
+        yacc(debug=False, tabmodule='_tables_construction', outputdir=temporaire)
+        with open(os.path.join(temporaire, '_tables_construction.py'), encoding='utf-8') as f:
+            texte = f.read().replace('# _tables_construction.py', f'# {MODULE_TABLES}.py', 1)
+        nouveau = os.path.join(temporaire, MODULE_TABLES + '.py')
+        with open(nouveau, 'w', encoding='utf-8') as f:
+            f.write(texte)
+        os.chmod(nouveau, 0o444)
+        os.replace(nouveau, chemin)
+    py_compile.compile(chemin, doraise=True)
+    return chemin
+
+
+_lexer = lex()
+_lexer.diagnostics = None  # sans reprise sur erreur (voir parse)
+# Exécuté comme script (étape de construction), le module génère les tables
+# au lieu de les charger : voir la fin du fichier
+_parser = charger_parser() if __name__ != '__main__' else None
+
+
+# Lexers disponibles (voir construire_lexer)
+MOTEURS_LEXER = ('ply', 'dfa')
+
+
+def construire_lexer(moteur='ply'):
+    """
+    Retourne un nouveau lexer indépendant
+
+    Le clonage réutilise l'expression maîtresse déjà compilée : aucune
+    réflexion sur les règles n'est refaite.
+
+    Args:
+        moteur (str): 'ply' (règles ci-dessus) ou 'dfa' (automate écrit à
+            la main, même flux de tokens, voir lexer_dfa)
+    """
+    if moteur == 'dfa':
+        from lexer_dfa import LexerDFA
+        return LexerDFA()
+    if moteur != 'ply':
+        raise ValueError(f"Lexer inconnu: {moteur} (parmi {', '.join(MOTEURS_LEXER)})")
+    lexer = _lexer.clone()
+    lexer.lineno = 1
+    return lexer
+
+
+def iter_tokens(lexer, observateur=None):
+    """
+    Générateur qui produit les tokens du lexer à la demande
+
+    Args:
+        lexer: Lexer dont l'entrée a déjà été fournie (lexer.input)
+        observateur (callable): Fonction appelée avec chaque token (optionnel)
+
+    Yields:
+        LexToken: Tokens dans l'ordre du texte source
+    """
+    token = lexer.token
+    while True:
+        tok = token()
+        if tok is None:
+            return
+        if observateur is not None:
+            observateur(tok)
+        yield tok
+
+
+def parse(code, index, symbol_table=None, lexer=None, observateur=None, premiere_ligne=1, recepteur=None,
+          diagnostics=None):
+    """
+    Analyse un conseil avec le catalogue de proverbes fourni
+
+    Le texte n'est lu qu'une seule fois : les tokens sont transmis au parser
+    au fur et à mesure par un générateur, sans être conservés en mémoire.
+
+    Args:
+        code (str): Code source du conseil
+        index (ProverbIndex): Index du catalogue de proverbes
+        symbol_table (dict): Table des symboles à remplir (optionnel)
+        lexer: Lexer à utiliser (optionnel, un nouveau lexer sinon)
+        observateur (callable): Fonction appelée avec chaque token lu,
+            par exemple pour afficher les tokens détectés (optionnel)
+        premiere_ligne (int): Numéro de la première ligne de code, quand le
+            texte est un extrait d'un fichier plus grand (défaut: 1)
+        recepteur (callable): Fonction appelée avec chaque condition dès
+            qu'elle est reconnue, dans l'ordre du texte ; l'arbre n'est
+            alors pas construit (optionnel)
+        diagnostics (Diagnostics): Collecteur des erreurs lexicales et
+            syntaxiques (optionnel) : chaque erreur y est signalée et
+            l'analyse reprend au SI / SINON suivant (caractère suivant pour
+            une erreur lexicale) au lieu de lever SyntaxError ; l'arbre ne
+            contient que les conditions reconnues
+
+    Returns:
+        list: Arbre syntaxique (liste de Condition/ElseIfCondition, voir
+              noeuds) ; None avec un recepteur
+
+    Raises:
+        SyntaxError: En cas d'erreur lexicale ou syntaxique (sans diagnostics)
+    """
+    conditions = None
+    if diagnostics is not None and recepteur is None:
+        # Une erreur à la fin du texte interrompt le parser sans rendre
+        # l'arbre : les conditions sont recueillies au fur et à mesure
+        conditions = []
+        recepteur = conditions.append
+    if lexer is None:
+        lexer = construire_lexer()
+    lexer.lineno = premiere_ligne
+    lexer.index = index
+    lexer.symbol_table = {} if symbol_table is None else symbol_table
+    lexer.recepteur = recepteur
+    lexer.diagnostics = diagnostics
+    lexer.input(code)
+    tokens = iter_tokens(lexer, observateur)
+    # L'état d'une analyse (piles, token courant) est tenu par le parser :
+    # chaque appel a sa copie, qui partage les tables de _parser (parse est
+    # ainsi réentrant ; plusieurs threads peuvent analyser en même temps,
+    # la table des chaînes partagée est protégée par un verrou, voir chaines)
+    parser = copy.copy(_parser)
+    parser.errorfunc = partial(p_error, lexer=lexer, parser=parser)
+    try:
+        ast = parser.parse(lexer=lexer, tokenfunc=partial(next, tokens, None))
+    finally:
+        parser.errorfunc = None
+    return conditions if conditions is not None else ast
+
+# ==================== ETAPE DE CONSTRUCTION ====================
+
+if __name__ == '__main__':
+    print(f"Tables LALR écrites dans {generer_tables()}")
@@ -0,0 +1,655 @@
+# -*- coding: utf-8 -*-
+"""
+Mesures de performance du compilateur de conseils
+
+Usage:
+    python benchmarks.py                 # tous les benchmarks
+    python benchmarks.py demarrage       # un benchmark particulier
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from catalogue import DEFAULT_PROVERBES
+
+SCRIPT_BENCH = """si humeur == "triste":
+    afficher PROVERBE("أسمع كلام اللي يبكيك وماتسمعش كلام اللي يضحكك")
+sinon si age > 30:
+    afficher PROVERBE("الصبر مفتاح الفرج") et PROVERBE("إسأل مجرب")"""
+
+
+def generer_conseil(nb_blocs):
+    """Génère un conseil valide de nb_blocs blocs 'si ... sinon si ...'"""
+    bloc = (f'si humeur == "triste":\n'
+            f'    afficher PROVERBE("{DEFAULT_PROVERBES["CONSEIL"]}")\n'
+            f'sinon si age > 50:\n'
+            f'    afficher PROVERBE("{DEFAULT_PROVERBES["SAGESSE"]}")'
+            f' et PROVERBE("{DEFAULT_PROVERBES["EXPERIENCE"]}")\n')
+    return bloc * nb_blocs
+
+
+def chronometrer(fonction, repetitions):
+    """Retourne le temps moyen (en secondes) d'un appel à fonction()"""
+    debut = time.perf_counter()
+    for _ in range(repetitions):
+        fonction()
+    return (time.perf_counter() - debut) / repetitions
+
+# ==================== DEMARRAGE ====================
+
+
+def bench_demarrage(repetitions=20):
+    """
+    Compare le démarrage à froid (réflexion sur les règles et construction des
+    tables LALR, ce que faisait init_analyzer à chaque appel) au démarrage à
+    chaud (lexer cloné, tables déjà chargées dans le processus).
+    """
+    from ply import lex, yacc
+
+    debut = time.perf_counter()
+    import analyseur
+    import_ms = (time.perf_counter() - debut) * 1000
+
+    from index_proverbes import ProverbIndex
+    index = ProverbIndex(DEFAULT_PROVERBES)
+
+    def froid():
+        lex.lex(module=analyseur)
+        parser = yacc.yacc(module=analyseur, debug=False, write_tables=False,
+                           tabmodule='_parsetab_froid', errorlog=yacc.NullLogger())
+        lexer = lex.lex(module=analyseur)
+        lexer.index, lexer.symbol_table, lexer.recepteur = index, {}, None
+        parser.parse(SCRIPT_BENCH, lexer=lexer)
+
+    def chaud():
+        analyseur.parse(SCRIPT_BENCH, index, lexer=analyseur.construire_lexer())
+
+    froid_ms = chronometrer(froid, repetitions) * 1000
+    chaud_ms = chronometrer(chaud, repetitions) * 1000
+
+    print("== Démarrage du lexer/parser ==")
+    print(f"import analyseur (tables chargées)  : {import_ms:8.2f} ms")
+    print(f"démarrage à froid (lex + yacc)      : {froid_ms:8.2f} ms / analyse")
+    print(f"démarrage à chaud (lexer cloné)     : {chaud_ms:8.2f} ms / analyse")
+    print(f"gain                                : x{froid_ms / chaud_ms:.1f}")
+
+
+# ==================== COMPILATION PARALLELE ====================
+
+
+def bench_parallele(nb_scripts=10000):
+    """
+    Compile un corpus de nb_scripts conseils avec 1, 2, 4... processus
+    (jusqu'au nombre de cœurs) et rapporte le débit et l'accélération.
+    """
+    from compilateur import collecter_fichiers, compiler_parallele
+    from index_proverbes import ProverbIndex
+
+    index = ProverbIndex(DEFAULT_PROVERBES)
+    coeurs = os.cpu_count() or 1
+    niveaux = sorted({min(2 ** i, coeurs) for i in range(coeurs.bit_length() + 1)})
+
+    print(f"== Compilation parallèle ({nb_scripts} scripts, {coeurs} cœur(s)) ==")
+    with tempfile.TemporaryDirectory() as dossier:
+        sources = os.path.join(dossier, 'src')
+        os.makedirs(sources)
+        for i in range(nb_scripts):
+            with open(os.path.join(sources, f"script_{i:05d}.conseil"), 'w', encoding='utf-8') as f:
+                f.write(generer_conseil(1 + i % 5))
+        fichiers = collecter_fichiers([sources])
+
+        reference = None
+        for processus in niveaux:
+            debut = time.perf_counter()
+            diagnostics = compiler_parallele(fichiers, index, os.path.join(dossier, 'build'), processus)
+            duree = time.perf_counter() - debut
+            debit = len(diagnostics) / duree
+            reference = reference or debit
+            print(f"{processus:3d} processus : {debit:10.1f} fichiers/s  (x{debit / reference:.2f})")
+
+
+# ==================== REGLES SEMANTIQUES ====================
+
+
+def bench_regles(nb_regles=10000):
+    """
+    Recharge une table de nb_regles règles sémantiques (moitié valeurs
+    textuelles, moitié tranches numériques) via la surveillance du fichier.
+    """
+    from regles import ReglesSurveillees
+
+    themes = sorted(DEFAULT_PROVERBES)
+    variables = {}
+    for v in range(100):
+        variables[f"texte_{v}"] = {'type': 'texte', 'valeurs': {
+            f"valeur_{i}": themes[i % len(themes):i % len(themes) + 3] for i in range(nb_regles // 200)}}
+        variables[f"nombre_{v}"] = {'type': 'tranches', 'tranches': [
+            {'min': i * 10, 'max': i * 10 + 15, 'themes': themes[i % len(themes):i % len(themes) + 2]}
+            for i in range(nb_regles // 200)]}
+
+    print(f"== Rechargement des règles sémantiques ({nb_regles} règles) ==")
+    with tempfile.TemporaryDirectory() as dossier:
+        chemin = os.path.join(dossier, 'regles.json')
+        with open(chemin, 'w', encoding='utf-8') as f:
+            json.dump({'variables': variables}, f)
+        regles = ReglesSurveillees(chemin, intervalle=0)
+
+        debut = time.perf_counter()
+        regles.actuelles()
+        chargement_ms = (time.perf_counter() - debut) * 1000
+        verification_us = chronometrer(regles.actuelles, 1000) * 1e6
+
+        # Modification du fichier : nouvelle table
+        variables['texte_0']['valeurs']['valeur_0'] = ['CONSEIL']
+        with open(chemin, 'w', encoding='utf-8') as f:
+            json.dump({'variables': variables}, f)
+        debut = time.perf_counter()
+        regles.actuelles()
+        rechargement_ms = (time.perf_counter() - debut) * 1000
+
+    print(f"chargement initial                  : {chargement_ms:8.2f} ms")
+    print(f"rechargement après modification     : {rechargement_ms:8.2f} ms")
+    print(f"vérification sans modification      : {verification_us:8.2f} µs")
+
+
+# ==================== CACHE DE COMPILATION ====================
+
+
+def bench_cache(repetitions=200):
+    """
+    Recompile les mêmes conseils sans cache, avec le cache en mémoire puis
+    avec le seul cache sur disque (nouveau processus, mémoire vide).
+    """
+    from cache_compilation import CacheCompilation
+    from compilateur import compiler_source
+    from index_proverbes import ProverbIndex
+
+    index = ProverbIndex(DEFAULT_PROVERBES)
+    scripts = [SCRIPT_BENCH] + [generer_conseil(nb_blocs) for nb_blocs in (1, 5, 20)]
+
+    def compiler_tout(cache=None):
+        for script in scripts:
+            compiler_source(script, index, cache=cache)
+
+    print(f"== Cache de compilation ({len(scripts)} scripts) ==")
+    with tempfile.TemporaryDirectory() as dossier:
+        sans_ms = chronometrer(compiler_tout, repetitions) * 1000
+        memoire = CacheCompilation(dossier=dossier)
+        memoire_ms = chronometrer(lambda: compiler_tout(memoire), repetitions) * 1000
+
+        def depuis_disque():
+            compiler_tout(CacheCompilation(dossier=dossier))
+        disque_ms = chronometrer(depuis_disque, repetitions) * 1000
+
+    print(f"sans cache                          : {sans_ms:8.3f} ms / lot")
+    print(f"cache mémoire                       : {memoire_ms:8.3f} ms / lot  (x{sans_ms / memoire_ms:.0f})")
+    print(f"cache disque                        : {disque_ms:8.3f} ms / lot  (x{sans_ms / disque_ms:.0f})")
+    print(f"compteurs (cache mémoire)           : {memoire.statistiques()}")
+
+
+# ==================== MEMOIRE ====================
+
+
+def bench_memoire(nb_scripts=2000):
+    """
+    Mémoire occupée par les résultats (AST, code intermédiaire, assembleur)
+    d'un corpus de nb_scripts conseils qui citent les mêmes proverbes.
+    """
+    import tracemalloc
+
+    from compilateur import compiler_source
+    from index_proverbes import ProverbIndex
+
+    index = ProverbIndex(DEFAULT_PROVERBES)
+    sources = [generer_conseil(1 + i % 5) for i in range(nb_scripts)]
+    compiler_source(sources[0], index)  # tables et chaînes du catalogue déjà chargées
+
+    tracemalloc.start()
+    resultats = [compiler_source(source, index) for source in sources]
+    taille, _ = tracemalloc.get_traced_memory()
+    for resultat in resultats:
+        resultat['asm'] = None
+    sans_asm, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    instructions = sum(len(resultat['code_intermediaire']) for resultat in resultats)
+    print(f"== Mémoire d'un corpus ({nb_scripts} scripts, {instructions} instructions) ==")
+    print(f"résultats conservés                 : {taille / 1024 / 1024:8.2f} Mio")
+    print(f"dont AST et code intermédiaire      : {sans_asm / 1024 / 1024:8.2f} Mio"
+          f"  ({sans_asm / nb_scripts / 1024:.2f} Kio / script)")
+
+
+# ==================== OPTIMISATION ====================
+
+
+def bench_optimisation(nb_blocs=1000):
+    """
+    Taille du code intermédiaire d'un gros conseil avant et après
+    optimisation, et instructions supprimées par chaque passe.
+    """
+    from code_intermediaire import IntermediateCodeGenerator
+    from compilateur import compiler_source
+    from index_proverbes import ProverbIndex
+    from optimiseur import PASSES, optimiser
+
+    index = ProverbIndex(DEFAULT_PROVERBES)
+    ast = compiler_source(generer_conseil(nb_blocs), index)['ast']
+    code = IntermediateCodeGenerator().generate(ast)
+
+    debut = time.perf_counter()
+    optimise, rapport = optimiser(code)
+    duree_ms = (time.perf_counter() - debut) * 1000
+
+    print(f"== Optimisation du code intermédiaire ({nb_blocs} blocs) ==")
+    print(f"instructions avant                  : {len(code):8d}")
+    print(f"instructions après                  : {len(optimise):8d}"
+          f"  (-{100 * (1 - len(optimise) / len(code)):.1f} %, {duree_ms:.1f} ms)")
+    for nom in PASSES:
+        seule = len(code) - len(optimiser(code, [nom])[0])
+        print(f"  {nom:<14} : {rapport[nom]:6d} supprimée(s)  (seule : {seule})")
+
+
+# ==================== ASSEMBLEUR ====================
+
+
+def compter_instructions(asm):
+    """Nombre d'instructions de la section .text (sans étiquettes, directives ni commentaires)"""
+    texte = asm.split("section .data")[0]
+    return sum(1 for ligne in texte.splitlines() if ligne.startswith("    "))
+
+
+def bench_assembleur(nb_blocs=1000, nb_branches=40):
+    """
+    Nombre d'instructions de l'assembleur produit sans allocation de
+    registres ni optimisation à lucarne, avec l'allocation seule, puis avec
+    les deux, pour un gros conseil et une longue chaîne 'sinon si'.
+    """
+    from code_cible import TargetCodeGenerator
+    from code_intermediaire import IntermediateCodeGenerator
+    from compilateur import compiler_source
+    from index_proverbes import ProverbIndex
+
+    chaine = "".join(f'{"sinon si" if k else "si"} age > {5 * (nb_branches - k)}:\n'
+                     f'    afficher PROVERBE("{DEFAULT_PROVERBES["SAGESSE"]}")\n'
+                     for k in range(nb_branches))
+    index = ProverbIndex(DEFAULT_PROVERBES)
+    variantes = [("naïf", False, False), ("registres", True, False), ("registres + lucarne", True, True)]
+
+    print("== Instructions assembleur (.text) ==")
+    for nom, source in ((f"{nb_blocs} blocs", generer_conseil(nb_blocs)),
+                        (f"chaîne de {nb_branches} branches", chaine)):
+        generateur = IntermediateCodeGenerator()
+        generateur.generate(compiler_source(source, index)['ast'])
+        generateur.optimize_code()
+        print(f"-- {nom} ({len(generateur.code)} instructions intermédiaires)")
+        reference = None
+        for variante, registres, peephole in variantes:
+            debut = time.perf_counter()
+            asm = TargetCodeGenerator(registres=registres, peephole=peephole).generate_asm(generateur.code)
+            duree_ms = (time.perf_counter() - debut) * 1000
+            nombre = compter_instructions(asm)
+            reference = reference or nombre
+            print(f"  {variante:<20} : {nombre:8d}  (-{100 * (1 - nombre / reference):.1f} %, {duree_ms:.1f} ms)")
+
+
+# ==================== CHAINES ====================
+
+
+def bench_chaines(nb_affichages=50000, nb_scripts=200):
+    """
+    Génération de l'assembleur pour de plus en plus d'affichages de
+    proverbes tous distincts (le temps par affichage doit rester constant),
+    puis taille des chaînes constantes d'un lot de scripts, par script ou
+    partagées (pool commun, suffixes fusionnés).
+    """
+    from chaines import CHAINES
+    from code_cible import TargetCodeGenerator
+    from instructions import allouer, appel_systeme, stocke_chaine, temporaire
+    from pool_chaines import PoolChaines, assembleur_donnees
+
+    print("== Chaînes constantes ==")
+    for nombre in (nb_affichages // 5, nb_affichages):
+        code = []
+        for k in range(nombre):
+            temp = temporaire(k + 1)
+            code += [allouer(temp, 256), stocke_chaine(temp, CHAINES.identifiant(f"proverbe {k}")),
+                     appel_systeme('afficher', temp)]
+        debut = time.perf_counter()
+        TargetCodeGenerator().generate_asm(code)
+        duree = time.perf_counter() - debut
+        print(f"{nombre:6d} affichages distincts         : {duree * 1000:8.1f} ms"
+              f"  ({duree / nombre * 1e6:.2f} µs / affichage)")
+
+    # Chaque script cite quelques proverbes du catalogue, sous leur forme
+    # vérifiée ("THEME: texte") ou seulement par leur texte
+    proverbes = [f"{theme}: {texte}" for theme, texte in DEFAULT_PROVERBES.items()]
+    proverbes += list(DEFAULT_PROVERBES.values())
+    par_script = 0
+    partage = PoolChaines(partage=True)
+    for k in range(nb_scripts):
+        pool = PoolChaines()
+        for texte in proverbes[k % len(proverbes):] + proverbes[:k % 3]:
+            pool.label(texte)
+            partage.label(texte)
+        par_script += len("\n".join(pool.donnees()).encode('utf-8'))
+    commun = len(assembleur_donnees(partage).encode('utf-8'))
+    print(f"{nb_scripts} scripts, chaînes par script     : {par_script:8d} octets")
+    print(f"{nb_scripts} scripts, fichier commun         : {commun:8d} octets")
+
+
+# ==================== FLUX ====================
+
+
+def bench_flux(tailles=(1000, 4000)):
+    """
+    Pic de mémoire de la génération de l'assembleur d'un gros conseil :
+    texte complet rendu par generate_asm puis écrit, ou écriture au fil de
+    la génération (ecrire_asm). Le code intermédiaire n'est pas compté.
+    """
+    import tracemalloc
+
+    from code_cible import TargetCodeGenerator
+    from code_intermediaire import IntermediateCodeGenerator
+    from compilateur import compiler_source
+    from index_proverbes import ProverbIndex
+
+    def texte(code, f):
+        f.write(TargetCodeGenerator().generate_asm(code))
+
+    def flux(code, f):
+        TargetCodeGenerator().ecrire_asm(code, f)
+
+    index = ProverbIndex(DEFAULT_PROVERBES)
+    print("== Écriture de l'assembleur (pic de mémoire) ==")
+    for nb_blocs in tailles:
+        generateur = IntermediateCodeGenerator()
+        generateur.generate(compiler_source(generer_conseil(nb_blocs), index)['ast'])
+        generateur.optimize_code()
+        for nom, ecrire in (("texte complet", texte), ("flux", flux)):
+            with open(os.devnull, 'w', encoding='utf-8') as f:
+                tracemalloc.start()
+                ecrire(generateur.code, f)
+                pic = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            print(f"{nb_blocs:5d} blocs, {nom:<14} : {pic / 1024 / 1024:8.2f} Mio")
+
+
+# ==================== MACHINE VIRTUELLE ====================
+
+
+def conseil_profils(nb_branches=20):
+    """
+    Jeu de règles sur age, humeur et besoin : une chaîne 'sinon si' sur
+    l'âge (arbre de décision) et des conditions sur les chaînes
+    """
+    def theme(age):
+        """Thème d'un proverbe de la tranche d'âge qui contient age (voir regles_semantiques.json)"""
+        return next(theme for borne, theme in ((18, "JEUNESSE"), (40, "TRAVAIL"), (60, "SAGESSE"))
+                    if age <= borne) if age <= 60 else "AGE"
+
+    seuils = [5 * (nb_branches - k) for k in range(nb_branches)]
+    source = "".join(f'{"sinon si" if k else "si"} age > {seuil}:\n'
+                     f'    afficher PROVERBE("{DEFAULT_PROVERBES[theme(seuil + 1)]}")\n'
+                     for k, seuil in enumerate(seuils))
+    source += (f'si humeur == "triste":\n'
+               f'    afficher PROVERBE("{DEFAULT_PROVERBES["CONSEIL"]}")\n'
+               f'si besoin == "conseil":\n'
+               f'    afficher PROVERBE("{DEFAULT_PROVERBES["SAGESSE"]}")'
+               f' et PROVERBE("{DEFAULT_PROVERBES["EXPERIENCE"]}")\n')
+    return source
+
+
+def compiler_regles(source):
+    """Arbre syntaxique et code intermédiaire optimisé d'un conseil valide"""
+    from code_intermediaire import IntermediateCodeGenerator
+    from compilateur import compiler_source
+    from index_proverbes import ProverbIndex
+
+    resultat = compiler_source(source, ProverbIndex(DEFAULT_PROVERBES))
+    if resultat['erreurs']:
+        raise RuntimeError(resultat['erreurs'][0])
+    generateur = IntermediateCodeGenerator()
+    generateur.generate(resultat['ast'])
+    generateur.optimize_code()
+    return resultat['ast'], generateur.code
+
+
+def generer_profils(nombre, graine=0):
+    """Profils aléatoires (dict age, humeur, besoin)"""
+    import random
+
+    rng = random.Random(graine)
+    return [{'age': rng.randrange(100),
+             'humeur': rng.choice(("triste", "joyeux", "calme")),
+             'besoin': rng.choice(("conseil", "repos"))} for _ in range(nombre)]
+
+
+def bench_vm(nb_profils=200000, nb_branches=20):
+    """
+    Profils évalués par seconde par la machine virtuelle (voir vm), un par
+    un ou par lot, pour le jeu de règles de conseil_profils.
+    """
+    from vm import compiler_programme
+
+    _, code = compiler_regles(conseil_profils(nb_branches))
+    debut = time.perf_counter()
+    programme = compiler_programme(code)
+    compilation_ms = (time.perf_counter() - debut) * 1000
+    profils = generer_profils(nb_profils)
+
+    print(f"== Machine virtuelle ({len(code)} instructions intermédiaires, "
+          f"{len(programme)} instructions de bytecode, {compilation_ms:.2f} ms) ==")
+    debut = time.perf_counter()
+    for profil in profils:
+        programme.executer(profil)
+    duree = time.perf_counter() - debut
+    print(f"profil par profil : {nb_profils / duree:12,.0f} profils/s")
+    debut = time.perf_counter()
+    resultats = programme.executer_lot(profils)
+    duree = time.perf_counter() - debut
+    print(f"par lot           : {nb_profils / duree:12,.0f} profils/s"
+          f"  ({sum(map(len, resultats)) / nb_profils:.2f} proverbe(s) / profil)")
+
+
+# ==================== EVALUATION VECTORIELLE ====================
+
+
+def bench_vectoriel(nb_profils=1000000, nb_verifies=100000, nb_branches=20):
+    """
+    Profils évalués par seconde par l'évaluation vectorielle (voir
+    evaluation_vectorielle) sur des colonnes NumPy, comparés à la machine
+    virtuelle (sur les premiers profils).
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        print("== Évaluation vectorielle : NumPy n'est pas installé ==")
+        return
+
+    from evaluation_vectorielle import Colonne, EvaluateurVectoriel
+    from vm import compiler_programme
+
+    ast, code = compiler_regles(conseil_profils(nb_branches))
+    evaluateur = EvaluateurVectoriel(ast)
+    programme = compiler_programme(code)
+
+    rng = np.random.default_rng(0)
+    colonnes = {
+        'age': rng.integers(0, 100, nb_profils),
+        'humeur': rng.choice(np.array(["triste", "joyeux", "calme"]), nb_profils),
+        'besoin': rng.choice(np.array(["conseil", "repos"]), nb_profils),
+    }
+    print(f"== Évaluation vectorielle ({nb_profils} profils) ==")
+
+    debut = time.perf_counter()
+    encodees = {nom: Colonne.depuis_valeurs(valeurs) for nom, valeurs in colonnes.items()}
+    encodage = time.perf_counter() - debut
+    debut = time.perf_counter()
+    evaluateur.evaluer(encodees)
+    evaluation = time.perf_counter() - debut
+    print(f"encodage des colonnes       : {encodage * 1000:10.1f} ms")
+    print(f"évaluation                  : {evaluation * 1000:10.1f} ms"
+          f"  ({nb_profils / evaluation:14,.0f} profils/s)")
+
+    profils = [{nom: valeurs[k].item() for nom, valeurs in colonnes.items()} for k in range(nb_verifies)]
+    debut = time.perf_counter()
+    programme.executer_lot(profils)
+    duree = time.perf_counter() - debut
+    print(f"machine virtuelle (par lot) : {duree * 1000:10.1f} ms"
+          f"  ({nb_verifies / duree:14,.0f} profils/s, {nb_verifies} profils)")
+    print(f"accélération                : {nb_profils / evaluation / (nb_verifies / duree):10.0f} x")
+
+
+# ==================== COMPILATION EN UNE PASSE ====================
+
+
+def bench_une_passe(nb_conditions=100000):
+    """
+    Compare, sur un conseil de nb_conditions conditions, l'analyse et la
+    génération du code intermédiaire en deux passes (arbre syntaxique
+    complet, puis analyse sémantique et traduction) et en une passe
+    (chaque condition est vérifiée et traduite dès sa réduction, voir
+    compiler_intermediaire) : durée et pic de mémoire. La suite de la
+    compilation (optimisation, assembleur) est la même.
+    """
+    import tracemalloc
+
+    from compilateur import compiler_intermediaire
+    from index_proverbes import ProverbIndex
+
+    index = ProverbIndex(DEFAULT_PROVERBES)
+    source = generer_conseil(nb_conditions // 2)
+
+    print(f"== Compilation en une passe ({nb_conditions} conditions, {len(source) // 1024} Kio) ==")
+    for nom, arbre in (("deux passes (arbre)", True), ("une passe (sans arbre)", False)):
+        meilleure = None
+        for _ in range(3):
+            debut = time.perf_counter()
+            compiler_intermediaire(source, index, arbre=arbre)
+            duree = time.perf_counter() - debut
+            meilleure = duree if meilleure is None else min(meilleure, duree)
+        tracemalloc.start()
+        diagnostics, _ = compiler_intermediaire(source, index, arbre=arbre)
+        pic = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        if diagnostics['erreurs']:
+            raise RuntimeError(diagnostics['erreurs'][0])
+        print(f"{nom:<24}: {meilleure * 1000:9.1f} ms   pic mémoire {pic / 2 ** 20:7.1f} Mio")
+
+
+# ==================== LEXER ====================
+
+
+def bench_lexer(nb_blocs=2000):
+    """
+    Compare les tokens par seconde des lexers PLY et à automate sur un gros
+    conseil (lignes répétées) et sur un conseil dont toutes les lignes sont
+    distinctes.
+    """
+    from analyseur import construire_lexer
+
+    print(f"== Lexer ({nb_blocs} blocs) ==")
+
+    distinct = "".join(f'si humeur{k} == "valeur {k}":\n'
+                       f'    afficher PROVERBE("{DEFAULT_PROVERBES["CONSEIL"]} {k}")\n'
+                       f'sinon si age{k} > {k}:\n'
+                       f'    afficher PROVERBE("{DEFAULT_PROVERBES["SAGESSE"]}") et PROVERBE("{k}")\n'
+                       for k in range(nb_blocs))
+    for nom, texte in (("lignes répétées", generer_conseil(nb_blocs)), ("lignes distinctes", distinct)):
+        for moteur in ('ply', 'dfa'):
+            lexer = construire_lexer(moteur)
+            meilleure = None
+            for _ in range(5):
+                lexer.input(texte)
+                token = lexer.token
+                debut = time.perf_counter()
+                nombre = 0
+                while token() is not None:
+                    nombre += 1
+                duree = time.perf_counter() - debut
+                meilleure = duree if meilleure is None else min(meilleure, duree)
+            print(f"{nom:<18} {moteur:<4} : {nombre / meilleure:12,.0f} tokens/s")
+
+
+# ==================== REPRISE SUR ERREUR ====================
+
+# Lignes erronées injectées (erreur syntaxique, puis lexicale)
+LIGNES_ERRONEES = ('si humeur == :', 'sinon si age > 50 #:')
+
+
+def bench_reprise(nb_lignes=50000, nb_erreurs=20):
+    """
+    Valide un conseil de nb_lignes lignes où nb_erreurs lignes sont
+    erronées : en boucle « corriger la première erreur et relancer
+    l'analyse » (une SyntaxError par passe) puis en une seule analyse avec
+    reprise (voir valider_source).
+    """
+    from analyseur import parse
+    from compilateur import valider_source
+    from index_proverbes import ProverbIndex
+
+    index = ProverbIndex(DEFAULT_PROVERBES)
+    lignes = generer_conseil(nb_lignes // 4).splitlines()
+    # Une erreur sur la ligne de test d'un bloc sur nb_lignes / nb_erreurs
+    pas = len(lignes) // nb_erreurs // 4 * 4
+    erronees = {k * pas + 2 * (k % 2): LIGNES_ERRONEES[k % 2] for k in range(nb_erreurs)}
+    print(f"== Reprise sur erreur ({len(lignes)} lignes, {nb_erreurs} erreurs) ==")
+
+    # Une passe par erreur : chaque passe corrige la première ligne erronée
+    debut = time.perf_counter()
+    courantes = dict(erronees)
+    passes = 0
+    while True:
+        passes += 1
+        texte = "\n".join(courantes.get(k, ligne) for k, ligne in enumerate(lignes))
+        try:
+            parse(texte, index)
+            break
+        except SyntaxError:
+            del courantes[min(courantes)]
+    print(f"{'une erreur par passe':<24}: {time.perf_counter() - debut:8.2f} s   {passes} analyses")
+
+    texte = "\n".join(erronees.get(k, ligne) for k, ligne in enumerate(lignes))
+    debut = time.perf_counter()
+    diagnostics = valider_source(texte, index)
+    duree = time.perf_counter() - debut
+    print(f"{'reprise en une passe':<24}: {duree:8.2f} s   1 analyse, {len(diagnostics.erreurs())} erreurs")
+
+
+BENCHMARKS = {
+    'demarrage': bench_demarrage,
+    'parallele': bench_parallele,
+    'regles': bench_regles,
+    'cache': bench_cache,
+    'memoire': bench_memoire,
+    'optimisation': bench_optimisation,
+    'assembleur': bench_assembleur,
+    'chaines': bench_chaines,
+    'flux': bench_flux,
+    'vm': bench_vm,
+    'vectoriel': bench_vectoriel,
+    'lexer': bench_lexer,
+    'une_passe': bench_une_passe,
+    'reprise': bench_reprise,
+}
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Benchmarks du compilateur de conseils")
+    arg_parser.add_argument('noms', nargs='*', metavar='nom',
+                            help=f"Benchmarks à exécuter parmi {', '.join(BENCHMARKS)} (tous par défaut)")
+    args = arg_parser.parse_args(argv)
+
+    inconnus = [nom for nom in args.noms if nom not in BENCHMARKS]
+    if inconnus:
+        arg_parser.error(f"benchmark inconnu: {', '.join(inconnus)}")
+
+    for nom in args.noms or BENCHMARKS:
+        BENCHMARKS[nom]()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""
+Cache des résultats de compilation, adressé par le contenu
+
+La clé combine l'empreinte du code source, la version du catalogue de
+proverbes et celle de la table des règles sémantiques : modifier l'un des
+trois donne une nouvelle clé, les anciennes entrées ne sont jamais relues.
+
+Deux niveaux :
+- en mémoire, les entrées les plus récemment utilisées (LRU)
+- sur disque (optionnel), un fichier par entrée, les moins récemment
+  utilisés étant supprimés au-delà d'une taille maximale
+
+Les valeurs rendues par le cache sont partagées : elles ne doivent pas être
+modifiées par l'appelant. Elles désignent des chaînes par leur identifiant
+(voir chaines) : le niveau mémoire est vidé quand la table des chaînes l'est.
+"""
+
+import hashlib
+import os
+import pickle
+from collections import OrderedDict
+
+from chaines import CHAINES
+
+# À incrémenter quand la forme des résultats mis en cache change
+VERSION_CACHE = 8
+
+# Extension des entrées du cache sur disque
+EXTENSION = '.pickle'
+
+
+def cle_compilation(code, index, regles, etape='compilation'):
+    """
+    Calcule la clé d'un résultat
+
+    Args:
+        code (str): Code source du conseil
+        index (ProverbIndex): Index du catalogue de proverbes (attribut version)
+        regles (IndexThemes): Règles sémantiques (attribut version)
+        etape (str): Nature du résultat mis en cache
+
+    Returns:
+        str: Clé hexadécimale, ou None si le catalogue ou les règles ne sont
+             pas versionnés (résultat à ne pas mettre en cache)
+    """
+    if index.version is None or regles.version is None:
+        return None
+    empreinte = hashlib.sha256(f"{VERSION_CACHE}\0{etape}\0{index.version}\0{regles.version}\0".encode('utf-8'))
+    empreinte.update(code.encode('utf-8'))
+    return empreinte.hexdigest()
+
+
+class CacheCompilation:
+    """
+    Cache à deux niveaux (mémoire LRU, puis disque) des résultats de compilation
+
+    Attributs:
+        capacite (int): Nombre maximal d'entrées en mémoire
+        dossier (str): Dossier du cache sur disque (None: mémoire seulement)
+        taille_max_disque (int): Taille maximale du cache sur disque (octets)
+        memoire (OrderedDict): Clé -> résultat, du moins au plus récent
+        succes_memoire (int): Résultats trouvés en mémoire
+        succes_disque (int): Résultats trouvés sur disque
+        echecs (int): Résultats absents du cache
+    """
+
+    def __init__(self, capacite=256, dossier=None, taille_max_disque=64 * 1024 * 1024):
+        self.capacite = capacite
+        self.dossier = dossier
+        self.taille_max_disque = taille_max_disque
+        self.memoire = OrderedDict()
+        self.generation = CHAINES.generation
+        self.succes_memoire = 0
+        self.succes_disque = 0
+        self.echecs = 0
+        self.taille_disque = 0
+        if dossier is not None:
+            os.makedirs(dossier, exist_ok=True)
+            self.taille_disque = sum(taille for _, taille, _ in self._entrees_disque())
+
+    @property
+    def succes(self):
+        """Nombre total de résultats trouvés dans le cache"""
+        return self.succes_memoire + self.succes_disque
+
+    def statistiques(self):
+        """Compteurs du cache (sérialisables en JSON)"""
+        total = self.succes + self.echecs
+        return {
+            'succes_memoire': self.succes_memoire,
+            'succes_disque': self.succes_disque,
+            'echecs': self.echecs,
+            'taux_succes': round(self.succes / total, 4) if total else None,
+            'entrees_memoire': len(self.memoire),
+            'taille_disque': self.taille_disque
+        }
+
+    # -------- Niveau mémoire --------
+
+    def _verifier_generation(self):
+        """Vide le niveau mémoire si la table des chaînes a été vidée depuis"""
+        if self.generation != CHAINES.generation:
+            self.memoire.clear()
+            self.generation = CHAINES.generation
+
+    def _memoriser(self, cle, valeur):
+        self.memoire[cle] = valeur
+        self.memoire.move_to_end(cle)
+        while len(self.memoire) > self.capacite:
+            self.memoire.popitem(last=False)
+
+    # -------- Niveau disque --------
+
+    def _chemin(self, cle):
+        return os.path.join(self.dossier, cle + EXTENSION)
+
+    def _entrees_disque(self):
+        """Fichiers du cache sur disque : (chemin, taille, date du dernier accès)"""
+        entrees = []
+        with os.scandir(self.dossier) as fichiers:
+            for fichier in fichiers:
+                if fichier.name.endswith(EXTENSION):
+                    try:
+                        etat = fichier.stat()
+                    except FileNotFoundError:  # supprimé par un autre processus
+                        continue
+                    entrees.append((fichier.path, etat.st_size, etat.st_mtime))
+        return entrees
+
+    def _lire_disque(self, cle):
+        chemin = self._chemin(cle)
+        try:
+            with open(chemin, 'rb') as f:
+                valeur = pickle.load(f)
+            os.utime(chemin)  # date du dernier accès, pour l'éviction
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+        return valeur
+
+    def _ecrire_disque(self, cle, valeur):
+        donnees = pickle.dumps(valeur, pickle.HIGHEST_PROTOCOL)
+        chemin = self._chemin(cle)
+        temporaire = f"{chemin}.{os.getpid()}.tmp"
+        try:
+            with open(temporaire, 'wb') as f:
+                f.write(donnees)
+            os.replace(temporaire, chemin)
+        except OSError:
+            return
+        self.taille_disque += len(donnees)
+        if self.taille_disque > self.taille_max_disque:
+            self._evincer()
+
+    def _evincer(self):
+        """Supprime les entrées les moins récemment utilisées jusqu'à 3/4 de la taille maximale"""
+        entrees = sorted(self._entrees_disque(), key=lambda entree: entree[2])
+        self.taille_disque = sum(taille for _, taille, _ in entrees)
+        for chemin, taille, _ in entrees:
+            if self.taille_disque <= self.taille_max_disque * 3 // 4:
+                break
+            try:
+                os.remove(chemin)
+            except FileNotFoundError:
+                pass
+            self.taille_disque -= taille
+
+    # -------- Interface --------
+
+    def obtenir(self, cle):
+        """
+        Cherche un résultat dans le cache
+
+        Returns:
+            Le résultat mis en cache, ou None s'il est absent
+        """
+        if cle is None:
+            return None
+        self._verifier_generation()
+        valeur = self.memoire.get(cle)
+        if valeur is not None:
+            self.memoire.move_to_end(cle)
+            self.succes_memoire += 1
+            return valeur
+        if self.dossier is not None:
+            valeur = self._lire_disque(cle)
+            if valeur is not None:
+                self._memoriser(cle, valeur)
+                self.succes_disque += 1
+                return valeur
+        self.echecs += 1
+        return None
+
+    def enregistrer(self, cle, valeur):
+        """Met un résultat en cache (ignoré si la clé est None)"""
+        if cle is None:
+            return
+        self._verifier_generation()
+        self._memoriser(cle, valeur)
+        if self.dossier is not None:
+            self._ecrire_disque(cle, valeur)
+
+    def vider(self):
+        """Vide le niveau mémoire (le cache sur disque est conservé)"""
+        self.memoire.clear()
@@ -0,0 +1,399 @@
+# -*- coding: utf-8 -*-
+"""
+Catalogue des proverbes (sans dépendance à l'interface graphique)
+
+Fournit les proverbes par défaut, la lecture/écriture du fichier texte
+proverbes.txt (une ligne "THEME:texte" par proverbe) et le format binaire
+compact proverbes.bin, ouvert par mmap, construit à partir du fichier texte :
+
+    python catalogue.py [proverbes.txt] [proverbes.bin]
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from bisect import bisect_left
+from collections.abc import Mapping
+from functools import cached_property
+
+# ==================== CONFIGURATION INITIALE ====================
+
+# Fichier de stockage des proverbes
+PROVERBES_FILE = "proverbes.txt"
+
+# Catalogue binaire construit à partir du fichier texte
+CATALOGUE_FILE = "proverbes.bin"
+
+# Proverbes par défaut (thème: texte)
+DEFAULT_PROVERBES = {
+    "CONSEIL": "أسمع كلام اللي يبكيك وماتسمعش كلام اللي يضحكك",
+    "MODERATION": "إذا صاحبك عسل ما تلحسوش الكل",
+    "SAGESSE": "إسأل مجرب ولا تسأل طبيب",
+    "PRUDENCE": "اللي خاف نجى",
+    "GENEROSITE": "أعمل الخير وارمي في البحر",
+    "ADAPTATION": "أعمل كيف جارك وإلا حول باب دارك",
+    "COURAGE": "اللي يخاف من العفريت يطلع له",
+    "PREVENTION": "شد مشومك لا يجيك ما اشوم",
+    "SANTE": "الصحة تاج على رؤوس الأصحاء",
+    "VAINE": "اللي ينام عالجرح يلاقي الربح",
+    "BIENETRE": "العقل السليم في الجسم السليم",
+    "RICHESSE": "اللي عندو ما يموتش",
+    "DETTE": "اللي عليه مليان، راهو خسران",
+    "SATISFACTION": "القناعة كنز لا يفنى",
+    "METEO": "اللي ما عندوش مطر، يستنا الندى",
+    "AGRICULTURE": "اللي يزرع حصاد",
+    "PATIENCE": "الصبر مفتاح الفرج",
+    "EDUCATION": "اللي يربّي العود يربّي الحصاد",
+    "FAMILLE": "اليد الواحدة ما تصفقش",
+    "TEMPS": "الوقت اللي ما يقدّرش يقدّرك",
+    "AGE": "الكبير كبير ولو طار",
+    "JEUNESSE": "اللي يستعجل ياكل خبز حار",
+    "EXPERIENCE": "الوقت شيخ",
+    "OPPORTUNITE": "اللي يغامر يربح",
+    "NAVIGATION": "المركب اللي ما تهزّش ما تمشّيش",
+    "PECHE": "اللي يخاف من الموج ما يفرشش",
+    "AMITIE": "إسأل على صاحبك إستغناش أما الطبيعة هي هي",
+    "TRAHISON": "البقرة كيف اتطيح تكثر اسكاكينها",
+    "ESPOIR_DECU": "عاش يتمني في عنبة مات جابولو عرجون",
+    "INEFFICACITE ": "جا يعاون فيه على قبر بوه هربلو بالفاس",
+    "REVANCHE": "الّي يبيعك بالفول بيعو بالقشور",
+    "INJUSTICE": "عريان يسلب في ميت",
+    "DESTINEE": "الي ليك لك و الي خاطيك خاطيك",
+    "ECHEC": "جا يكحلها عماها",
+    "VERITE": "اللي فيه طبة عمرها ماتتخبى",
+    "AUTOJUSTIFICATION": "ضربو على قرعتو قال شعري طاح",
+    "HERITAGE": "ولد الفار يطلع حفار",
+    "FOLIE": "مهبولة و زغرتولها في وذنها",
+    "OUBLI": "ملي دفنوه مازاروه",
+    "NOSTALGIE": "اللي يبدل لحية بلحية يجي نهار يشتاقهم لثنين",
+    "COINCIDENCE": "فردة ولقات اختها",
+    "ABUS": "اللي يكثر مالعسل يمصاط",
+    "IRONIE": "قلو يقوي سعدك قلو توة توة",
+    "CONTRASTE_ACTIONS": "أعملْ الخير وأنساه واعْمل الشّر وتفكره",
+    "RELIGION_TRAVAIL": "أعمِلْ الفرض وانقب الأرض",
+    "IMITATION": "أعمِلْ كيف جارك وإلا حول باب دارك",
+    "FIERTE": "إللّي يعْرف عِزَو كلام الناس ما يهزو",
+    "HUMILITE": "كلّي راسو فيها وكلّي دارو فيها",
+    "SOLIDARITE": "اللي ما يعرفك ما يثمنك",
+    "JUSTICE": "اللي يزرع الشوك ما يجنيش الورد",
+    "HONNETETE": "الصدق منجى والكذب مهلك",
+    "TRAVAIL": "اليد اللي ما تقرضش ما تلسعش",
+    "OPINIATRETE": "اللي ما يسمعش كلام الناس يسمع كلام الراس",
+    "CHANCE": "اللي ما يربحش في القرعة يربح في اللقعة",
+    "DISCERNEMENT": "اللي ما يعرف الصقر يشويه",
+    "OPPORTUNITE_PERDUE": "الفرصة ما تباتش تاني",
+    "TEMERITE": "اللي ما يخافش من الموت ما يخافش من الذكر",
+    "AVARICE": "اللي يبخل على نفسه كيفاش يبخل على الناس",
+    "MALCHANCE": "اللي ما يربحش في اللقعة يربح في القرعة",
+    "INGRATITUDE": "ربّي الكلب عاضك",
+    "HYPOCRISIE": "وجه حلو وقلب ملعون",
+    "FATALISME": "اللي كتب ليك يجيك ولو كان تحت الأرض",
+    "DETERMINATION": "اللي يخاف من العfريت يطلع له",
+    "ESPOIR": "الصبر مفتاح الفرج",
+    "TEMPERANCE": "اللي ياكل بزاف ياكلو بزاف",
+    "RECONNAISSANCE": "اللي يعمل المعروف يلقاه",
+    "MEFIANCE": "اللي يخاف من الشيطان يخاف من الظل",
+    "AMBITION": "اللي ما يطيرش عالعالية ينام في الحضيضة",
+    "RUSE": "اللي ما يعرفش يلعب بالعصا يلعب بالعصافير",
+    "CHARITE": "اليد اللي ما تعطي ما تاخدش",
+    "HABITUDE": "اللي يعود على الشيء يصير عليه",
+    "DILIGENCE": "اللي يستعجل ياكل خبز حار",
+    "PRESCIENCE": "اللي ما يعرفش آخر الدرب ما يمشيش في الليل",
+    "OPINIATRE": "اللي ما يسمعش كلام الناس يسمع كلام الراس",
+    "PERSEVERANCE": "اللي يضرب الحديد وهو بارد ما يطلعش منه نار",
+    "TEMERITE": "اللي ما يخافش من الموت ما يخافش من الذكر",
+    "CONFIANCE": "اللي يثق في الناس ينام قرير العين",
+    "MALADRESSE": "اللي ما يعرفش يسبح يقول المي عميقة",
+    "INGENIOSITE": "اللي ما عندوش حبل يربط به الحمار يربطه بذنبه",
+    "OPPORTUNISME": "اللي ما يعرفش يلعب بالعصا يلعب بالعصافير",
+    "PREVOYANCE": "اللي ما يخيطش جرابه ينام حافي",
+    "RENONCEMENT": "اللي ما يقدرش على العنب يقول حامض",
+    "AUDACE": "اللي ما يخافش من اللي يموت ما يخافش من اللي يذبح",
+    "FATIGUE": "اللي ما ينامش بالليل ينام بالنهار",
+    "OPPORTUNITE_SAISIE": "اللي يغتنم الفرصة ما يندمش",
+    "PRECAUTION": "اللي ما يخيطش جرابه ينام حافي",
+    "DISCIPLINE": "اللي ما يربّيش العود ما يربّيش الحصاد",
+    "HONNEUR": "اللي ما يخافش من الموت ما يخافش من الذكر",
+    "SERENITE": "اللي ما يهتمش بالدنيا ينام قرير العين"
+}
+
+# ==================== GESTION DES PROVERBES ====================
+
+
+def init_proverbes_file(chemin=PROVERBES_FILE):
+    """
+    Crée le fichier proverbes.txt s'il n'existe pas
+    avec les proverbes par défaut
+    """
+    if not os.path.exists(chemin):
+        with open(chemin, 'w', encoding='utf-8') as f:
+            for cle, val in DEFAULT_PROVERBES.items():
+                f.write(f"{cle}:{val}\n")
+
+
+def lire_proverbes(chemin=PROVERBES_FILE):
+    """
+    Lit les proverbes depuis le fichier texte
+
+    Args:
+        chemin (str): Chemin du fichier de proverbes
+
+    Returns:
+        dict: Dictionnaire des proverbes {thème: texte}
+
+    Raises:
+        OSError: Si le fichier ne peut pas être lu
+    """
+    proverbes = {}
+    with open(chemin, 'r', encoding='utf-8') as f:
+        for ligne in f:
+            if ':' in ligne:
+                cle, val = ligne.split(':', 1)
+                proverbes[cle.strip()] = val.strip()
+    return proverbes
+
+
+def version_catalogue(proverbes):
+    """
+    Retourne l'empreinte du contenu d'un catalogue
+
+    Args:
+        proverbes (Mapping): Catalogue {thème: texte} (dictionnaire ou catalogue binaire)
+
+    Returns:
+        str: Empreinte hexadécimale, qui change avec le moindre proverbe
+    """
+    version = getattr(proverbes, 'version', None)
+    if version is not None:
+        return version
+    empreinte = hashlib.sha256()
+    for theme, texte in proverbes.items():
+        empreinte.update(f"{theme}\0{texte}\n".encode('utf-8'))
+    return empreinte.hexdigest()[:16]
+
+# ==================== CATALOGUE BINAIRE ====================
+
+# Format (entiers non signés 32 bits, petit-boutiste) :
+#   en-tête        : signature, version, nombre de proverbes n
+#   entrées        : n x (début thème, longueur, début texte, longueur), ordre du catalogue
+#   index thèmes   : n x numéro d'entrée, triés par thème
+#   index textes   : n x numéro d'entrée, triés par texte (puis ordre du catalogue)
+#   blob           : thèmes et textes en UTF-8 (décalages relatifs au début du blob)
+# L'ordre des octets UTF-8 est celui des points de code : les recherches
+# dichotomiques se font directement sur les octets du fichier.
+SIGNATURE = b"PROVBIN1"
+EN_TETE = struct.Struct("<8sII")
+ENTREE = struct.Struct("<IIII")
+NUMERO = struct.Struct("<I")
+VERSION_FORMAT = 1
+
+
+def construire_catalogue_binaire(proverbes, chemin=CATALOGUE_FILE):
+    """
+    Écrit le catalogue binaire d'un dictionnaire de proverbes
+
+    Le fichier est écrit à côté (fichier temporaire unique) puis renommé :
+    un processus qui a déjà ouvert l'ancien catalogue continue de lire
+    l'ancienne version.
+
+    Args:
+        proverbes (dict): Dictionnaire des proverbes {thème: texte}
+        chemin (str): Fichier binaire à produire
+    """
+    blob = bytearray()
+    entrees = []
+    themes, textes = [], []
+    for numero, (theme, texte) in enumerate(proverbes.items()):
+        theme_utf8, texte_utf8 = theme.encode('utf-8'), texte.encode('utf-8')
+        entrees.append((len(blob), len(theme_utf8), len(blob) + len(theme_utf8), len(texte_utf8)))
+        blob += theme_utf8
+        blob += texte_utf8
+        themes.append((theme_utf8, numero))
+        textes.append((texte_utf8, numero))
+    themes.sort()
+    textes.sort()
+
+    # Fichier temporaire propre à cet appel : deux constructions simultanées
+    # (interface et CLI, processus d'un pool) n'écrivent pas dans le même
+    descripteur, temporaire = tempfile.mkstemp(prefix=os.path.basename(chemin) + '.',
+                                               suffix='.tmp', dir=os.path.dirname(chemin) or '.')
+    try:
+        with os.fdopen(descripteur, 'wb') as f:
+            f.write(EN_TETE.pack(SIGNATURE, VERSION_FORMAT, len(entrees)))
+            f.write(b"".join(ENTREE.pack(*entree) for entree in entrees))
+            f.write(b"".join(NUMERO.pack(numero) for _, numero in themes))
+            f.write(b"".join(NUMERO.pack(numero) for _, numero in textes))
+            f.write(blob)
+        os.chmod(temporaire, 0o644)
+        os.replace(temporaire, chemin)
+    except BaseException:
+        os.unlink(temporaire)
+        raise
+
+
+class CatalogueBinaire(Mapping):
+    """
+    Catalogue de proverbes lu directement dans un fichier projeté en mémoire
+
+    Se comporte comme un dictionnaire {thème: texte} en lecture seule, sans
+    charger le catalogue : une recherche par thème ou par texte est une
+    dichotomie sur les tables du fichier. Seuls les octets consultés sont
+    lus (chaque tranche du fichier en est une copie) : les clés comparées
+    pendant la dichotomie et les chaînes demandées, seules décodées. Les processus qui ouvrent le même fichier partagent ses
+    pages ; transmis à un autre processus, le catalogue y est rouvert par
+    son chemin au lieu d'être copié.
+
+    Attributs:
+        chemin (str): Fichier du catalogue
+        n (int): Nombre de proverbes
+    """
+
+    def __init__(self, chemin=CATALOGUE_FILE):
+        self.chemin = chemin
+        with open(chemin, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        signature, version, self.n = EN_TETE.unpack_from(self._mm, 0)
+        if signature != SIGNATURE or version != VERSION_FORMAT:
+            self._mm.close()
+            raise ValueError(f"{chemin}: catalogue binaire invalide ou d'une autre version")
+        self._entrees = EN_TETE.size
+        self._index_themes = self._entrees + self.n * ENTREE.size
+        self._index_textes = self._index_themes + self.n * NUMERO.size
+        self._blob = self._index_textes + self.n * NUMERO.size
+
+    def __reduce__(self):
+        return CatalogueBinaire, (self.chemin,)
+
+    @cached_property
+    def version(self):
+        """Empreinte du fichier (voir version_catalogue)"""
+        return hashlib.sha256(self._mm).hexdigest()[:16]
+
+    def close(self):
+        """Libère la projection du fichier"""
+        self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -------- Accès aux tables --------
+
+    def _entree(self, numero):
+        """Retourne (début thème, fin thème, début texte, fin texte) dans le fichier"""
+        debut_theme, lg_theme, debut_texte, lg_texte = ENTREE.unpack_from(
+            self._mm, self._entrees + numero * ENTREE.size)
+        debut_theme += self._blob
+        debut_texte += self._blob
+        return debut_theme, debut_theme + lg_theme, debut_texte, debut_texte + lg_texte
+
+    def _numero(self, table, rang):
+        return NUMERO.unpack_from(self._mm, table + rang * NUMERO.size)[0]
+
+    def _rechercher(self, table, champ, cle):
+        """Dichotomie sur une table d'index ; retourne le numéro d'entrée ou None"""
+        cle = cle.encode('utf-8')
+
+        def valeur(rang):
+            entree = self._entree(self._numero(table, rang))
+            return self._mm[entree[champ]:entree[champ + 1]]
+
+        rang = bisect_left(range(self.n), cle, key=valeur)
+        if rang < self.n and valeur(rang) == cle:
+            return self._numero(table, rang)
+        return None
+
+    def _texte(self, debut, fin):
+        return str(self._mm[debut:fin], 'utf-8')
+
+    # -------- Interface dictionnaire --------
+
+    def __len__(self):
+        return self.n
+
+    def __iter__(self):
+        for numero in range(self.n):
+            debut_theme, fin_theme, _, _ = self._entree(numero)
+            yield self._texte(debut_theme, fin_theme)
+
+    def __getitem__(self, theme):
+        numero = self._rechercher(self._index_themes, 0, theme) if isinstance(theme, str) else None
+        if numero is None:
+            raise KeyError(theme)
+        _, _, debut_texte, fin_texte = self._entree(numero)
+        return self._texte(debut_texte, fin_texte)
+
+    def items(self):
+        """Couples (thème, texte) dans l'ordre du catalogue"""
+        for numero in range(self.n):
+            debut_theme, fin_theme, debut_texte, fin_texte = self._entree(numero)
+            yield self._texte(debut_theme, fin_theme), self._texte(debut_texte, fin_texte)
+
+    def values(self):
+        """Textes des proverbes dans l'ordre du catalogue"""
+        for _, texte in self.items():
+            yield texte
+
+    def entree(self, numero):
+        """Couple (thème, texte) du proverbe numero (ordre du catalogue)"""
+        debut_theme, fin_theme, debut_texte, fin_texte = self._entree(numero)
+        return self._texte(debut_theme, fin_theme), self._texte(debut_texte, fin_texte)
+
+    def theme_de(self, texte):
+        """
+        Recherche le thème d'un proverbe par son texte exact
+
+        Returns:
+            str: Premier thème (ordre du catalogue) ayant ce texte, ou None
+        """
+        numero = self._rechercher(self._index_textes, 2, texte)
+        if numero is None:
+            return None
+        debut_theme, fin_theme, _, _ = self._entree(numero)
+        return self._texte(debut_theme, fin_theme)
+
+
+def ouvrir_catalogue(chemin=PROVERBES_FILE, chemin_binaire=None):
+    """
+    Ouvre un catalogue de proverbes
+
+    Un fichier texte est d'abord converti au format binaire si celui-ci est
+    absent ou plus ancien : le fichier chemin_binaire (par défaut à côté du
+    fichier texte, avec l'extension .bin) est alors écrit. S'il ne peut pas
+    l'être (dossier en lecture seule, disque plein), le catalogue est gardé
+    en mémoire dans un dictionnaire. Un fichier binaire est ouvert
+    directement.
+
+    Returns:
+        Mapping: Catalogue projeté en mémoire (CatalogueBinaire), ou
+                 dictionnaire si le fichier binaire n'a pas pu être écrit
+
+    Raises:
+        OSError: Si le fichier ne peut pas être lu
+        ValueError: Si le fichier binaire est invalide
+    """
+    if chemin.endswith('.bin'):
+        return CatalogueBinaire(chemin)
+    if chemin_binaire is None:
+        chemin_binaire = os.path.splitext(chemin)[0] + '.bin'
+    if (not os.path.exists(chemin_binaire)
+            or os.path.getmtime(chemin_binaire) < os.path.getmtime(chemin)):
+        proverbes = lire_proverbes(chemin)
+        try:
+            construire_catalogue_binaire(proverbes, chemin_binaire)
+        except OSError:
+            return proverbes
+    return CatalogueBinaire(chemin_binaire)
+
+
+if __name__ == "__main__":
+    source = sys.argv[1] if len(sys.argv) > 1 else PROVERBES_FILE
+    cible = sys.argv[2] if len(sys.argv) > 2 else os.path.splitext(source)[0] + '.bin'
+    proverbes = lire_proverbes(source)
+    construire_catalogue_binaire(proverbes, cible)
+    print(f"{len(proverbes)} proverbe(s) écrit(s) dans {cible}")
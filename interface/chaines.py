@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+Table d'internement des chaînes du compilateur
+
+Chaque chaîne distincte (identifiant, valeur, thème, texte de proverbe,
+proverbe vérifié) reçoit un petit identifiant entier. La table est partagée
+par le lexer, le parser, l'analyseur sémantique et les deux générateurs de
+code : les nœuds de l'AST et le code intermédiaire désignent les chaînes par
+leur identifiant, et chaque texte n'est stocké qu'une fois, quel que soit le
+nombre de fois où il est cité.
+
+Les identifiants sont propres au processus : ce qui est transmis à un autre
+processus ou écrit sur disque doit l'être sous forme de chaînes.
+
+La table ne fait que grandir : un processus qui dure (interface, service)
+la vide avec CHAINES.vider() quand les résultats qui en dépendent peuvent
+être abandonnés, par exemple au rechargement du catalogue. Les caches en
+mémoire de ces résultats comparent CHAINES.generation à celle de leurs
+entrées et se vident d'eux-mêmes.
+
+Les ajouts et le vidage sont protégés par un verrou : des threads qui
+internent des chaînes en même temps (analyses parallèles) n'obtiennent
+jamais le même identifiant pour deux chaînes différentes. La lecture d'une
+chaîne déjà connue se fait sans verrou.
+"""
+
+import threading
+
+
+class TableChaines:
+    """
+    Correspondance chaîne <-> identifiant entier (ajout seulement, jusqu'à
+    vider())
+
+    Attributs:
+        ids (dict): Chaîne -> identifiant
+        chaines (list): Identifiant -> chaîne
+        generation (int): Nombre de vidages (les identifiants d'une
+            génération précédente n'ont plus de sens)
+    """
+
+    def __init__(self):
+        self.ids = {}
+        self.chaines = []
+        self.generation = 0
+        self._vidages = []
+        self._verrou = threading.RLock()
+
+    def __len__(self):
+        return len(self.chaines)
+
+    def __contains__(self, chaine):
+        return chaine in self.ids
+
+    def identifiant(self, chaine):
+        """Retourne l'identifiant d'une chaîne (ajoutée à la table si besoin)"""
+        ident = self.ids.get(chaine)
+        if ident is None:
+            with self._verrou:
+                ident = self.ids.get(chaine)
+                if ident is None:
+                    # Chaîne ajoutée avant son identifiant : un lecteur sans
+                    # verrou qui trouve l'identifiant trouve aussi la chaîne
+                    self.chaines.append(chaine)
+                    ident = self.ids[chaine] = len(self.chaines) - 1
+        return ident
+
+    def chaine(self, ident):
+        """Retourne la chaîne d'un identifiant"""
+        return self.chaines[ident]
+
+    def canonique(self, chaine):
+        """Retourne l'exemplaire de la table égal à la chaîne (partagé)"""
+        return self.chaines[self.identifiant(chaine)]
+
+    def au_vidage(self, fonction):
+        """Enregistre une fonction appelée par vider() (tables de module dérivées de celle-ci)"""
+        self._vidages.append(fonction)
+
+    def vider(self):
+        """
+        Oublie toutes les chaînes et passe à la génération suivante
+
+        À appeler entre deux compilations : les nœuds et le code
+        intermédiaire déjà construits désignent des identifiants qui n'ont
+        plus de sens (leurs formes sérialisées, en chaînes, restent valides).
+        """
+        with self._verrou:
+            self.ids.clear()
+            del self.chaines[:]
+            self.generation += 1
+            for fonction in self._vidages:
+                fonction()
+
+
+# Table unique du compilateur
+CHAINES = TableChaines()
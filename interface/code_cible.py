@@ -0,0 +1,317 @@
+# -*- coding: utf-8 -*-
+import io
+
+from allocation import allouer_registres, intervalles_de_vie, vivants_par_position
+from instructions import Etiquette, Op, Temp, Var
+from peephole import optimiser_asm
+from pool_chaines import PoolChaines
+
+# ============ GÉNÉRATEUR DE CODE CIBLE (NASM x86) ============
+
+# Instruction setcc selon l'opérateur de comparaison
+SETCC = {
+    Op.EGAL: "sete",
+    Op.DIFFERENT: "setne",
+    Op.SUPERIEUR: "setg",
+    Op.INFERIEUR: "setl",
+    Op.SUP_EGAL: "setge",
+    Op.INF_EGAL: "setle",
+}
+
+
+class TargetCodeGenerator:
+    """
+    Traduit le code intermédiaire (liste de Quadruplet, voir instructions) en
+    assembleur NASM x86 32 bits
+
+    Les temporaires sont placés dans des registres par balayage linéaire
+    (voir allocation), ceux qui n'y tiennent pas dans des emplacements
+    [ebp-4k] du cadre de pile ; les variables du conseil sont des entrées du
+    programme (section .bss) ; les comparaisons avec une chaîne passent par
+    strcmp. Le tampon d'un affichage est la chaîne constante elle-même
+    (section .data) : stocke_chaine en place l'adresse dans le temporaire,
+    allouer_tampon ne produit aucune instruction. Le corps est ensuite
+    simplifié par l'optimiseur à lucarne (voir peephole).
+
+    Args:
+        registres (bool): Allouer des registres aux temporaires (sinon
+            chaque temporaire tN occupe le mot [ebp-4N])
+        peephole (bool): Appliquer l'optimiseur à lucarne
+        chaines_externes (bool): Déclarer les chaînes constantes extern
+            (labels nommés d'après leur contenu) au lieu de les écrire dans
+            la section .data : elles sont définies une seule fois pour tout
+            un lot (voir pool_chaines.assembleur_donnees)
+    """
+
+    # Nombre minimal d'instructions d'un segment du corps (voir ecrire_asm)
+    TAILLE_SEGMENT = 4096
+
+    def __init__(self, registres=True, peephole=True, chaines_externes=False):
+        self.registres = registres
+        self.peephole = peephole
+        self.chaines_externes = chaines_externes
+        self.reset_generator()
+        self._handlers = {
+            Op.COPIE: self._handle_copy,
+            Op.ALLOUER: self._handle_alloc,
+            Op.STOCKE: self._handle_store_string,
+            Op.SYSTEME: self._handle_print,
+            Op.SI_FAUX: self._handle_cond_jump,
+            Op.SAUT: self._handle_jump,
+            Op.LABEL: self._handle_label,
+        }
+        for op in SETCC:
+            self._handlers[op] = self._gen_comparison
+
+    def reset_generator(self):
+        self.asm_output = []
+        self.corps = []          # instructions du corps (tuples, voir peephole)
+        self.pool = PoolChaines(partage=self.chaines_externes)  # chaînes constantes
+        self.variables = {}      # variable du conseil -> label
+        self.emplacements = {}   # temporaire -> registre ou mot de la pile
+        self.frame_size = 0      # octets réservés sur la pile pour les temporaires
+
+    def generate_asm(self, intermediate_code):
+        """Retourne l'assembleur du code intermédiaire (voir ecrire_asm)"""
+        flux = io.StringIO()
+        self.ecrire_asm(intermediate_code, flux)
+        return flux.getvalue()[:-1]
+
+    def ecrire_asm(self, intermediate_code, flux):
+        """
+        Écrit l'assembleur du code intermédiaire dans un flux texte au fur et
+        à mesure de sa production
+
+        Le corps est traduit et optimisé par segments d'au moins
+        TAILLE_SEGMENT instructions (jamais entre une comparaison et le saut
+        qui la teste) : l'optimiseur à lucarne reçoit les emplacements des
+        temporaires vivants aux bords du segment, et seul le segment en
+        cours est gardé en mémoire. Les
+        sections .data et .bss sont écrites à la fin, depuis le pool des
+        chaînes (qui ne garde que les identifiants des textes) et la table
+        des variables.
+
+        Args:
+            intermediate_code (list): Instructions (Quadruplet)
+            flux: Flux texte (fichier ouvert en écriture, io.StringIO, ...)
+        """
+        self.reset_generator()
+        intervalles = intervalles_de_vie(intermediate_code)
+        if self.registres:
+            self._allouer(intermediate_code, intervalles)
+        else:
+            for intervalle in intervalles:
+                self._offset(intervalle.temp)
+        if self.chaines_externes:
+            self._declarer_chaines(intermediate_code)
+
+        self._emit_header()
+        self._vider(flux)
+
+        # Traduction instruction par instruction, segment par segment
+        entree = set()  # emplacements vivants au début du segment en cours
+        positions = vivants_par_position(intervalles, len(intermediate_code))
+        for instr, vivants in zip(intermediate_code, positions):
+            self._handlers[instr.op](instr)
+            if len(self.corps) >= self.TAILLE_SEGMENT and instr.op not in SETCC:
+                sortie = {self._slot(temp) for temp in vivants}
+                self._ecrire_segment(flux, entree | sortie)
+                entree = sortie
+        self._ecrire_segment(flux, entree, dernier=True)
+
+        self._emit_footer()
+
+        # Ajout des données
+        self._emit_string_table()
+        self._emit_variables()
+        self._vider(flux)
+
+    def _allouer(self, intermediate_code, intervalles):
+        """Place les temporaires dans des registres ou des mots de la pile (voir allocation)"""
+        allocation = allouer_registres(intermediate_code, intervalles=intervalles)
+        self.emplacements = allocation.registres
+        for temp, emplacement in allocation.emplacements.items():
+            self.emplacements[temp] = f"dword [ebp-{4 * (emplacement + 1)}]"
+        self.frame_size = 4 * allocation.nb_emplacements
+
+    def _ecrire_segment(self, flux, exterieurs, dernier=False):
+        """
+        Optimise et écrit le segment en cours du corps
+
+        Args:
+            exterieurs (set): Emplacements vivants à l'entrée ou à la sortie
+                du segment (un saut hors du segment ne mène qu'à l'un de
+                ces bords)
+        """
+        corps = optimiser_asm(self.corps, exterieurs) if self.peephole else self.corps
+        # Un saut final est gardé pour le segment suivant (il peut viser
+        # l'étiquette qui commence celui-ci)
+        self.corps = [corps.pop()] if corps and corps[-1][0] == "jmp" and not dernier else []
+        self.asm_output.extend(map(formater, corps))
+        self._vider(flux)
+
+    def _vider(self, flux):
+        """Écrit les lignes en attente dans le flux"""
+        for ligne in self.asm_output:
+            flux.write(ligne)
+            flux.write("\n")
+        self.asm_output = []
+
+    def _declarer_chaines(self, intermediate_code):
+        """Ajoute au pool, avant l'en-tête qui les déclare extern, les chaînes du code"""
+        for instr in intermediate_code:
+            if instr.op is Op.STOCKE:
+                self.pool.label_identifiant(instr.arg2)
+            elif instr.op in SETCC:
+                for operande in (instr.arg2, instr.arg1):
+                    if type(operande) is str:
+                        self._get_string_label(operande)
+
+    def _emit_header(self):
+        self.asm_output.extend([
+            "; Généré automatiquement par le compilateur",
+            "section .text",
+            "global _start",
+            "extern printf, strcmp, exit",
+        ])
+        if self.chaines_externes and len(self.pool):
+            self.asm_output.append("extern " + ", ".join(label for label, _ in self.pool.textes()))
+        self.asm_output.extend([
+            "",
+            "_start:",
+            "    push ebp",
+            "    mov ebp, esp",
+            f"    sub esp, {self.frame_size}  ; Allocation variables"
+        ])
+
+    def _emit_footer(self):
+        self.asm_output.extend([
+            "    mov esp, ebp",
+            "    pop ebp",
+            "    mov eax, 1      ; sys_exit",
+            "    xor ebx, ebx    ; status 0",
+            "    int 0x80"
+        ])
+
+    def _emit_string_table(self):
+        self.asm_output.append("\nsection .data")
+        self.asm_output.append('printf_format: db "%s", 10, 0')
+        if not self.chaines_externes:
+            self.asm_output.extend(self.pool.donnees())
+
+    def _emit_variables(self):
+        if self.variables:
+            self.asm_output.append("\nsection .bss")
+            for var, label in self.variables.items():
+                self.asm_output.append(f"{label}: resd 1  ; {var.nom}")
+
+    # -------- Traduction des instructions --------
+
+    def _gen_comparison(self, instr):
+        """resultat = arg1 op arg2 (entiers, ou chaînes comparées par strcmp)"""
+        a, b = instr.arg1, instr.arg2
+        if type(a) is str or type(b) is str:
+            self.corps.extend([
+                ("push", self._operand(b)),
+                ("push", self._operand(a)),
+                ("call", "strcmp"),
+                ("add", "esp", "8"),
+                ("cmp", "eax", "0")
+            ])
+        else:
+            self.corps.extend([
+                ("mov", "eax", self._operand(a)),
+                ("cmp", "eax", self._operand(b))
+            ])
+        self.corps.extend([
+            (SETCC[instr.op], "al"),
+            ("movzx", "eax", "al"),
+            ("mov", self._slot(instr.resultat), "eax")
+        ])
+
+    def _handle_copy(self, instr):
+        valeur = instr.arg1
+        if type(valeur) in (Temp, Var):
+            self.corps.extend([
+                ("mov", "eax", self._operand(valeur)),
+                ("mov", self._slot(instr.resultat), "eax")
+            ])
+        else:
+            self.corps.append(("mov", self._slot(instr.resultat), self._operand(valeur)))
+
+    def _handle_alloc(self, instr):
+        """Le tampon est la chaîne constante (voir _handle_store_string)"""
+        self._slot(instr.resultat)
+
+    def _handle_store_string(self, instr):
+        label = self.pool.label_identifiant(instr.arg2)
+        self.corps.append(("mov", self._slot(instr.arg1), label))
+
+    def _handle_print(self, instr):
+        if instr.arg1 != 'afficher':
+            self.corps.append((f"; Service système non reconnu: {instr.arg1}",))
+            return
+        self.corps.extend([
+            ("push", self._slot(instr.arg2)),
+            ("push", "printf_format"),
+            ("call", "printf"),
+            ("add", "esp", "8")
+        ])
+
+    def _handle_cond_jump(self, instr):
+        self.corps.extend([
+            ("cmp", self._slot(instr.arg1), "0"),
+            ("je", str(instr.resultat))
+        ])
+
+    def _handle_label(self, instr):
+        self.corps.append(("label", str(instr.arg1)))
+
+    def _handle_jump(self, instr):
+        self.corps.append(("jmp", str(instr.resultat)))
+
+    # -------- Opérandes --------
+
+    def _offset(self, temp):
+        """Gère l'allocation mémoire des temporaires (t1 -> ebp-4, t2 -> ebp-8, ...)"""
+        offset = 4 * temp
+        if offset > self.frame_size:
+            self.frame_size = offset
+        return offset
+
+    def _slot(self, temp):
+        """Emplacement d'un temporaire : registre alloué ou mot de la pile"""
+        emplacement = self.emplacements.get(temp)
+        if emplacement is None:
+            emplacement = self.emplacements[temp] = f"dword [ebp-{self._offset(temp)}]"
+        return emplacement
+
+    def _operand(self, operande):
+        """Opérande source : temporaire, variable, nombre ou chaîne constante"""
+        if type(operande) is Temp:
+            return self._slot(operande)
+        if type(operande) is Var:
+            label = self.variables.get(operande)
+            if label is None:
+                label = self.variables[operande] = f"var_{len(self.variables)}"
+            return f"dword [{label}]"
+        if type(operande) is str:
+            return self._get_string_label(operande)
+        if type(operande) is Etiquette:
+            raise ValueError(f"Étiquette {operande} utilisée comme opérande")
+        return str(int(operande))
+
+    def _get_string_label(self, text):
+        """Gère les chaînes constantes (un label par chaîne distincte, voir pool_chaines)"""
+        return self.pool.label(text)
+
+
+def formater(instr):
+    """Ligne d'assembleur d'une instruction du corps (tuple, voir peephole)"""
+    if instr[0] == "label":
+        return f"{instr[1]}:"
+    if instr[0].startswith(";"):
+        return instr[0]
+    if len(instr) == 1:
+        return f"    {instr[0]}"
+    return f"    {instr[0]} {', '.join(instr[1:])}"
@@ -1,27 +1,83 @@
 # -*- coding: utf-8 -*-
+from chaines import CHAINES
+from instructions import (Op, allouer, appel_systeme, comparaison, ecrire, etiquette, label, saut, si_faux,
+                          stocke_chaine, temporaire, variable)
+from noeuds import Condition, Display, ElseIfCondition, depuis_tuples
+from optimiseur import optimiser
+
 # ============ GÉNÉRATEUR DE CODE INTERMÉDIAIRE ============
 
 class IntermediateCodeGenerator:
+    # Nombre minimal de branches "var > nombre" compilées en arbre de décision
+    SEUIL_ARBRE = 4
+
     def __init__(self):
         self.temp_counter = 0  # Compteur pour les variables temporaires
         self.label_counter = 0  # Compteur pour les labels
-        self.code = []         # Liste des instructions générées
-        self.current_ctx = []  # Contexte pour les conditions imbriquées
+        self.code = []         # Liste des instructions générées (Quadruplet)
+        self.chaines = {}      # Chaînes référencées par le code (identifiant -> texte)
+        self.verifies = {}     # (statut, thème, texte) -> identifiant du proverbe vérifié
+        self._chaine = []      # Chaîne SI / SINON SI en cours (voir feed)
 
     def new_temp(self):
         """Génère un nouveau nom de variable temporaire"""
         self.temp_counter += 1
-        return f"t{self.temp_counter}"
+        return temporaire(self.temp_counter)
 
     def new_label(self):
         """Génère un nouveau label"""
         self.label_counter += 1
-        return f"L{self.label_counter}"
+        return etiquette(self.label_counter)
 
     def generate(self, ast):
-        """Point d'entrée principal pour la génération de code"""
+        """
+        Point d'entrée principal pour la génération de code
+
+        Le code est une liste de quadruplets (voir instructions). Les chaînes
+        sont désignées par leur identifiant (stocke_chaine t1, #12) ;
+        self.chaines donne les textes utilisés et lister() la forme lisible.
+        """
+        self.begin()
+        for node in (ast if isinstance(ast, list) else [ast]):
+            self.feed(node)
+        return self.finish()
+
+    def begin(self):
+        """
+        Commence une génération en flux : les noeuds de premier niveau sont
+        fournis un par un à feed (par exemple par le parser, au fur et à
+        mesure de l'analyse), puis finish rend le code
+        """
         self.code = []
-        self._generate_node(ast)
+        self.chaines = {}
+        # Identifiants de la génération actuelle de CHAINES (vider() a pu
+        # passer depuis la génération précédente)
+        self.verifies = {}
+        self._chaine = []
+
+    def feed(self, node):
+        """
+        Génère le code d'un noeud de premier niveau
+
+        Seule la chaîne SI / SINON SI en cours est gardée : elle est générée
+        quand un noeud qui ne la continue pas arrive (ou par finish).
+        """
+        if isinstance(node, ElseIfCondition) and self._chaine:
+            self._chaine.append(node)
+            return
+        if self._chaine:
+            self._generate_chain(self._chaine)
+            self._chaine = []
+        if isinstance(node, Condition):
+            self._chaine = [node]
+        else:
+            self._generate_node(node)
+
+    def finish(self):
+        """Termine la génération en flux ; retourne le code"""
+        if self._chaine:
+            self._generate_chain(self._chaine)
+            self._chaine = []
         return self.code
 
     def _generate_node(self, node):
@@ -29,75 +85,168 @@ class IntermediateCodeGenerator:
         if not node:
             return
 
-        node_type = node[0]
-        
-        if node_type == 'CONDITION':
-            self._generate_condition(node)
-        elif node_type == 'AFFICHER':
+        if isinstance(node, Condition):
+            self._generate_chain([node])
+        elif isinstance(node, Display):
             self._generate_print(node)
         elif isinstance(node, list):
+            # Un SI et les SINON SI qui le suivent forment une seule chaîne
+            chain = []
             for n in node:
-                self._generate_node(n)
-
-    def _generate_condition(self, node):
-        """Génère le code pour une structure conditionnelle"""
-        if len(node) == 5:  # SI condition
-            _, var, op, val, actions = node
-            end_label = self.new_label()
-            
-            # Génération de la comparaison
-            temp = self.new_temp()
-            self.code.append(f"{temp} = {var} {op} {val}")
-            self.code.append(f"ifFalse {temp} goto {end_label}")
-            
-            # Génération des actions
-            self._generate_node(actions)
-            self.code.append(f"label {end_label}")
-            
-        elif len(node) == 6:  # SINON SI condition
-            _, _, var, op, val, actions = node
-            end_label = self.current_ctx[-1]['end_label'] if self.current_ctx else self.new_label()
-            
-            temp = self.new_temp()
-            self.code.append(f"{temp} = {var} {op} {val}")
-            self.code.append(f"ifFalse {temp} goto {end_label}")
-            
-            self._generate_node(actions)
+                if isinstance(n, ElseIfCondition) and chain:
+                    chain.append(n)
+                    continue
+                if chain:
+                    self._generate_chain(chain)
+                    chain = []
+                if isinstance(n, Condition):
+                    chain = [n]
+                else:
+                    self._generate_node(n)
+            if chain:
+                self._generate_chain(chain)
+
+    def _generate_chain(self, branches):
+        """
+        Génère le code d'une chaîne SI / SINON SI : seule la première branche
+        dont la condition est vraie est exécutée, puis un saut mène à la fin
+        commune de la chaîne
+
+        Une suite d'au moins SEUIL_ARBRE branches "var > nombre" sur la même
+        variable est compilée en arbre de décision (voir _generate_tree).
+        """
+        end_label = self.new_label()
+        i = 0
+        while i < len(branches):
+            j = i
+            while j < len(branches) and self._same_threshold_test(branches[i], branches[j]):
+                j += 1
+            if j - i >= self.SEUIL_ARBRE:
+                next_label = self.new_label() if j < len(branches) else end_label
+                self._generate_tree(branches[i:j], next_label, end_label)
+                i = j
+            else:
+                node = branches[i]
+                next_label = self.new_label() if i + 1 < len(branches) else end_label
+                temp = self.new_temp()
+                self.code.append(comparaison(temp, variable(node.var), node.op, node.val))
+                self.code.append(si_faux(temp, next_label))
+                self._generate_node(node.actions)
+                self.code.append(saut(end_label))
+                i += 1
+            self._place_label(next_label)
+
+    @staticmethod
+    def _same_threshold_test(first, node):
+        """Vrai si node teste "var > nombre" sur la même variable que first"""
+        return (node.op == '>' and first.op == '>' and node.var_id == first.var_id
+                and isinstance(node.val, int) and isinstance(first.val, int))
+
+    def _generate_tree(self, branches, next_label, end_label):
+        """
+        Arbre de décision pour des branches "var > seuil" sur une même variable
+
+        Les seuils découpent les valeurs de la variable en intervalles ; dans
+        chacun, la branche exécutée est la première dont le seuil est dépassé
+        (aucune si tous les seuils sont au-dessus). Une recherche
+        dichotomique sur les bornes mène à la branche en
+        O(log n) comparaisons au lieu de n.
+        """
+        var = variable(branches[0].var)
+        seuils = sorted({node.val for node in branches})
+
+        # Intervalles (borne supérieure, indice de la branche exécutée) ; le
+        # dernier n'a pas de borne. Les intervalles voisins qui mènent à la
+        # même branche sont fusionnés.
+        intervalles = []
+        for k in range(len(seuils) + 1):
+            plancher = seuils[k - 1] if k else None
+            choix = None
+            if plancher is not None:
+                choix = next(b for b, node in enumerate(branches) if node.val <= plancher)
+            borne = seuils[k] if k < len(seuils) else None
+            if intervalles and intervalles[-1][1] == choix:
+                intervalles[-1] = (borne, choix)
+            else:
+                intervalles.append((borne, choix))
+
+        corps = {choix: self.new_label() for _, choix in intervalles if choix is not None}
+        self._generate_search(var, intervalles, 0, len(intervalles) - 1,
+                              lambda choix: corps[choix] if choix is not None else next_label)
+
+        # Corps des branches atteignables (dans l'ordre du source)
+        for b in sorted(corps):
+            self._place_label(corps[b])
+            self._generate_node(branches[b].actions)
+            self.code.append(saut(end_label))
+
+    def _generate_search(self, var, intervalles, debut, fin, cible):
+        """Recherche dichotomique de l'intervalle de var parmi intervalles[debut:fin + 1]"""
+        if debut == fin:
+            self.code.append(saut(cible(intervalles[debut][1])))
+            return
+        milieu = (debut + fin) // 2
+        gauche = self.new_label()
+        temp = self.new_temp()
+        self.code.append(comparaison(temp, var, '>', intervalles[milieu][0]))
+        self.code.append(si_faux(temp, gauche))
+        self._generate_search(var, intervalles, milieu + 1, fin, cible)
+        self._place_label(gauche)
+        self._generate_search(var, intervalles, debut, milieu, cible)
+
+    def _place_label(self, name):
+        """Place un label (un saut vers lui juste avant est supprimé)"""
+        if self.code and self.code[-1].op is Op.SAUT and self.code[-1].resultat == name:
+            self.code.pop()
+        self.code.append(label(name))
 
     def _generate_print(self, node):
         """Génère le code pour l'affichage d'un proverbe"""
-        _, proverbe = node
+        # Le proverbe vérifié n'est formaté qu'une fois par proverbe distinct
+        cle = (node.statut, node.theme_id, node.texte_id)
+        ident = self.verifies.get(cle)
+        if ident is None:
+            ident = self.verifies[cle] = CHAINES.identifiant(node.verifie)
+        self.chaines[ident] = CHAINES.chaine(ident)
+
         temp = self.new_temp()
-        self.code.append(f"{temp} = allouer_tampon(256)")
-        self.code.append(f"stocke_chaine {temp}, \"{proverbe}\"")
-        self.code.append(f"appel_systeme afficher, {temp}")
+        self.code.append(allouer(temp, 256))
+        self.code.append(stocke_chaine(temp, ident))
+        self.code.append(appel_systeme('afficher', temp))
+
+    def optimize_code(self, passes=None):
+        """
+        Optimise le code généré sur son graphe de flot de contrôle (voir optimiseur)
+
+        Args:
+            passes (list): Noms des passes à appliquer (défaut: toutes)
+
+        Returns:
+            dict: Passe -> nombre d'instructions supprimées
+        """
+        self.code, rapport = optimiser(self.code, passes)
+        return rapport
 
-    def optimize_code(self):
-        """Applique des optimisations basiques au code généré"""
-        optimized = []
-        i = 0
-        while i < len(self.code):
-            instr = self.code[i]
-            
-            # Élimination des redondances
-            if i+1 < len(self.code) and "ifFalse" in instr and "goto" in self.code[i+1]:
-                target = instr.split()[-1]
-                next_target = self.code[i+1].split()[-1]
-                if target == next_target:
-                    optimized.append(instr)
-                    i += 1  # Saute l'instruction redondante
-                    continue
-                    
-            optimized.append(instr)
-            i += 1
-            
-        self.code = optimized
+
+def lister(code, chaines):
+    """
+    Forme lisible du code intermédiaire : les références #id des instructions
+    stocke_chaine sont remplacées par le texte entre guillemets
+
+    Args:
+        code (list): Instructions générées
+        chaines (dict): Identifiant -> texte (IntermediateCodeGenerator.chaines)
+
+    Returns:
+        list: Instructions sous forme de texte
+    """
+    return [ecrire(instr, chaines) for instr in code]
 
 # ============ UTILISATION ============
 
 if __name__ == "__main__":
-    # Exemple d'AST issu de votre analyseur
-    exemple_ast = [
+    # Exemple d'AST issu de votre analyseur (ancien format en tuples)
+    exemple_ast = depuis_tuples([
         ('CONDITION', 
          'age', 
          '>', 
@@ -114,19 +263,21 @@ if __name__ == "__main__":
          [
              ('AFFICHER', 'PROVERBE("طاح البير ومات عمّارُه")')
          ])
-    ]
+    ])
 
     # Génération du code
     generator = IntermediateCodeGenerator()
     intermediate_code = generator.generate(exemple_ast)
     
     print("\n=== CODE INTERMÉDIAIRE BRUT ===")
-    for instruction in intermediate_code:
+    for instruction in lister(intermediate_code, generator.chaines):
         print(instruction)
 
     # Optimisation
-    generator.optimize_code()
+    rapport = generator.optimize_code()
     
     print("\n=== CODE OPTIMISÉ ===")
-    for instruction in generator.code:
-        print(instruction)
\ No newline at end of file
+    for instruction in lister(generator.code, generator.chaines):
+        print(instruction)
+    for passe, supprimees in rapport.items():
+        print(f"; {passe}: {supprimees} instruction(s) supprimée(s)")
\ No newline at end of file
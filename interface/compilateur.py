@@ -0,0 +1,524 @@
+# -*- coding: utf-8 -*-
+"""
+Compilateur de conseils en ligne de commande (sans interface graphique)
+
+Enchaîne pour chaque script .conseil : analyse lexicale et syntaxique,
+vérification sémantique, génération du code intermédiaire puis du code
+assembleur. Les artefacts (.tac, .asm) sont écrits dans le dossier de sortie
+et un résumé des diagnostics est produit au format JSON. Toutes les erreurs
+d'un script en échec y sont données avec leur position (l'analyse reprend
+après une erreur, voir valider_source) et affichées sur la sortie d'erreur.
+
+Usage:
+    python compilateur.py scripts/ autre.conseil -o build
+    python compilateur.py scripts/ -j 0                 # un processus par cœur
+    python compilateur.py scripts/ --diagnostics - > diagnostics.json
+    python compilateur.py scripts/ --cache .cache_conseils   # cache sur disque
+    python compilateur.py scripts/ -O                   # code intermédiaire optimisé
+    python compilateur.py scripts/ --passes constantes,code_mort
+    python compilateur.py scripts/ --chaines-partagees  # un seul chaines.asm pour le lot
+    python compilateur.py scripts/ --une-passe          # sans arbre syntaxique (moins de mémoire)
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from functools import partial
+
+from analyseur import MOTEURS_LEXER, construire_lexer, parse
+from cache_compilation import CacheCompilation, cle_compilation
+from catalogue import DEFAULT_PROVERBES, PROVERBES_FILE, ouvrir_catalogue
+from code_cible import TargetCodeGenerator
+from code_intermediaire import IntermediateCodeGenerator, lister
+from diagnostics import Diagnostics
+from index_proverbes import ProverbIndex
+from optimiseur import PASSES
+from pool_chaines import PoolChaines, assembleur_donnees
+from regles import REGLES
+from SemanticAnalyzer import SemanticAnalyzer
+
+# Extension des scripts recherchés dans les dossiers
+EXTENSION = '.conseil'
+
+# Fichier des chaînes constantes communes à un lot (--chaines-partagees)
+FICHIER_CHAINES = 'chaines.asm'
+
+# ==================== COLLECTE DES FICHIERS ====================
+
+
+def collecter_fichiers(entrees):
+    """
+    Liste les scripts à compiler
+
+    Args:
+        entrees (list): Fichiers et/ou dossiers (parcourus récursivement)
+
+    Returns:
+        list: Couples (chemin, nom relatif utilisé pour les artefacts)
+    """
+    fichiers = []
+    for entree in entrees:
+        if os.path.isdir(entree):
+            for dossier, sous_dossiers, noms in os.walk(entree):
+                sous_dossiers.sort()
+                for nom in sorted(noms):
+                    if nom.endswith(EXTENSION):
+                        chemin = os.path.join(dossier, nom)
+                        fichiers.append((chemin, os.path.relpath(chemin, entree)))
+        else:
+            fichiers.append((entree, os.path.basename(entree)))
+    return fichiers
+
+# ==================== COMPILATION ====================
+
+
+def compiler_source(code, index, lexer=None, cache=None, passes=None, chaines_externes=False, arbre=True):
+    """
+    Compile un conseil de bout en bout
+
+    Args:
+        code (str): Code source du conseil
+        index (ProverbIndex): Index du catalogue de proverbes
+        lexer: Lexer à réutiliser (optionnel)
+        cache (CacheCompilation): Cache des résultats (optionnel) ; un
+            résultat rendu par le cache ne doit pas être modifié
+        passes (list): Passes d'optimisation du code intermédiaire (voir
+            optimiseur.PASSES) ; None: code non optimisé
+        chaines_externes (bool): Chaînes constantes déclarées extern dans
+            l'assembleur (voir TargetCodeGenerator) ; 'chaines_externes'
+            donne alors leurs textes
+        arbre (bool): Construit l'arbre syntaxique ; False : compilation
+            seule, en une passe (chaque condition est vérifiée et traduite
+            dès que le parser la reconnaît), 'ast' vaut None
+
+    Returns:
+        dict: Arbre syntaxique, diagnostics, code intermédiaire (et chaînes
+              qu'il référence), instructions supprimées par passe
+              d'optimisation et assembleur
+              (None pour les étapes non atteintes)
+    """
+    regles = REGLES.actuelles()
+    cle = None
+    if cache is not None:
+        etape = 'compilation' if passes is None else 'compilation-O:' + ','.join(passes)
+        if chaines_externes:
+            etape += ':chaines-externes'
+        if not arbre:
+            etape += ':sans-arbre'
+        cle = cle_compilation(code, index, regles, etape)
+        resultat = cache.obtenir(cle)
+        if resultat is not None:
+            return resultat
+
+    resultat = _compiler(code, index, regles, lexer, passes, chaines_externes, arbre)
+    if cache is not None:
+        cache.enregistrer(cle, resultat)
+    return resultat
+
+
+def compiler_intermediaire(code, index, regles=None, lexer=None, arbre=True):
+    """
+    Analyse un conseil et génère son code intermédiaire (non optimisé)
+
+    Args:
+        code (str): Code source du conseil
+        index (ProverbIndex): Index du catalogue de proverbes
+        regles (IndexThemes): Règles sémantiques (défaut: règles actuelles)
+        lexer: Lexer à réutiliser (optionnel)
+        arbre (bool): Construit l'arbre syntaxique puis l'analyse et le
+            traduit ; False : une seule passe, chaque condition est vérifiée
+            et traduite dès que le parser la reconnaît
+
+    Returns:
+        tuple: (diagnostics, generateur) ; diagnostics donne 'ast' (None
+               sans arbre), 'erreurs', 'avertissements', 'symboles' et
+               'proverbes', generateur (IntermediateCodeGenerator) est None
+               en cas d'erreur
+    """
+    diagnostics = {'ast': None, 'erreurs': [], 'avertissements': [], 'symboles': {}, 'proverbes': []}
+    analyzer = SemanticAnalyzer(index.proverbes, REGLES.actuelles() if regles is None else regles)
+    generateur = IntermediateCodeGenerator()
+
+    if arbre:
+        # Analyse lexicale et syntaxique
+        try:
+            ast = parse(code, index, lexer=lexer)
+        except SyntaxError as e:
+            diagnostics['erreurs'].append(str(e))
+            return diagnostics, None
+        diagnostics['ast'] = ast
+
+        # Analyse sémantique
+        for condition in ast:
+            analyzer.check_condition(condition)
+            analyzer.collect_warnings(condition)
+    else:
+        # Analyse, vérification et génération en une passe : le code d'une
+        # condition n'est plus produit après la première erreur sémantique
+        def recevoir(condition):
+            analyzer.check_condition(condition)
+            analyzer.collect_warnings(condition)
+            if not analyzer.errors:
+                generateur.feed(condition)
+
+        generateur.begin()
+        try:
+            parse(code, index, lexer=lexer, recepteur=recevoir)
+        except SyntaxError as e:
+            diagnostics['erreurs'].append(str(e))
+            return diagnostics, None
+
+    diagnostics['erreurs'].extend(analyzer.errors)
+    diagnostics['avertissements'].extend(analyzer.warnings)
+    diagnostics['symboles'] = dict(analyzer.symbol_table)
+    diagnostics['proverbes'] = sorted(analyzer.used_proverbs)
+    if analyzer.errors:
+        return diagnostics, None
+
+    # Génération de code
+    if arbre:
+        generateur.generate(ast)
+    else:
+        generateur.finish()
+    return diagnostics, generateur
+
+
+def valider_source(code, index, regles=None, lexer=None):
+    """
+    Vérifie un conseil en une passe, sans générer de code
+
+    Une erreur lexicale ou syntaxique n'arrête pas l'analyse (reprise au SI
+    / SINON suivant, voir analyseur.parse) ; chaque condition reconnue est
+    vérifiée dès sa réduction.
+
+    Args:
+        code (str): Code source du conseil
+        index (ProverbIndex): Index du catalogue de proverbes
+        regles (IndexThemes): Règles sémantiques (défaut: règles actuelles)
+        lexer: Lexer à réutiliser (optionnel)
+
+    Returns:
+        Diagnostics: Erreurs et avertissements lexicaux, syntaxiques et
+                     sémantiques, avec leur position
+    """
+    diagnostics = Diagnostics(code)
+    analyzer = SemanticAnalyzer(index.proverbes, REGLES.actuelles() if regles is None else regles)
+    parse(code, index, lexer=lexer, recepteur=partial(diagnostics.verifier, analyzer), diagnostics=diagnostics)
+    return diagnostics
+
+
+def _compiler(code, index, regles, lexer, passes, chaines_externes, arbre=True):
+    """Enchaîne les étapes de compilation (voir compiler_source)"""
+    resultat = {
+        'ast': None,
+        'erreurs': [],
+        'avertissements': [],
+        'symboles': {},
+        'proverbes': [],
+        'code_intermediaire': None,
+        'chaines': None,
+        'optimisation': None,
+        'asm': None,
+        'chaines_externes': None
+    }
+
+    diagnostics, generateur = compiler_intermediaire(code, index, regles, lexer, arbre)
+    resultat.update(diagnostics)
+    if generateur is None:
+        return resultat
+
+    if passes is not None:
+        resultat['optimisation'] = generateur.optimize_code(passes)
+    resultat['code_intermediaire'] = generateur.code
+    resultat['chaines'] = generateur.chaines
+    cible = TargetCodeGenerator(chaines_externes=chaines_externes)
+    resultat['asm'] = cible.generate_asm(resultat['code_intermediaire'])
+    if chaines_externes:
+        resultat['chaines_externes'] = [texte for _, texte in cible.pool.textes()]
+    return resultat
+
+
+def compiler_fichier(chemin, nom, index, sortie, lexer=None, cache=None, passes=None, chaines_externes=False,
+                     arbre=True):
+    """
+    Compile un script et écrit ses artefacts dans le dossier de sortie
+
+    arbre=False compile en une passe, sans arbre syntaxique (voir
+    compiler_source) : moins de mémoire pour un gros script, mais un peu
+    plus lent.
+
+    Returns:
+        dict: Diagnostics du fichier (sérialisables en JSON) ; avec un
+              cache, 'cache' indique si le résultat y a été trouvé, avec
+              des passes d'optimisation, 'optimisation' donne le nombre
+              d'instructions supprimées par chacune, et avec des chaînes
+              externes, 'chaines_externes' donne les textes à définir dans
+              le fichier de données du lot ; pour un script en échec,
+              'diagnostics' donne toutes ses erreurs et avertissements
+              (voir Diagnostic.vers_dict), dans l'ordre du texte
+    """
+    diagnostic = {'fichier': chemin, 'statut': 'erreur', 'erreurs': [], 'avertissements': [],
+                  'symboles': {}, 'proverbes': [], 'artefacts': []}
+    try:
+        with open(chemin, 'r', encoding='utf-8') as f:
+            code = f.read()
+    except (OSError, UnicodeDecodeError) as e:
+        diagnostic['erreurs'].append(f"Lecture impossible: {e}")
+        return diagnostic
+
+    if cache is not None:
+        succes = cache.succes
+        resultat = compiler_source(code, index, lexer, cache, passes, chaines_externes, arbre)
+        diagnostic['cache'] = cache.succes > succes
+    else:
+        resultat = compiler_source(code, index, lexer, passes=passes, chaines_externes=chaines_externes,
+                                   arbre=arbre)
+    for cle in ('erreurs', 'avertissements', 'symboles', 'proverbes'):
+        diagnostic[cle] = resultat[cle]
+    if resultat['optimisation'] is not None:
+        diagnostic['optimisation'] = resultat['optimisation']
+
+    if resultat['asm'] is not None:
+        base = os.path.join(sortie, os.path.splitext(nom)[0])
+        os.makedirs(os.path.dirname(base), exist_ok=True)
+        with open(base + '.tac', 'w', encoding='utf-8') as f:
+            f.write("\n".join(lister(resultat['code_intermediaire'], resultat['chaines'])) + "\n")
+        with open(base + '.asm', 'w', encoding='utf-8') as f:
+            f.write(resultat['asm'] + "\n")
+        diagnostic['artefacts'] = [base + '.tac', base + '.asm']
+        diagnostic['statut'] = 'ok'
+        if resultat['chaines_externes'] is not None:
+            diagnostic['chaines_externes'] = resultat['chaines_externes']
+    else:
+        # La compilation s'arrête à la première erreur lexicale ou
+        # syntaxique : le script est revérifié avec reprise sur erreur pour
+        # les signaler toutes, avec leur position
+        diagnostics = valider_source(code, index, lexer=lexer)
+        if diagnostics.erreurs():
+            diagnostic['erreurs'] = [erreur.message for erreur in diagnostics.erreurs()]
+        diagnostic['diagnostics'] = [element.vers_dict() for element in diagnostics.tries()]
+    return diagnostic
+
+
+def compiler_lot(fichiers, index, sortie, cache=None, passes=None, chaines_externes=False, moteur_lexer='ply',
+                 arbre=True):
+    """
+    Compile une liste de scripts séquentiellement
+
+    Args:
+        fichiers (list): Couples (chemin, nom relatif)
+        index (ProverbIndex): Index du catalogue de proverbes
+        sortie (str): Dossier des artefacts
+        cache (CacheCompilation): Cache des résultats (optionnel)
+        passes (list): Passes d'optimisation (None: code non optimisé)
+        chaines_externes (bool): Chaînes constantes déclarées extern (voir
+            ecrire_chaines_partagees)
+        moteur_lexer (str): Lexer utilisé, parmi MOTEURS_LEXER (voir
+            construire_lexer)
+        arbre (bool): False : compilation en une passe (voir compiler_fichier)
+
+    Returns:
+        list: Diagnostics par fichier, dans l'ordre des entrées
+    """
+    lexer = construire_lexer(moteur_lexer)
+    return [compiler_fichier(chemin, nom, index, sortie, lexer, cache, passes, chaines_externes, arbre)
+            for chemin, nom in fichiers]
+
+
+def ecrire_chaines_partagees(diagnostics, sortie):
+    """
+    Écrit le fichier de données commun d'un lot compilé avec des chaînes
+    externes : chaque proverbe cité par plusieurs scripts n'y est défini
+    qu'une fois (et un texte qui termine un autre est logé dans celui-ci)
+
+    Les textes sont retirés des diagnostics.
+
+    Returns:
+        str: Chemin du fichier écrit
+    """
+    pool = PoolChaines(partage=True)
+    for diagnostic in diagnostics:
+        for texte in diagnostic.pop('chaines_externes', ()):
+            pool.label(texte)
+    chemin = os.path.join(sortie, FICHIER_CHAINES)
+    with open(chemin, 'w', encoding='utf-8') as f:
+        f.write(assembleur_donnees(pool) + "\n")
+    return chemin
+
+# ==================== COMPILATION PARALLELE ====================
+
+
+# État propre à chaque processus de travail : son lexer, son cache, l'index du
+# catalogue (en lecture seule), le dossier de sortie, les passes d'optimisation
+# et le mode des chaînes constantes
+_travailleur = {}
+
+
+def _init_travailleur(catalogue, sortie, dossier_cache, passes, chaines_externes, moteur_lexer, arbre):
+    """
+    Prépare un processus de travail (appelé une fois par processus)
+
+    Un catalogue binaire arrive par son chemin (voir CatalogueBinaire) et
+    est projeté en mémoire par le processus : les pages du fichier sont
+    partagées, seul l'index des n-grammes est construit dans chaque processus.
+    """
+    _travailleur['index'] = ProverbIndex(catalogue)
+    _travailleur['sortie'] = sortie
+    _travailleur['passes'] = passes
+    _travailleur['chaines_externes'] = chaines_externes
+    _travailleur['arbre'] = arbre
+    _travailleur['lexer'] = construire_lexer(moteur_lexer)
+    _travailleur['cache'] = CacheCompilation(dossier=dossier_cache) if dossier_cache else None
+
+
+def _compiler_tache(fichier):
+    """Compile un fichier dans un processus de travail"""
+    chemin, nom = fichier
+    return compiler_fichier(chemin, nom, _travailleur['index'], _travailleur['sortie'],
+                            _travailleur['lexer'], _travailleur['cache'], _travailleur['passes'],
+                            _travailleur['chaines_externes'], _travailleur['arbre'])
+
+
+def compiler_parallele(fichiers, index, sortie, processus=None, cache=None, passes=None, chaines_externes=False,
+                       moteur_lexer='ply', arbre=True):
+    """
+    Répartit la compilation d'une liste de scripts sur plusieurs processus
+
+    Chaque processus possède son propre lexer (les tables LALR sont chargées
+    à l'import d'analyseur) et SemanticAnalyzer est instancié par fichier ;
+    le catalogue est transmis aux processus (par son chemin s'il est
+    binaire) et chacun en construit l'index. Les fichiers sont distribués
+    par lots et les diagnostics sont rendus dans l'ordre des entrées. Avec
+    un cache, chaque processus a son propre niveau mémoire et partage le
+    dossier du cache sur disque.
+
+    Args:
+        fichiers (list): Couples (chemin, nom relatif)
+        index (ProverbIndex): Index du catalogue de proverbes
+        sortie (str): Dossier des artefacts
+        processus (int): Nombre de processus (défaut: nombre de cœurs)
+        cache (CacheCompilation): Cache des résultats (optionnel)
+        passes (list): Passes d'optimisation (None: code non optimisé)
+        chaines_externes (bool): Chaînes constantes déclarées extern (les
+            labels ne dépendent que du texte : ils sont les mêmes dans tous
+            les processus)
+        moteur_lexer (str): Lexer utilisé, parmi MOTEURS_LEXER
+        arbre (bool): False : compilation en une passe (voir compiler_fichier)
+
+    Returns:
+        list: Diagnostics par fichier, dans l'ordre des entrées
+    """
+    processus = processus or os.cpu_count() or 1
+    if processus == 1 or len(fichiers) < 2:
+        return compiler_lot(fichiers, index, sortie, cache, passes, chaines_externes, moteur_lexer, arbre)
+
+    # Quelques lots par processus pour équilibrer la charge sans trop d'échanges
+    taille_lot = max(1, len(fichiers) // (processus * 4))
+    with multiprocessing.Pool(processus, initializer=_init_travailleur,
+                              initargs=(index.proverbes, sortie, cache and cache.dossier, passes, chaines_externes,
+                                        moteur_lexer, arbre)) as pool:
+        return pool.map(_compiler_tache, fichiers, chunksize=taille_lot)
+
+# ==================== LIGNE DE COMMANDE ====================
+
+
+def charger_catalogue(chemin):
+    """
+    Charge le catalogue (proverbes par défaut si le fichier est absent)
+
+    Un fichier texte est converti au format binaire s'il a changé : le
+    fichier .bin est écrit à côté de lui (voir ouvrir_catalogue ; si le
+    dossier est en lecture seule, le catalogue reste en mémoire et est
+    transmis aux processus de travail). Le catalogue binaire est projeté en
+    mémoire et rouvert par chemin dans les processus de travail, qui en
+    partagent ainsi les pages.
+    """
+    if os.path.exists(chemin):
+        return ouvrir_catalogue(chemin)
+    return dict(DEFAULT_PROVERBES)
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Compilation en lot de scripts de conseils")
+    arg_parser.add_argument('entrees', nargs='+', help=f"Fichiers ou dossiers de scripts {EXTENSION}")
+    arg_parser.add_argument('-o', '--sortie', default='build', help="Dossier des artefacts (défaut: build)")
+    arg_parser.add_argument('--proverbes', default=PROVERBES_FILE,
+                            help="Fichier du catalogue de proverbes (.txt, ou .bin déjà construit) ; "
+                            "un .txt est converti en .bin dans le même dossier s'il est accessible en écriture")
+    arg_parser.add_argument('-j', '--processus', type=int, default=1,
+                            help="Nombre de processus de compilation (0: un par cœur, défaut: 1)")
+    arg_parser.add_argument('--cache', metavar='DOSSIER',
+                            help="Dossier du cache de compilation sur disque (désactivé par défaut)")
+    arg_parser.add_argument('-O', '--optimiser', action='store_true',
+                            help="Optimise le code intermédiaire (toutes les passes)")
+    arg_parser.add_argument('--passes', metavar='LISTE',
+                            help=f"Passes d'optimisation séparées par des virgules, parmi {', '.join(PASSES)}")
+    arg_parser.add_argument('--chaines-partagees', action='store_true',
+                            help=f"Chaînes constantes définies une seule fois pour tout le lot ({FICHIER_CHAINES}, "
+                            "à lier avec chaque script)")
+    arg_parser.add_argument('--lexer', choices=MOTEURS_LEXER, default='ply',
+                            help="Analyseur lexical : ply, ou dfa (automate écrit à la main, plus rapide) "
+                            "(défaut: ply)")
+    arg_parser.add_argument('--une-passe', action='store_true',
+                            help="Compile chaque script en une passe, sans arbre syntaxique : moins de mémoire "
+                            "pour les gros scripts, mais un peu plus lent")
+    arg_parser.add_argument('--diagnostics', help="Fichier JSON des diagnostics "
+                            "(défaut: <sortie>/diagnostics.json, '-' pour la sortie standard)")
+    args = arg_parser.parse_args(argv)
+
+    passes = list(PASSES) if args.optimiser else None
+    if args.passes is not None:
+        passes = [nom.strip() for nom in args.passes.split(',') if nom.strip()]
+        inconnues = [nom for nom in passes if nom not in PASSES]
+        if inconnues:
+            arg_parser.error(f"passe d'optimisation inconnue: {', '.join(inconnues)}")
+
+    fichiers = collecter_fichiers(args.entrees)
+    index = ProverbIndex(charger_catalogue(args.proverbes))
+    os.makedirs(args.sortie, exist_ok=True)
+
+    debut = time.perf_counter()
+    cache = CacheCompilation(dossier=args.cache) if args.cache else None
+    diagnostics = compiler_parallele(fichiers, index, args.sortie, args.processus, cache, passes,
+                                     args.chaines_partagees, args.lexer, not args.une_passe)
+    if args.chaines_partagees:
+        ecrire_chaines_partagees(diagnostics, args.sortie)
+    duree = time.perf_counter() - debut
+
+    echecs = sum(1 for d in diagnostics if d['statut'] != 'ok')
+    resume = {
+        'fichiers': len(diagnostics),
+        'succes': len(diagnostics) - echecs,
+        'echecs': echecs,
+        'duree_s': round(duree, 6),
+        'fichiers_par_seconde': round(len(diagnostics) / duree, 1) if duree > 0 else None
+    }
+    if cache is not None:
+        succes = sum(1 for d in diagnostics if d.get('cache'))
+        resume['cache'] = {'succes': succes, 'echecs': len(diagnostics) - succes}
+    if passes is not None:
+        resume['optimisation'] = {nom: sum(d.get('optimisation', {}).get(nom, 0) for d in diagnostics)
+                                  for nom in passes}
+    rapport = json.dumps({'resume': resume, 'fichiers': diagnostics}, ensure_ascii=False, indent=2)
+
+    chemin_diagnostics = args.diagnostics or os.path.join(args.sortie, 'diagnostics.json')
+    if chemin_diagnostics == '-':
+        print(rapport)
+    else:
+        with open(chemin_diagnostics, 'w', encoding='utf-8') as f:
+            f.write(rapport + "\n")
+
+    for diagnostic in diagnostics:
+        for element in diagnostic.get('diagnostics', ()):
+            print(f"{diagnostic['fichier']}:{element['ligne']}:{element['colonne']}: "
+                  f"{element['niveau']} {element['etape']}: {element['message']}", file=sys.stderr)
+    print(f"{resume['fichiers']} fichier(s) compilé(s), {echecs} en échec, "
+          f"{duree:.3f} s ({resume['fichiers_par_seconde']} fichiers/s)", file=sys.stderr)
+    return 1 if echecs else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
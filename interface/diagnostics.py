@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+Diagnostics d'une analyse avec reprise sur erreur
+
+Au lieu de s'arrêter sur la première erreur (SyntaxError), le lexer et le
+parser signalent chaque erreur dans un collecteur Diagnostics et reprennent
+l'analyse (voir analyseur.parse) ; l'analyse sémantique des conditions
+reconnues y ajoute ses erreurs et avertissements. Chaque diagnostic porte
+son étendue dans le texte : décalages de début et de fin, et lignes et
+colonnes correspondantes (à partir de 1, lignes réelles du texte).
+
+    diagnostics = Diagnostics(code)
+    ast = parse(code, index, diagnostics=diagnostics)
+    for diagnostic in diagnostics.tries():
+        print(diagnostic)     # 3:5: erreur syntaxique: Erreur syntaxique ligne 3: ':'
+"""
+
+from bisect import bisect_right
+
+from noeuds import Avertissement
+
+# Gravité
+ERREUR = 'erreur'
+AVERTISSEMENT = 'avertissement'
+
+# Étape de l'analyse qui a produit le diagnostic
+LEXICALE = 'lexicale'
+SYNTAXIQUE = 'syntaxique'
+SEMANTIQUE = 'sémantique'
+
+
+class Diagnostic:
+    """
+    Erreur ou avertissement situé dans le texte analysé
+
+    Attributs:
+        niveau (str): ERREUR ou AVERTISSEMENT
+        etape (str): LEXICALE, SYNTAXIQUE ou SEMANTIQUE
+        message (str): Texte du diagnostic
+        debut (int): Décalage du premier caractère concerné
+        fin (int): Décalage qui suit le dernier caractère concerné
+        ligne, colonne (int): Position de debut
+        ligne_fin, colonne_fin (int): Position de fin
+    """
+
+    __slots__ = ('niveau', 'etape', 'message', 'debut', 'fin', 'ligne', 'colonne', 'ligne_fin', 'colonne_fin')
+
+    def __init__(self, niveau, etape, message, debut, fin, ligne, colonne, ligne_fin, colonne_fin):
+        self.niveau = niveau
+        self.etape = etape
+        self.message = message
+        self.debut, self.fin = debut, fin
+        self.ligne, self.colonne = ligne, colonne
+        self.ligne_fin, self.colonne_fin = ligne_fin, colonne_fin
+
+    def __str__(self):
+        return f"{self.ligne}:{self.colonne}: {self.niveau} {self.etape}: {self.message}"
+
+    def __repr__(self):
+        return f"Diagnostic({self.niveau!r}, {self.etape!r}, {self.message!r}, {self.ligne}:{self.colonne})"
+
+    def vers_dict(self):
+        """Forme sérialisable en JSON"""
+        return {champ: getattr(self, champ) for champ in self.__slots__}
+
+
+class Diagnostics:
+    """
+    Collecteur des diagnostics de l'analyse d'un texte, dans l'ordre où ils
+    sont signalés
+
+    Attributs:
+        code (str): Texte analysé
+        liste (list): Diagnostics signalés
+    """
+
+    def __init__(self, code):
+        self.code = code
+        self.liste = []
+        self._debuts_lignes = None
+
+    def __len__(self):
+        return len(self.liste)
+
+    def __iter__(self):
+        return iter(self.liste)
+
+    def position(self, decalage):
+        """Ligne et colonne (à partir de 1) d'un décalage dans le texte"""
+        if self._debuts_lignes is None:
+            # Calculé au premier diagnostic seulement : une analyse sans
+            # erreur ne parcourt pas le texte une fois de plus
+            debuts = [0]
+            saut = self.code.find('\n')
+            while saut >= 0:
+                debuts.append(saut + 1)
+                saut = self.code.find('\n', saut + 1)
+            self._debuts_lignes = debuts
+        ligne = bisect_right(self._debuts_lignes, decalage)
+        return ligne, decalage - self._debuts_lignes[ligne - 1] + 1
+
+    def signaler(self, etape, message, debut, fin=None, niveau=ERREUR):
+        """
+        Ajoute un diagnostic
+
+        Args:
+            etape (str): LEXICALE, SYNTAXIQUE ou SEMANTIQUE
+            message (str): Texte du diagnostic
+            debut (int): Décalage du début (None: fin du texte)
+            fin (int): Décalage de la fin (défaut: debut + 1, sans dépasser le texte)
+            niveau (str): ERREUR ou AVERTISSEMENT
+
+        Returns:
+            Diagnostic: Diagnostic ajouté
+        """
+        if debut is None:
+            debut = len(self.code)
+        if fin is None:
+            fin = min(debut + 1, len(self.code))
+        diagnostic = Diagnostic(niveau, etape, message, debut, max(fin, debut),
+                                *self.position(debut), *self.position(max(fin, debut)))
+        self.liste.append(diagnostic)
+        return diagnostic
+
+    def verifier(self, analyzer, condition):
+        """
+        Analyse sémantique d'une condition (voir SemanticAnalyzer) : ses
+        erreurs et avertissements sont signalés à la position de la
+        condition, ceux du parser (proverbes partiels) à celle du proverbe
+        """
+        erreurs, avertissements = len(analyzer.errors), len(analyzer.warnings)
+        analyzer.check_condition(condition)
+        for message in analyzer.errors[erreurs:]:
+            self.signaler(SEMANTIQUE, message, condition.debut, condition.fin)
+        for message in analyzer.warnings[avertissements:]:
+            self.signaler(SEMANTIQUE, message, condition.debut, condition.fin, AVERTISSEMENT)
+        analyzer.collect_warnings(condition)
+        for action in condition.actions:
+            if isinstance(action, Avertissement):
+                self.signaler(SEMANTIQUE, action.message, action.debut, action.fin, AVERTISSEMENT)
+
+    def erreurs(self):
+        """Diagnostics de niveau ERREUR"""
+        return [diagnostic for diagnostic in self.liste if diagnostic.niveau == ERREUR]
+
+    def tries(self):
+        """Diagnostics dans l'ordre du texte"""
+        return sorted(self.liste, key=lambda diagnostic: (diagnostic.debut, diagnostic.fin))
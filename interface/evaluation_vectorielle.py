@@ -0,0 +1,306 @@
+# -*- coding: utf-8 -*-
+"""
+Évaluation vectorielle d'un conseil sur des profils en colonnes (NumPy)
+
+Chaque condition de l'arbre syntaxique (var op valeur) devient un masque
+booléen calculé en une opération sur la colonne de la variable : N profils
+sont évalués par autant d'opérations NumPy qu'il y a de conditions
+distinctes, sans boucle Python par profil. Dans une chaîne SI / SINON SI,
+une branche est retenue pour les profils où sa condition est vraie et
+celles des branches précédentes fausses.
+
+Les colonnes de chaînes sont encodées par dictionnaire (un code entier par
+valeur distincte) : une condition sur une chaîne est évaluée une fois par
+valeur distincte, puis appliquée aux codes. Les résultats sont ceux de la
+machine virtuelle (voir vm) sur les mêmes profils : les nombres (entiers,
+flottants, scalaires NumPy) sont comparés par leur valeur, une comparaison
+entre une chaîne et un nombre ou avec une valeur absente est fausse. NaN
+marque une valeur absente dans une colonne de flottants (None pour la
+machine virtuelle).
+
+    evaluateur = EvaluateurVectoriel(ast)
+    selection = evaluateur.evaluer({'age': ages, 'humeur': humeurs})
+    selection.listes()       # proverbes affichés, par profil
+    selection.frequences()   # profils qui affichent chaque proverbe
+
+NumPy est une dépendance optionnelle : le module s'importe sans elle, mais
+EvaluateurVectoriel lève ImportError.
+"""
+
+import operator
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - dépendance optionnelle
+    np = None
+
+from noeuds import Condition, Display, ElseIfCondition
+
+OPERATIONS = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '>': operator.gt,
+    '<': operator.lt,
+    '>=': operator.ge,
+    '<=': operator.le,
+}
+
+
+class Colonne:
+    """
+    Valeurs d'une variable pour N profils
+
+    Attributs:
+        taille (int): Nombre de profils
+        nombres (ndarray): Valeurs numériques (int64, ou float64 si la
+            colonne contient des flottants ; sans objet là où la valeur
+            n'est pas un nombre), None si aucune ne l'est
+        est_nombre (ndarray): Profils dont la valeur est un nombre autre
+            que NaN (bool), None si toutes le sont
+        codes (ndarray): Code de la chaîne de chaque profil dans
+            vocabulaire (int32), len(vocabulaire) si la valeur n'est pas une
+            chaîne ; None si aucune ne l'est
+        vocabulaire (list): Chaînes distinctes de la colonne
+    """
+
+    __slots__ = ('taille', 'nombres', 'est_nombre', 'codes', 'vocabulaire')
+
+    def __init__(self, taille, nombres=None, est_nombre=None, codes=None, vocabulaire=()):
+        self.taille = taille
+        self.nombres = nombres
+        self.est_nombre = est_nombre
+        self.codes = codes
+        self.vocabulaire = list(vocabulaire)
+
+    @classmethod
+    def depuis_valeurs(cls, valeurs):
+        """
+        Colonne depuis une séquence de valeurs (liste, tableau NumPy d'entiers,
+        de flottants ou de chaînes) ; None (ou NaN) marque une valeur absente
+        """
+        if not isinstance(valeurs, np.ndarray):
+            # Liste homogène : convertie en tableau en une opération (les
+            # types sont vérifiés d'abord, np.asarray convertirait un mélange
+            # d'entiers et de chaînes en chaînes)
+            types = set(map(type, valeurs))
+            if types and types <= {int, float} or types == {str}:
+                valeurs = np.asarray(valeurs)
+        if isinstance(valeurs, np.ndarray):
+            if valeurs.dtype.kind in 'iu':
+                return cls(len(valeurs), nombres=valeurs.astype(np.int64, copy=False))
+            if valeurs.dtype.kind == 'f':
+                presents = ~np.isnan(valeurs)
+                return cls(len(valeurs), nombres=valeurs.astype(np.float64, copy=False),
+                           est_nombre=None if presents.all() else presents)
+            if valeurs.dtype.kind == 'U':
+                vocabulaire, codes = np.unique(valeurs, return_inverse=True)
+                return cls(len(valeurs), codes=codes.astype(np.int32), vocabulaire=vocabulaire.tolist())
+
+        # Séquence quelconque (nombres et chaînes mélangés, valeurs absentes) :
+        # un passage sur les valeurs
+        n = len(valeurs)
+        flottants = any(isinstance(valeur, (float, np.floating)) for valeur in valeurs)
+        nombres = np.zeros(n, dtype=np.float64 if flottants else np.int64)
+        est_nombre = np.zeros(n, dtype=bool)
+        codes = np.empty(n, dtype=np.int32)
+        dictionnaire = {}
+        absent = -1
+        for k, valeur in enumerate(valeurs):
+            if type(valeur) is int or isinstance(valeur, np.integer):
+                nombres[k] = valeur
+                est_nombre[k] = True
+                codes[k] = absent
+            elif isinstance(valeur, (float, np.floating)):
+                nombres[k] = valeur
+                est_nombre[k] = valeur == valeur
+                codes[k] = absent
+            elif isinstance(valeur, str):
+                codes[k] = dictionnaire.setdefault(valeur, len(dictionnaire))
+            else:
+                codes[k] = absent
+        codes[codes == absent] = len(dictionnaire)
+        return cls(n,
+                   nombres=nombres if est_nombre.any() else None,
+                   est_nombre=est_nombre,
+                   codes=codes if dictionnaire else None,
+                   vocabulaire=dictionnaire)
+
+    def masque(self, op, valeur):
+        """Masque des profils pour lesquels (valeur du profil op valeur) est vrai"""
+        comparer = OPERATIONS[op]
+        if type(valeur) is int:
+            if self.nombres is None:
+                return np.zeros(self.taille, dtype=bool)
+            masque = comparer(self.nombres, valeur)
+            if self.est_nombre is not None:
+                masque &= self.est_nombre
+            return masque
+        if type(valeur) is str and self.codes is not None:
+            if op == '==':
+                try:
+                    return self.codes == self.vocabulaire.index(valeur)
+                except ValueError:
+                    return np.zeros(self.taille, dtype=bool)
+            # Condition évaluée sur chaque chaîne distincte, puis par code
+            # (le dernier code est celui des valeurs qui ne sont pas des chaînes)
+            table = np.array([comparer(texte, valeur) for texte in self.vocabulaire] + [False])
+            return table[self.codes]
+        return np.zeros(self.taille, dtype=bool)
+
+
+def colonnes_depuis_profils(profils, variables):
+    """
+    Colonnes des variables depuis une liste de profils (dict nom -> valeur)
+
+    Returns:
+        dict: Nom de variable -> Colonne
+    """
+    return {nom: Colonne.depuis_valeurs([profil.get(nom) for profil in profils]) for nom in variables}
+
+
+class Selection:
+    """
+    Proverbes retenus pour chaque profil
+
+    Attributs:
+        masques (ndarray): Masques distincts des branches retenues (bool,
+            une ligne par masque, une colonne par profil)
+        affichages (list): Couples (ligne de masques, numéro du proverbe)
+            dans l'ordre d'affichage
+        proverbes (tuple): Textes des proverbes, par numéro
+    """
+
+    __slots__ = ('masques', 'affichages', 'proverbes')
+
+    def __init__(self, masques, affichages, proverbes):
+        self.masques = masques
+        self.affichages = affichages
+        self.proverbes = proverbes
+
+    def matrice(self):
+        """Tableau (profils x affichages) : vrai si le profil affiche le proverbe"""
+        lignes = np.fromiter((ligne for ligne, _ in self.affichages), dtype=np.intp, count=len(self.affichages))
+        return self.masques[lignes].T
+
+    def listes(self):
+        """
+        Numéros des proverbes affichés pour chaque profil, dans l'ordre
+        d'affichage (comme Programme.executer_lot, voir vm)
+        """
+        numeros = np.array([numero for _, numero in self.affichages], dtype=np.intp)
+        profils, colonnes = np.nonzero(self.matrice())
+        coupures = np.searchsorted(profils, np.arange(1, self.masques.shape[1]))
+        return [numeros[morceau].tolist() for morceau in np.split(colonnes, coupures)]
+
+    def frequences(self):
+        """Nombre de profils qui affichent chaque proverbe (tableau indexé par numéro)"""
+        comptes = self.masques.sum(axis=1)
+        frequences = np.zeros(len(self.proverbes), dtype=np.int64)
+        for ligne, numero in self.affichages:
+            frequences[numero] += comptes[ligne]
+        return frequences
+
+
+class EvaluateurVectoriel:
+    """
+    Conseil compilé en opérations sur des masques booléens
+
+    Args:
+        ast (list): Conditions (Condition / ElseIfCondition, voir noeuds)
+
+    Attributs:
+        chaines (list): Chaînes SI / SINON SI, chacune liste de couples
+            ((variable, op, valeur), numéros des proverbes affichés) ; le
+            test d'un affichage hors condition est None
+        variables (tuple): Variables testées
+        proverbes (tuple): Proverbes vérifiés affichés, par numéro
+
+    Raises:
+        ImportError: Si NumPy n'est pas installé
+    """
+
+    def __init__(self, ast):
+        if np is None:
+            raise ImportError("L'évaluation vectorielle nécessite NumPy (pip install numpy)")
+        self.chaines = []
+        numeros = {}
+        variables = {}
+        ouverte = False  # un SINON SI continue la dernière chaîne
+        for noeud in ast:
+            if isinstance(noeud, Display):
+                # Affichage hors condition : toujours exécuté (test None)
+                self.chaines.append([(None, [numeros.setdefault(noeud.verifie, len(numeros))])])
+                ouverte = False
+                continue
+            if not isinstance(noeud, Condition):
+                continue
+            if not (isinstance(noeud, ElseIfCondition) and ouverte):
+                self.chaines.append([])
+            ouverte = True
+            variables.setdefault(noeud.var)
+            affiches = [numeros.setdefault(action.verifie, len(numeros))
+                        for action in noeud.actions if isinstance(action, Display)]
+            self.chaines[-1].append(((noeud.var, noeud.op, noeud.val), affiches))
+        self.variables = tuple(variables)
+        self.proverbes = tuple(numeros)
+
+    def evaluer(self, colonnes, taille=None):
+        """
+        Évalue le conseil sur N profils
+
+        Args:
+            colonnes (dict): Nom de variable -> Colonne ou séquence de
+                valeurs (une variable manquante est absente de tous les
+                profils)
+            taille (int): N (déduit des colonnes si None)
+
+        Returns:
+            Selection: Proverbes retenus pour chaque profil
+        """
+        colonnes = {nom: valeurs if isinstance(valeurs, Colonne) else Colonne.depuis_valeurs(valeurs)
+                    for nom, valeurs in colonnes.items()}
+        if taille is None:
+            taille = next((colonne.taille for colonne in colonnes.values()), 0)
+
+        conditions = {}  # (variable, op, type, valeur) -> masque
+        branches = {}    # tests de la branche et des précédentes -> [vrai, retenus, restant]
+        lignes = {}      # tests de la branche et des précédentes -> ligne de masques
+        masques = []
+        affichages = []
+
+        def condition(test):
+            if test is None:
+                return np.ones(taille, dtype=bool)
+            var, op, val = test
+            cle = (var, op, type(val), val)
+            masque = conditions.get(cle)
+            if masque is None:
+                colonne = colonnes.get(var)
+                masque = conditions[cle] = (colonne.masque(op, val) if colonne is not None
+                                            else np.zeros(taille, dtype=bool))
+            return masque
+
+        for chaine in self.chaines:
+            precedents = ()
+            restant = None  # profils pour lesquels aucune branche précédente n'est vraie (None : tous)
+            for k, (test, affiches) in enumerate(chaine):
+                cle = precedents + (test,)
+                connue = branches.get(cle)
+                if connue is None:
+                    vrai = condition(test)
+                    connue = branches[cle] = [vrai, vrai if restant is None else vrai & restant, None]
+                vrai, retenus, suivant = connue
+                if k + 1 < len(chaine):
+                    if suivant is None:
+                        suivant = connue[2] = ~vrai if restant is None else restant & ~vrai
+                    restant = suivant
+                if affiches:
+                    ligne = lignes.get(cle)
+                    if ligne is None:
+                        ligne = lignes[cle] = len(masques)
+                        masques.append(retenus)
+                affichages.extend((ligne, numero) for numero in affiches)
+                precedents = cle
+
+        matrice = np.array(masques, dtype=bool) if masques else np.zeros((0, taille), dtype=bool)
+        return Selection(matrice, affichages, self.proverbes)
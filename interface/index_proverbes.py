@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+from catalogue import version_catalogue
+
+# ============ INDEX DES PROVERBES ============
+
+# Taille des n-grammes de caractères utilisés pour la recherche partielle
+TAILLE_NGRAMME = 3
+
+# Résultats de la résolution d'un proverbe saisi
+EXACT = 'exact'
+PARTIEL = 'partiel'
+INCONNU = 'inconnu'
+
+
+def normaliser_texte(texte):
+    """Nettoie le texte d'un proverbe saisi (espaces et guillemets superflus)"""
+    texte = texte.strip().strip('"\'')
+    return texte.replace('"', '').replace("'", "")
+
+
+class ProverbIndex:
+    """
+    Index des proverbes construit une seule fois par chargement du catalogue.
+
+    Remplace les parcours linéaires du dictionnaire des proverbes par :
+    - une table de hachage texte -> thème pour les correspondances exactes
+    - un index inversé de n-grammes de caractères pour les correspondances
+      partielles (le texte saisi est une partie d'un proverbe)
+
+    Avec un catalogue binaire (voir catalogue.CatalogueBinaire), les
+    proverbes ne sont pas gardés dans des tables Python : les
+    correspondances exactes sont cherchées par dichotomie dans le fichier
+    (theme_de) et les candidats d'une correspondance partielle y sont
+    relus par leur numéro.
+
+    Attributs:
+        proverbes (Mapping): Catalogue des proverbes indexés {thème: texte}
+        version (str): Empreinte du catalogue indexé
+        entrees (list): Couples (thème, texte) dans l'ordre du catalogue
+            (None pour un catalogue binaire)
+        exact (dict): Texte complet -> (thème, texte), premier thème du
+            catalogue (None pour un catalogue binaire)
+        ngrammes (dict): n-gramme -> liste croissante de numéros d'entrée
+        caracteres (dict): caractère -> liste croissante de numéros d'entrée
+    """
+
+    def __init__(self, proverbes, n=TAILLE_NGRAMME):
+        """Construit les index à partir du dictionnaire {thème: texte}"""
+        self.proverbes = proverbes
+        self.version = version_catalogue(proverbes)
+        self.n = n
+        self.ngrammes = {}
+        self.caracteres = {}
+        self._theme_de = getattr(proverbes, 'theme_de', None)
+        if self._theme_de is not None:
+            self.entrees = self.exact = None
+            self._entree = proverbes.entree
+        else:
+            self.entrees = []
+            self.exact = {}
+            self._entree = self.entrees.__getitem__
+
+        for idx, (cle, val) in enumerate(proverbes.items()):
+            if self.entrees is not None:
+                self.entrees.append((cle, val))
+                self.exact.setdefault(val, self.entrees[idx])
+            for gramme in self._grammes(val, n):
+                self.ngrammes.setdefault(gramme, []).append(idx)
+            for car in set(val):
+                self.caracteres.setdefault(car, []).append(idx)
+
+    @staticmethod
+    def _grammes(texte, n):
+        """Retourne l'ensemble des n-grammes distincts d'un texte"""
+        return {texte[i:i + n] for i in range(len(texte) - n + 1)}
+
+    def __len__(self):
+        return len(self.proverbes)
+
+    def rechercher_exact(self, texte):
+        """
+        Recherche un proverbe dont le texte est exactement celui donné
+
+        Returns:
+            str: Thème du proverbe ou None
+        """
+        if self._theme_de is not None:
+            return self._theme_de(texte)
+        entree = self.exact.get(texte)
+        return entree[0] if entree is not None else None
+
+    def rechercher_partiel(self, texte):
+        """
+        Recherche le premier proverbe (ordre du catalogue) contenant le texte
+
+        Les candidats sont pris dans la plus courte liste d'occurrences des
+        n-grammes du texte : tout proverbe qui contient le texte contient
+        aussi chacun de ses n-grammes.
+
+        Returns:
+            tuple: (thème, texte complet) ou None
+        """
+        if not texte:
+            return self._entree(0) if len(self) else None
+
+        if len(texte) >= self.n:
+            cles, table = self._grammes(texte, self.n), self.ngrammes
+        else:
+            cles, table = set(texte), self.caracteres
+
+        candidats = None
+        for cle in cles:
+            occurrences = table.get(cle)
+            if occurrences is None:
+                return None
+            if candidats is None or len(occurrences) < len(candidats):
+                candidats = occurrences
+
+        for idx in candidats:
+            cle, val = self._entree(idx)
+            if texte in val:
+                return cle, val
+        return None
+
+    def resoudre(self, texte):
+        """
+        Résout un proverbe saisi dans le catalogue
+
+        Args:
+            texte (str): Texte du proverbe saisi
+
+        Returns:
+            tuple: (statut, thème, texte) avec le statut EXACT ou PARTIEL et le
+                   texte complet du catalogue, ou (INCONNU, None, texte saisi)
+        """
+        texte = normaliser_texte(texte)
+
+        theme = self.rechercher_exact(texte)
+        if theme is not None:
+            return EXACT, theme, texte
+
+        partiel = self.rechercher_partiel(texte)
+        if partiel is not None:
+            return PARTIEL, partiel[0], partiel[1]
+
+        return INCONNU, None, texte
+
+    def verifier(self, texte):
+        """
+        Vérifie si le proverbe existe exactement et retourne sa version complète
+
+        Args:
+            texte (str): Texte du proverbe à vérifier
+
+        Returns:
+            str: Version complète du proverbe ou message d'erreur
+        """
+        statut, cle, val = self.resoudre(texte)
+        if statut == EXACT:
+            return f"{cle}: {val}"
+        if statut == PARTIEL:
+            return f"ATTENTION: Partiel - {cle}: {val}"
+        return f"PROVERBE INCONNU: {val}"
@@ -0,0 +1,343 @@
+# -*- coding: utf-8 -*-
+"""
+Représentation du code intermédiaire (code à trois adresses)
+
+Chaque instruction est un quadruplet (op, arg1, arg2, resultat) compact
+(__slots__), partagé par le générateur de code intermédiaire, l'optimiseur
+et le générateur de code cible : aucune étape ne relit de texte. Les
+opérandes sont typés :
+
+- Temp : temporaire (t1, t2, ...), sous-classe d'int
+- Etiquette : étiquette de saut (L1, L2, ...), sous-classe d'int
+- Var : variable du conseil (une seule instance par nom)
+- int / str : valeur littérale (nombre, chaîne)
+- identifiant de chaîne (int) dans la table chaines.CHAINES pour stocke_chaine
+
+    Op          arg1        arg2        resultat    forme texte
+    EGAL, ...   Var/Temp    valeur      Temp        t1 = humeur == "triste"
+    COPIE       valeur      -           Temp        t1 = 1
+    ALLOUER     taille      -           Temp        t2 = allouer_tampon(256)
+    STOCKE      Temp        #chaîne     -           stocke_chaine t2, #12
+    SYSTEME     service     Temp        -           appel_systeme afficher, t2
+    SI_FAUX     Temp        -           Etiquette   ifFalse t1 goto L1
+    SAUT        -           -           Etiquette   goto L1
+    LABEL       Etiquette   -           -           label L1
+
+La forme texte (ecrire/lire) ne sert qu'à l'affichage et à la saisie.
+"""
+
+import enum
+import re
+
+from chaines import CHAINES
+
+
+class Op(enum.Enum):
+    """Codes d'opération (la valeur est le mnémonique de la forme texte)"""
+    EGAL = '=='
+    DIFFERENT = '!='
+    SUPERIEUR = '>'
+    INFERIEUR = '<'
+    SUP_EGAL = '>='
+    INF_EGAL = '<='
+    COPIE = 'copie'
+    ALLOUER = 'allouer_tampon'
+    STOCKE = 'stocke_chaine'
+    SYSTEME = 'appel_systeme'
+    SI_FAUX = 'ifFalse'
+    SAUT = 'goto'
+    LABEL = 'label'
+
+
+# Opérations de comparaison (resultat = arg1 op arg2)
+COMPARAISONS = frozenset({Op.EGAL, Op.DIFFERENT, Op.SUPERIEUR, Op.INFERIEUR, Op.SUP_EGAL, Op.INF_EGAL})
+
+# Opérateur de comparaison ('==', '>', ...) -> Op
+OPERATEURS = {op.value: op for op in COMPARAISONS}
+
+# Opérations qui définissent le temporaire resultat
+DEFINITIONS = COMPARAISONS | {Op.COPIE, Op.ALLOUER}
+
+# Sauts (l'étiquette visée est dans resultat)
+SAUTS = frozenset({Op.SI_FAUX, Op.SAUT})
+
+# ==================== OPERANDES ====================
+
+
+class Temp(int):
+    """Temporaire tN"""
+
+    __slots__ = ()
+
+    def __repr__(self):
+        return f"t{int(self)}"
+
+    __str__ = __repr__
+
+    def __reduce__(self):
+        return temporaire, (int(self),)
+
+
+class Etiquette(int):
+    """Étiquette de saut LN"""
+
+    __slots__ = ()
+
+    def __repr__(self):
+        return f"L{int(self)}"
+
+    __str__ = __repr__
+
+    def __reduce__(self):
+        return etiquette, (int(self),)
+
+
+# Instances partagées par tous les programmes (t1 de deux conseils est le même objet)
+_TEMPS = []
+_ETIQUETTES = []
+
+
+def _partage(classe, instances, numero):
+    while len(instances) <= numero:
+        instances.append(classe(len(instances)))
+    return instances[numero]
+
+
+def temporaire(numero):
+    """Retourne le temporaire t<numero>"""
+    return _TEMPS[numero] if numero < len(_TEMPS) else _partage(Temp, _TEMPS, numero)
+
+
+def etiquette(numero):
+    """Retourne l'étiquette L<numero>"""
+    return _ETIQUETTES[numero] if numero < len(_ETIQUETTES) else _partage(Etiquette, _ETIQUETTES, numero)
+
+
+class Var:
+    """
+    Variable du conseil (instance unique par nom, voir variable())
+
+    Attributs:
+        nom (str): Nom de la variable
+    """
+
+    __slots__ = ('nom',)
+
+    def __init__(self, nom):
+        self.nom = nom
+
+    def __repr__(self):
+        return self.nom
+
+    __str__ = __repr__
+
+    def __reduce__(self):
+        return variable, (self.nom,)
+
+
+_VARIABLES = {}
+CHAINES.au_vidage(_VARIABLES.clear)
+
+
+def variable(nom):
+    """Retourne l'instance unique de la variable nom"""
+    var = _VARIABLES.get(nom)
+    if var is None:
+        var = _VARIABLES[nom] = Var(CHAINES.canonique(nom))
+    return var
+
+
+def est_litteral(operande):
+    """Vrai pour une valeur littérale (nombre ou chaîne)"""
+    return type(operande) is int or type(operande) is str
+
+
+def operande_texte(operande):
+    """Forme texte d'un opérande (chaînes littérales entre guillemets)"""
+    if type(operande) is str:
+        return f'"{operande}"'
+    return str(operande)
+
+# ==================== INSTRUCTIONS ====================
+
+
+class Quadruplet:
+    """
+    Instruction du code intermédiaire (voir le tableau en tête du module)
+
+    Les quadruplets ne sont pas modifiés une fois créés : les passes qui les
+    transforment en créent de nouveaux.
+    """
+
+    __slots__ = ('op', 'arg1', 'arg2', 'resultat')
+
+    def __init__(self, op, arg1=None, arg2=None, resultat=None):
+        self.op = op
+        self.arg1 = arg1
+        self.arg2 = arg2
+        self.resultat = resultat
+
+    def __repr__(self):
+        return ecrire(self)
+
+    def __eq__(self, autre):
+        if type(autre) is not Quadruplet:
+            return NotImplemented
+        return (self.op is autre.op and self.arg1 == autre.arg1 and self.arg2 == autre.arg2
+                and self.resultat == autre.resultat
+                and type(self.arg1) is type(autre.arg1) and type(self.arg2) is type(autre.arg2))
+
+    __hash__ = None
+
+    def __reduce__(self):
+        return Quadruplet, (self.op, self.arg1, self.arg2, self.resultat)
+
+    def lus(self):
+        """Temporaires lus par l'instruction"""
+        return [a for a in (self.arg1, self.arg2) if type(a) is Temp]
+
+    def ecrit(self):
+        """Temporaire défini par l'instruction (None s'il n'y en a pas)"""
+        return self.resultat if self.op in DEFINITIONS else None
+
+# -------- Constructeurs --------
+
+
+def comparaison(dest, gauche, op, droite):
+    """dest = gauche op droite (op : '==', '>', ...)"""
+    return Quadruplet(OPERATEURS[op], gauche, droite, dest)
+
+
+def copie(dest, valeur):
+    """dest = valeur"""
+    return Quadruplet(Op.COPIE, valeur, None, dest)
+
+
+def allouer(dest, taille):
+    """dest = allouer_tampon(taille)"""
+    return Quadruplet(Op.ALLOUER, taille, None, dest)
+
+
+def stocke_chaine(tampon, ident):
+    """stocke_chaine tampon, #ident (identifiant dans CHAINES)"""
+    return Quadruplet(Op.STOCKE, tampon, ident)
+
+
+def appel_systeme(service, argument):
+    """appel_systeme service, argument"""
+    return Quadruplet(Op.SYSTEME, service, argument)
+
+
+def si_faux(condition, cible):
+    """ifFalse condition goto cible"""
+    return Quadruplet(Op.SI_FAUX, condition, None, cible)
+
+
+def saut(cible):
+    """goto cible"""
+    return Quadruplet(Op.SAUT, None, None, cible)
+
+
+def label(nom):
+    """label nom (nom : Etiquette)"""
+    return Quadruplet(Op.LABEL, nom)
+
+# ==================== FORME TEXTE ====================
+
+
+def ecrire(instr, chaines=None):
+    """
+    Forme texte d'une instruction
+
+    Args:
+        instr (Quadruplet): Instruction
+        chaines (dict): Identifiant -> texte ; si donné, les chaînes de
+            stocke_chaine sont écrites en clair ("texte") au lieu de #id
+    """
+    op = instr.op
+    if op in COMPARAISONS:
+        return f"{instr.resultat} = {operande_texte(instr.arg1)} {op.value} {operande_texte(instr.arg2)}"
+    if op is Op.COPIE:
+        return f"{instr.resultat} = {operande_texte(instr.arg1)}"
+    if op is Op.ALLOUER:
+        return f"{instr.resultat} = allouer_tampon({instr.arg1})"
+    if op is Op.STOCKE:
+        if chaines is not None:
+            return f'stocke_chaine {instr.arg1}, "{chaines[instr.arg2]}"'
+        return f"stocke_chaine {instr.arg1}, #{instr.arg2}"
+    if op is Op.SYSTEME:
+        return f"appel_systeme {instr.arg1}, {instr.arg2}"
+    if op is Op.SI_FAUX:
+        return f"ifFalse {instr.arg1} goto {instr.resultat}"
+    if op is Op.SAUT:
+        return f"goto {instr.resultat}"
+    return f"label {instr.arg1}"
+
+
+OPERANDE = r'"[^"]*"|[^\s,()"]+'
+_COMPARAISON = re.compile(rf'(t\d+) = ({OPERANDE}) (==|!=|>=|<=|>|<) ({OPERANDE})$')
+_ALLOUER = re.compile(r'(t\d+) = allouer_tampon\((\d+)\)$')
+_COPIE = re.compile(rf'(t\d+) = ({OPERANDE})$')
+_STOCKE = re.compile(r'stocke_chaine (t\d+), (?:#(\d+)|"(.*)")$')
+_SYSTEME = re.compile(r'appel_systeme (\w+), (t\d+)$')
+_SAUT = re.compile(r'(?:ifFalse (t\d+) )?goto (L\d+)$')
+_LABEL = re.compile(r'label (L\d+)$')
+
+
+def lire_operande(texte):
+    """Opérande depuis sa forme texte (tN, LN, nombre, "chaîne" ou variable)"""
+    if texte.startswith('"'):
+        return CHAINES.canonique(texte[1:-1])
+    if re.fullmatch(r'-?\d+', texte):
+        return int(texte)
+    if re.fullmatch(r't\d+', texte):
+        return temporaire(int(texte[1:]))
+    if re.fullmatch(r'L\d+', texte):
+        return etiquette(int(texte[1:]))
+    return variable(texte)
+
+
+def lire(ligne):
+    """
+    Instruction depuis sa forme texte (inverse de ecrire)
+
+    Une chaîne écrite en clair dans stocke_chaine est ajoutée à la table des
+    chaînes.
+
+    Raises:
+        ValueError: Si la ligne n'est pas une instruction valide
+    """
+    ligne = ligne.strip()
+    m = _COMPARAISON.match(ligne)
+    if m:
+        dest, gauche, op, droite = m.groups()
+        return comparaison(lire_operande(dest), lire_operande(gauche), op, lire_operande(droite))
+    m = _ALLOUER.match(ligne)
+    if m:
+        return allouer(lire_operande(m.group(1)), int(m.group(2)))
+    m = _COPIE.match(ligne)
+    if m:
+        return copie(lire_operande(m.group(1)), lire_operande(m.group(2)))
+    m = _STOCKE.match(ligne)
+    if m:
+        tampon, ident, texte = m.groups()
+        ident = int(ident) if ident is not None else CHAINES.identifiant(texte)
+        return stocke_chaine(lire_operande(tampon), ident)
+    m = _SYSTEME.match(ligne)
+    if m:
+        return appel_systeme(m.group(1), lire_operande(m.group(2)))
+    m = _SAUT.match(ligne)
+    if m:
+        condition, cible = m.groups()
+        if condition is None:
+            return saut(lire_operande(cible))
+        return si_faux(lire_operande(condition), lire_operande(cible))
+    m = _LABEL.match(ligne)
+    if m:
+        return label(lire_operande(m.group(1)))
+    raise ValueError(f"Instruction invalide: {ligne}")
+
+
+def lire_code(lignes):
+    """Instructions depuis des lignes de texte (les lignes vides sont ignorées)"""
+    return [lire(ligne) for ligne in lignes if ligne.strip()]
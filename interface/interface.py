@@ -18,488 +18,53 @@ Fonctionnalités principales :
 
 import tkinter as tk
 from tkinter import scrolledtext, filedialog, messagebox, ttk
-from ply.lex import lex
-from ply.yacc import yacc
+from collections import deque
 from pprint import pformat
 import os
 
-# ==================== CONFIGURATION INITIALE ====================
-
-# Fichier de stockage des proverbes
-PROVERBES_FILE = "proverbes.txt"
-
-# Proverbes par défaut (thème: texte)
-DEFAULT_PROVERBES = {
-    "CONSEIL": "أسمع كلام اللي يبكيك وماتسمعش كلام اللي يضحكك",
-    "MODERATION": "إذا صاحبك عسل ما تلحسوش الكل",
-    "SAGESSE": "إسأل مجرب ولا تسأل طبيب",
-    "PRUDENCE": "اللي خاف نجى",
-    "GENEROSITE": "أعمل الخير وارمي في البحر",
-    "ADAPTATION": "أعمل كيف جارك وإلا حول باب دارك",
-    "COURAGE": "اللي يخاف من العفريت يطلع له",
-    "PREVENTION": "شد مشومك لا يجيك ما اشوم",
-    "SANTE": "الصحة تاج على رؤوس الأصحاء",
-    "VAINE": "اللي ينام عالجرح يلاقي الربح",
-    "BIENETRE": "العقل السليم في الجسم السليم",
-    "RICHESSE": "اللي عندو ما يموتش",
-    "DETTE": "اللي عليه مليان، راهو خسران",
-    "SATISFACTION": "القناعة كنز لا يفنى",
-    "METEO": "اللي ما عندوش مطر، يستنا الندى",
-    "AGRICULTURE": "اللي يزرع حصاد",
-    "PATIENCE": "الصبر مفتاح الفرج",
-    "EDUCATION": "اللي يربّي العود يربّي الحصاد",
-    "FAMILLE": "اليد الواحدة ما تصفقش",
-    "TEMPS": "الوقت اللي ما يقدّرش يقدّرك",
-    "AGE": "الكبير كبير ولو طار",
-    "JEUNESSE": "اللي يستعجل ياكل خبز حار",
-    "EXPERIENCE": "الوقت شيخ",
-    "OPPORTUNITE": "اللي يغامر يربح",
-    "NAVIGATION": "المركب اللي ما تهزّش ما تمشّيش",
-    "PECHE": "اللي يخاف من الموج ما يفرشش",
-    "AMITIE": "إسأل على صاحبك إستغناش أما الطبيعة هي هي",
-    "TRAHISON": "البقرة كيف اتطيح تكثر اسكاكينها",
-    "ESPOIR_DECU": "عاش يتمني في عنبة مات جابولو عرجون",
-    "INEFFICACITE ": "جا يعاون فيه على قبر بوه هربلو بالفاس",
-    "REVANCHE": "الّي يبيعك بالفول بيعو بالقشور",
-    "INJUSTICE": "عريان يسلب في ميت",
-    "DESTINEE": "الي ليك لك و الي خاطيك خاطيك",
-    "ECHEC": "جا يكحلها عماها",
-    "VERITE": "اللي فيه طبة عمرها ماتتخبى",
-    "AUTOJUSTIFICATION": "ضربو على قرعتو قال شعري طاح",
-    "HERITAGE": "ولد الفار يطلع حفار",
-    "FOLIE": "مهبولة و زغرتولها في وذنها",
-    "OUBLI": "ملي دفنوه مازاروه",
-    "NOSTALGIE": "اللي يبدل لحية بلحية يجي نهار يشتاقهم لثنين",
-    "COINCIDENCE": "فردة ولقات اختها",
-    "ABUS": "اللي يكثر مالعسل يمصاط",
-    "IRONIE": "قلو يقوي سعدك قلو توة توة",
-    "CONTRASTE_ACTIONS": "أعملْ الخير وأنساه واعْمل الشّر وتفكره",
-    "RELIGION_TRAVAIL": "أعمِلْ الفرض وانقب الأرض",
-    "IMITATION": "أعمِلْ كيف جارك وإلا حول باب دارك",
-    "FIERTE": "إللّي يعْرف عِزَو كلام الناس ما يهزو",
-    "HUMILITE": "كلّي راسو فيها وكلّي دارو فيها",
-    "SOLIDARITE": "اللي ما يعرفك ما يثمنك",
-    "JUSTICE": "اللي يزرع الشوك ما يجنيش الورد",
-    "HONNETETE": "الصدق منجى والكذب مهلك",
-    "TRAVAIL": "اليد اللي ما تقرضش ما تلسعش",
-    "OPINIATRETE": "اللي ما يسمعش كلام الناس يسمع كلام الراس",
-    "CHANCE": "اللي ما يربحش في القرعة يربح في اللقعة",
-    "DISCERNEMENT": "اللي ما يعرف الصقر يشويه",
-    "OPPORTUNITE_PERDUE": "الفرصة ما تباتش تاني",
-    "TEMERITE": "اللي ما يخافش من الموت ما يخافش من الذكر",
-    "AVARICE": "اللي يبخل على نفسه كيفاش يبخل على الناس",
-    "MALCHANCE": "اللي ما يربحش في اللقعة يربح في القرعة",
-    "INGRATITUDE": "ربّي الكلب عاضك",
-    "HYPOCRISIE": "وجه حلو وقلب ملعون",
-    "FATALISME": "اللي كتب ليك يجيك ولو كان تحت الأرض",
-    "DETERMINATION": "اللي يخاف من العfريت يطلع له",
-    "ESPOIR": "الصبر مفتاح الفرج",
-    "TEMPERANCE": "اللي ياكل بزاف ياكلو بزاف",
-    "RECONNAISSANCE": "اللي يعمل المعروف يلقاه",
-    "MEFIANCE": "اللي يخاف من الشيطان يخاف من الظل",
-    "AMBITION": "اللي ما يطيرش عالعالية ينام في الحضيضة",
-    "RUSE": "اللي ما يعرفش يلعب بالعصا يلعب بالعصافير",
-    "CHARITE": "اليد اللي ما تعطي ما تاخدش",
-    "HABITUDE": "اللي يعود على الشيء يصير عليه",
-    "DILIGENCE": "اللي يستعجل ياكل خبز حار",
-    "PRESCIENCE": "اللي ما يعرفش آخر الدرب ما يمشيش في الليل",
-    "OPINIATRE": "اللي ما يسمعش كلام الناس يسمع كلام الراس",
-    "PERSEVERANCE": "اللي يضرب الحديد وهو بارد ما يطلعش منه نار",
-    "TEMERITE": "اللي ما يخافش من الموت ما يخافش من الذكر",
-    "CONFIANCE": "اللي يثق في الناس ينام قرير العين",
-    "MALADRESSE": "اللي ما يعرفش يسبح يقول المي عميقة",
-    "INGENIOSITE": "اللي ما عندوش حبل يربط به الحمار يربطه بذنبه",
-    "OPPORTUNISME": "اللي ما يعرفش يلعب بالعصا يلعب بالعصافير",
-    "PREVOYANCE": "اللي ما يخيطش جرابه ينام حافي",
-    "RENONCEMENT": "اللي ما يقدرش على العنب يقول حامض",
-    "AUDACE": "اللي ما يخافش من اللي يموت ما يخافش من اللي يذبح",
-    "FATIGUE": "اللي ما ينامش بالليل ينام بالنهار",
-    "OPPORTUNITE_SAISIE": "اللي يغتنم الفرصة ما يندمش",
-    "PRECAUTION": "اللي ما يخيطش جرابه ينام حافي",
-    "DISCIPLINE": "اللي ما يربّيش العود ما يربّيش الحصاد",
-    "HONNEUR": "اللي ما يخافش من الموت ما يخافش من الذكر",
-    "SERENITE": "اللي ما يهتمش بالدنيا ينام قرير العين"
-}
-
-# ==================== ANALYSE SEMANTIQUE AMELIOREE ====================
-
-
-class SemanticAnalyzer:
-    """
-    Analyseur sémantique amélioré avec vérification des correspondances
-    entre conditions et proverbes affichés.
-
-    Attributs:
-        errors (list): Liste des erreurs sémantiques détectées
-        warnings (list): Liste des avertissements sémantiques
-        symbol_table (dict): Table des symboles (variables déclarées)
-        used_proverbs (set): Ensemble des proverbes utilisés
-        proverbes (dict): Dictionnaire des proverbes disponibles
-        themes_attendus (dict): Règles de correspondance condition/proverbe
-    """
-
-    def __init__(self, proverbes):
-        """Initialise l'analyseur avec les proverbes disponibles"""
-        self.errors = []
-        self.warnings = []
-        self.symbol_table = {}
-        self.used_proverbs = set()
-        self.proverbes = proverbes
-
-        # Définition des thèmes attendus pour chaque type de condition
-        self.themes_attendus = {
-            # Conditions string avec valeurs possibles et thèmes attendus
-            "humeur": {
-                "triste": ["CONSEIL", "PATIENCE", "SOLIDARITE"],
-                "joyeuse": ["BIENETRE", "SATISFACTION", "FIERTE"],
-                "colere": ["PRUDENCE", "MODERATION", "TEMPERANCE"],
-                "peur": ["COURAGE", "DETERMINATION", "TEMERITE"]
-            },
-            "besoin": {
-                "conseil": ["CONSEIL", "SAGESSE", "EXPERIENCE"],
-                "aide": ["SOLIDARITE", "GENEROSITE", "CHARITE"],
-                "argent": ["RICHESSE", "DETTE", "SATISFACTION"],
-                "sante": ["SANTE", "BIENETRE", "PATIENCE"]
-            },
-            "situation": {
-                "difficile": ["PERSEVERANCE", "PATIENCE", "ESPOIR"],
-                "facile": ["MODERATION", "PRUDENCE", "HUMILITE"],
-                "dangereuse": ["COURAGE", "PRUDENCE", "PREVENTION"],
-                "incertaine": ["PATIENCE", "SAGESSE", "PREVOYANCE"]
-            },
-            # Conditions numériques avec seuils et thèmes attendus
-            "age": {
-                (0, 18): ["JEUNESSE", "EDUCATION", "DISCIPLINE"],
-                (19, 40): ["AMBITION", "TRAVAIL", "OPPORTUNITE"],
-                (41, 60): ["SAGESSE", "EXPERIENCE", "PRUDENCE"],
-                (61, 150): ["AGE", "PATIENCE", "SATISFACTION"]
-            },
-            "richesse": {
-                (0, 1000): ["SATISFACTION", "GENEROSITE", "TRAVAIL"],
-                (1001, 10000): ["RICHESSE", "PRUDENCE", "MODERATION"],
-                (10001, 100000): ["GENEROSITE", "CHARITE", "HONNETETE"],
-                (100001, float('inf')): ["AVARICE", "OPPORTUNISME", "HYPOCRISIE"]
-            }
-        }
-
-    def get_expected_themes(self, var, val=None):
-        """
-        Retourne les thèmes attendus pour une variable et valeur donnée
-
-        Args:
-            var (str): Nom de la variable conditionnelle
-            val (str/int/float): Valeur de la variable (optionnel)
-
-        Returns:
-            list: Liste des thèmes de proverbes attendus
-        """
-        expected = []
-
-        # Pour les variables string
-        if var in self.themes_attendus and isinstance(self.themes_attendus[var], dict):
-            if val and val in self.themes_attendus[var]:
-                expected.extend(self.themes_attendus[var][val])
-            else:
-                # Si pas de valeur spécifique, prendre tous les thèmes possibles
-                for themes in self.themes_attendus[var].values():
-                    expected.extend(themes)
-
-        # Pour les variables numériques
-        elif var in self.themes_attendus and isinstance(self.themes_attendus[var], dict):
-            if isinstance(val, (int, float)):
-                for (min_val, max_val), themes in self.themes_attendus[var].items():
-                    if min_val <= val <= max_val:
-                        expected.extend(themes)
-            else:
-                # Si pas de valeur spécifique, prendre tous les thèmes possibles
-                for themes in self.themes_attendus[var].values():
-                    expected.extend(themes)
-
-        return list(set(expected))  # Éliminer les doublons
-
-    def check_condition_proverb_match(self, var, val, proverb_theme):
-        """
-        Vérifie la cohérence sémantique entre condition et proverbe
-
-        Args:
-            var (str): Variable de la condition
-            val (str/int/float): Valeur de la condition
-            proverb_theme (str): Thème du proverbe à afficher
-
-        Returns:
-            bool: True si la correspondance est valide, False sinon
-        """
-        expected_themes = self.get_expected_themes(var, val)
-
-        if not expected_themes:
-            self.warnings.append(f"Aucun thème attendu défini pour la variable '{var}'")
-            return True
-
-        if proverb_theme not in expected_themes:
-            self.errors.append(
-                f"Incohérence sémantique: le proverbe '{proverb_theme}' ({self.proverbes[proverb_theme]}) "
-                f"ne correspond pas à la condition '{var} == {val}'. "
-                f"Thèmes attendus: {', '.join(expected_themes)}"
-            )
-            return False
-        return True
-
-    def check_condition(self, condition):
-        """
-        Analyse sémantique d'une condition avec vérification renforcée
-
-        Args:
-            condition (tuple): Condition à analyser sous forme de tuple
-        """
-        if len(condition) == 5:  # SI condition
-            var, op, val, actions = condition[1], condition[2], condition[3], condition[4]
-
-            # Vérification déclaration variable
-            if var not in self.symbol_table:
-                self.symbol_table[var] = 'string' if op == '==' else 'number'
-
-            # Vérification type cohérent
-            if op == '==' and self.symbol_table.get(var) != 'string':
-                self.errors.append(f"Type incompatible pour {var} (attendu: string)")
-            elif op == '>' and self.symbol_table.get(var) != 'number':
-                self.errors.append(f"Type incompatible pour {var} (attendu: number)")
-
-            # Vérifier les actions
-            self.check_actions(var, val, actions)
-
-        else:  # SINON SI condition
-            var, op, val, actions = condition[3], condition[4], condition[5], condition[6]
-
-            if var not in self.symbol_table:
-                self.symbol_table[var] = 'number'
-            elif self.symbol_table[var] != 'number':
-                self.errors.append(f"Type incompatible pour {var} (attendu: number)")
-
-            # Vérifier les actions
-            self.check_actions(var, val, actions)
-
-    def check_actions(self, condition_var, condition_val, actions):
-        """
-        Analyse sémantique des actions avec vérification des proverbes
-
-        Args:
-            condition_var (str): Variable de la condition parente
-            condition_val (str/int/float): Valeur de la condition parente
-            actions (list): Liste des actions à analyser
-        """
-        for action in actions:
-            if action[0] == 'AFFICHER':
-                if "PROVERBE INCONNU" in action[1]:
-                    self.errors.append(f"Proverbe inconnu: {action[1]}")
-                else:
-                    # Extraire le thème du proverbe vérifié
-                    parts = action[1].split(':')
-                    if len(parts) > 0:
-                        proverb_theme = parts[0].strip()
-                        if proverb_theme in self.proverbes:
-                            self.used_proverbs.add(proverb_theme)
-                            # Vérifier la cohérence sémantique
-                            self.check_condition_proverb_match(condition_var, condition_val, proverb_theme)
+from analyse_incrementale import AnalyseIncrementale
+from analyseur import construire_lexer, parse
+from cache_compilation import CacheCompilation, cle_compilation
+from chaines import CHAINES
+from diagnostics import ERREUR, Diagnostics
+from catalogue import (DEFAULT_PROVERBES, PROVERBES_FILE, CatalogueBinaire, init_proverbes_file,
+                       ouvrir_catalogue)
+from index_proverbes import ProverbIndex
+from regles import REGLES
+from SemanticAnalyzer import SemanticAnalyzer
+
+# Délai sans frappe avant l'analyse incrémentale (millisecondes)
+DELAI_ANALYSE_MS = 300
+
+# Rendu par lots de la zone de résultats : segments (texte, style) insérés
+# par appel Tk, un paquet par passage dans la boucle d'événements
+TAILLE_PAQUET = 500
+# Tokens affichés avant le lien « afficher plus »
+LIMITE_TOKENS = 1000
 
 # ==================== GESTION DES PROVERBES ====================
 
 
-def init_proverbes_file():
-    """
-    Crée le fichier proverbes.txt s'il n'existe pas
-    avec les proverbes par défaut
-    """
-    if not os.path.exists(PROVERBES_FILE):
-        with open(PROVERBES_FILE, 'w', encoding='utf-8') as f:
-            for cle, val in DEFAULT_PROVERBES.items():
-                f.write(f"{cle}:{val}\n")
-
-
 def charger_proverbes():
     """
     Charge les proverbes depuis le fichier texte
 
+    Le fichier texte n'est relu que s'il a changé depuis la dernière
+    conversion au format binaire ; le catalogue est ensuite projeté en
+    mémoire (mmap) : seuls les proverbes consultés sont lus dans le fichier,
+    il n'est pas chargé en entier dans un dictionnaire (voir
+    ouvrir_catalogue, qui se replie sur un dictionnaire si le fichier
+    binaire ne peut pas être écrit).
+
     Returns:
-        dict: Dictionnaire des proverbes {thème: texte}
+        Mapping: Catalogue des proverbes {thème: texte}
     """
-    proverbes = {}
     try:
-        with open(PROVERBES_FILE, 'r', encoding='utf-8') as f:
-            for ligne in f:
-                if ':' in ligne:
-                    cle, val = ligne.split(':', 1)
-                    proverbes[cle.strip()] = val.strip()
-        return proverbes
+        return ouvrir_catalogue()
     except Exception as e:
         messagebox.showerror("Erreur", f"Impossible de charger les proverbes: {str(e)}")
         return DEFAULT_PROVERBES
 
-# ==================== ANALYSEUR LEXICAL ET SYNTAXIQUE ====================
-
-
-# ==================== Début ANALYSEUR LEXICAL ====================
-
-
-def init_analyzer(proverbes):
-    """
-    Initialise l'analyseur lexical et syntaxique
-
-    Args:
-        proverbes (dict): Dictionnaire des proverbes disponibles
-
-    Returns:
-        tuple: (lexer, parser, symbol_table)
-    """
-    # Définition des tokens
-    tokens = ('SI', 'SINON', 'EGAL', 'SUPERIEUR', 'AFFICHER', 'ET',
-              'PROVERBE', 'NOMBRE', 'STRING', 'NOM', 'DPOINTS')
-
-    # Définition des expressions régulières pour les tokens simples
-    t_EGAL = r'=='
-    t_SUPERIEUR = r'>'
-    t_DPOINTS = r':'
-    t_ignore = ' \t'
-
-    # Mots réservés
-    reserved = {
-        'si': 'SI',
-        'sinon': 'SINON',
-        'afficher': 'AFFICHER',
-        'et': 'ET'
-    }
-
-    # Fonctions de traitement des tokens complexes
-    # Tokenise les appels de proverbes (PROVERBE("texte")) et extrait le contenu
-    def t_PROVERBE(t):
-        r'PROVERBE\(\s*"([^"]+)"\s*\)'
-        t.value = t.value[9:-1].strip('"\' ')
-        return t
-
-    # Tokenise les nombres entiers et les convertit en type int
-    def t_NOMBRE(t):
-        r'\d+'
-        t.value = int(t.value)
-        return t
-
-    # Tokenise les chaînes entre guillemets et supprime les guillemets
-    def t_STRING(t):
-        r'"[^"]+"'
-        t.value = t.value[1:-1]
-        return t
-
-    # Tokenise les identifiants et vérifie s'ils sont des mots réservés
-    def t_NOM(t):
-        r'[a-zA-Z_éèà][a-zA-Z0-9_éèà]*'
-        t.type = reserved.get(t.value.lower(), 'NOM')
-        return t
-
-    # Gère les sauts de ligne et initialise la numérotation des lignes à 1
-    def t_newline(t):
-        r'\n+'
-        t.lexer.lineno += len(t.value)
-        if not hasattr(t.lexer, 'lineno_initialized'):
-            t.lexer.lineno = 1
-            t.lexer.lineno_initialized = True
-
-    # Gère les erreurs lexicales en levant une exception avec le caractère fautif
-    def t_error(t):
-        raise SyntaxError(f"Erreur lexicale: '{t.value[0]}' (ligne {t.lineno})")
-
-    # Crée et retourne l'instance du lexer configuré
-    lexer = lex()
-
-    # Création du lexer
-    lexer = lex()
-
-    # ==================== FIN ANALYSEUR LEXICAL ====================
-
-    # ==================== DEBUT ANALYSEUR  SYNTAXIQUE ====================
-
-    # Table des symboles pour le parser
-    symbol_table = {}
-
-    # Définition de la grammaire
-    # Règle de grammaire pour la structure principale d'un conseil (peut contenir une ou plusieurs conditions)
-    def p_conseil(p):
-        '''conseil : condition
-                  | conseil condition'''
-        if len(p) == 2:
-            p[0] = [p[1]]
-        else:
-            p[0] = p[1] + [p[2]]
-# Règle de grammaire pour les conditions SI/SINON SI avec gestion de la table des symboles
-
-    def p_condition(p):
-        '''condition : SI NOM EGAL STRING DPOINTS actions
-                    | SI NOM SUPERIEUR NOMBRE DPOINTS actions
-                    | SINON SI NOM SUPERIEUR NOMBRE DPOINTS actions'''
-        if len(p) == 7:
-            if p[2] not in symbol_table:
-                symbol_table[p[2]] = 'string' if p[3] == '==' else 'number'
-            p[0] = ('CONDITION', p[2], p[3], p[4], p[6])
-        else:
-            if p[3] not in symbol_table:
-                symbol_table[p[3]] = 'number'
-            p[0] = ('CONDITION', 'sinon', p[3], p[4], p[5], p[7])
-
-    def verifier_proverbe(texte):
-        """
-        Vérifie si le proverbe existe exactement et retourne sa version complète
-
-        Args:
-            texte (str): Texte du proverbe à vérifier
-
-        Returns:
-            str: Version complète du proverbe ou message d'erreur
-        """
-        # Nettoyer le texte des espaces et guillemets supplémentaires
-        texte = texte.strip().strip('"\'')
-
-        # Normaliser l'unicode pour la comparaison
-        texte = texte.replace('"', '').replace("'", "")
-
-        # Recherche exacte dans les valeurs de proverbes
-        for cle, val in proverbes.items():
-            if texte == val:
-                return f"{cle}: {val}"
-
-        # Si non trouvé, vérifier si c'est une partie d'un proverbe existant
-        for cle, val in proverbes.items():
-            if texte in val:
-                return f"ATTENTION: Partiel - {cle}: {val}"
-
-        return f"PROVERBE INCONNU: {texte}"
-
-     # Règle de grammaire pour les actions d'affichage (simple ou multiples avec ET)
-    def p_actions(p):
-        '''actions : AFFICHER PROVERBE
-                | actions ET PROVERBE'''
-        if len(p) == 3:
-            verified = verifier_proverbe(p[2])
-            if "ATTENTION:" in verified:
-                # Afficher un warning pour les proverbes partiels
-                p[0] = [('AFFICHER', verified), ('WARNING', "Le proverbe saisi est partiel")]
-            else:
-                p[0] = [('AFFICHER', verified)]
-        else:
-            verified = verifier_proverbe(p[3])
-            if "ATTENTION:" in verified:
-                p[0] = p[1] + [('AFFICHER', verified), ('WARNING', "Le proverbe saisi est partiel")]
-            else:
-                p[0] = p[1] + [('AFFICHER', verified)]
-
-     # Gestion des erreurs syntaxiques avec localisation précise
-    def p_error(p):
-        if p:
-            raise SyntaxError(f"Erreur syntaxique ligne {p.lineno}: '{p.value}'")
-        else:
-            raise SyntaxError("Erreur: Fin de fichier inattendue")
-
-    # Création du parser
-    parser = yacc()
-
-    return lexer, parser, symbol_table
-
 # ==================== INTERFACE AMÉLIORÉE ====================
 
 
@@ -511,6 +76,11 @@ class ImprovedText(scrolledtext.ScrolledText):
     - Afficher des en-têtes, sections, sous-sections
     - Afficher des messages avec différents niveaux (erreur, avertissement, succès)
     - Formater des éléments spécifiques (proverbes, symboles, code)
+
+    Entre debut_lot() et fin_lot(), les ajouts sont regroupés en segments
+    (texte, style) au lieu d'être insérés un à un ; fin_lot() les insère par
+    paquets de TAILLE_PAQUET segments, un paquet par passage dans la boucle
+    Tk, pour que l'interface reste réactive sur un gros rapport.
     """
 
     def __init__(self, *args, **kwargs):
@@ -542,60 +112,172 @@ class ImprovedText(scrolledtext.ScrolledText):
         self.tag_config('token', foreground='#2c3e50', font=('Consolas', 10))
         self.tag_config('code', foreground='#34495e', font=('Consolas', 10))
         self.tag_config('divider', foreground='#bdc3c7')
+        self.tag_config('lien', foreground='#3498db', underline=True)
+        self.tag_bind('lien', '<Enter>', lambda event: self.configure(cursor='hand2'))
+        self.tag_bind('lien', '<Leave>', lambda event: self.configure(cursor=''))
+
+        self._lot = None          # segments [morceaux, style] du lot ouvert (None : insertion directe)
+        self._paquets = deque()   # paquets (texte, style, texte, style, ...) en attente d'insertion
+        self._rendu = None        # identifiant after() du prochain paquet
+        self._suites = 0          # compteur des liens « afficher plus »
+
+    # ==================== RENDU PAR LOTS ====================
+
+    def ajouter(self, texte, style=()):
+        """Ajoute du texte à la fin (dans le lot ouvert, ou après les paquets en attente)"""
+        lot = self._lot
+        if lot is not None:
+            # Les ajouts consécutifs de même style forment un seul segment
+            if lot and lot[-1][1] == style:
+                lot[-1][0].append(texte)
+            else:
+                lot.append(([texte], style))
+        elif self._paquets:
+            self._paquets.append((texte, style))
+        else:
+            self.insert(tk.END, texte, style)
+
+    def debut_lot(self):
+        """Ouvre un lot : les ajouts suivants sont insérés par fin_lot()"""
+        if self._lot is None:
+            self._lot = []
+
+    def fin_lot(self):
+        """
+        Ferme le lot ouvert : le premier paquet est inséré tout de suite, les
+        suivants à chaque passage dans la boucle Tk (sans effet hors lot)
+        """
+        lot, self._lot = self._lot, None
+        if not lot:
+            return
+        paquet, taille = [], 0
+        for morceaux, style in lot:
+            for debut in range(0, len(morceaux), TAILLE_PAQUET):
+                tranche = morceaux[debut:debut + TAILLE_PAQUET]
+                paquet += ("".join(tranche), style)
+                taille += len(tranche)
+                if taille >= TAILLE_PAQUET:
+                    self._paquets.append(tuple(paquet))
+                    paquet, taille = [], 0
+        if paquet:
+            self._paquets.append(tuple(paquet))
+        if self._rendu is None:
+            self._inserer_paquet()
+
+    def _inserer_paquet(self):
+        """Insère le prochain paquet (un seul appel Tk) et planifie le suivant"""
+        self._rendu = None
+        if self._paquets:
+            self.insert(tk.END, *self._paquets.popleft())
+        if self._paquets:
+            self._rendu = self.after(1, self._inserer_paquet)
+
+    def effacer(self):
+        """Efface le contenu, le lot ouvert et les paquets en attente"""
+        if self._rendu is not None:
+            self.after_cancel(self._rendu)
+            self._rendu = None
+        self._paquets.clear()
+        if self._lot is not None:
+            self._lot = []
+        self.delete(1.0, tk.END)
+
+    # ==================== FORMATAGE ====================
 
     def add_header(self, text):
         """Ajoute un en-tête avec soulignement"""
-        self.insert(tk.END, f"\n{text.upper()}\n", 'header')
-        self.insert(tk.END, "=" * len(text) + "\n", 'header')
+        self.ajouter(f"\n{text.upper()}\n", 'header')
+        self.ajouter("=" * len(text) + "\n", 'header')
 
     def add_section(self, text):
         """Ajoute une section avec soulignement"""
-        self.insert(tk.END, f"\n{text}\n", 'section')
-        self.insert(tk.END, "-" * len(text) + "\n", 'section')
+        self.ajouter(f"\n{text}\n", 'section')
+        self.ajouter("-" * len(text) + "\n", 'section')
 
     def add_subsection(self, text):
         """Ajoute une sous-section avec puce"""
-        self.insert(tk.END, f"\n• {text}\n", 'subsection')
+        self.ajouter(f"\n• {text}\n", 'subsection')
 
     def add_divider(self):
         """Ajoute une ligne de séparation horizontale"""
-        self.insert(tk.END, "\n" + "─" * 80 + "\n", 'divider')
+        self.ajouter("\n" + "─" * 80 + "\n", 'divider')
 
     def add_error(self, message):
         """Ajoute un message d'erreur avec icône"""
-        self.insert(tk.END, f"✖ {message}\n", 'error')
+        self.ajouter(f"✖ {message}\n", 'error')
 
     def add_warning(self, message):
         """Ajoute un message d'avertissement avec icône"""
-        self.insert(tk.END, f"⚠ {message}\n", 'warning')
+        self.ajouter(f"⚠ {message}\n", 'warning')
 
     def add_success(self, message):
         """Ajoute un message de succès avec icône"""
-        self.insert(tk.END, f"✓ {message}\n", 'success')
+        self.ajouter(f"✓ {message}\n", 'success')
 
     def add_info(self, message):
         """Ajoute un message d'information standard"""
-        self.insert(tk.END, f"{message}\n", 'info')
+        self.ajouter(f"{message}\n", 'info')
 
     def add_proverb(self, theme, proverb):
         """Ajoute un proverbe avec formatage spécial"""
-        self.insert(tk.END, f"{theme}: ", 'proverb')
-        self.insert(tk.END, f"{proverb}\n", 'info')
+        self.ajouter(f"{theme}: ", 'proverb')
+        self.ajouter(f"{proverb}\n", 'info')
 
     def add_symbol(self, var, typ):
         """Ajoute une entrée de la table des symboles avec formatage"""
-        self.insert(tk.END, f"{var}: ", 'symbol')
-        self.insert(tk.END, f"{typ}\n", 'info')
+        self.ajouter(f"{var}: ", 'symbol')
+        self.ajouter(f"{typ}\n", 'info')
+
+    @staticmethod
+    def _segments_token(token_type, token_value, lineno):
+        """Segments (texte, style, texte, style) de l'affichage d'un token"""
+        return (f"{token_type:15}", 'token', f"{str(token_value):30}(ligne {lineno})\n", 'info')
 
     def add_token(self, token_type, token_value, lineno):
         """Ajoute un token avec formatage spécial"""
-        self.insert(tk.END, f"{token_type:15}", 'token')
-        self.insert(tk.END, f"{str(token_value):30}", 'info')
-        self.insert(tk.END, f"(ligne {lineno})\n", 'info')
+        type_token, style_type, reste, style_reste = self._segments_token(token_type, token_value, lineno)
+        self.ajouter(type_token, style_type)
+        self.ajouter(reste, style_reste)
+
+    def add_tokens(self, tokens, limite=LIMITE_TOKENS):
+        """
+        Ajoute une liste de tokens (type, valeur, ligne) : les limite premiers
+        seulement, suivis d'un lien qui affiche les limite suivants
+        """
+        for token in tokens[:limite]:
+            self.add_token(*token)
+        if len(tokens) > limite:
+            self.ajouter(*self._lien_suite(tokens, limite, limite))
+
+    def _lien_suite(self, tokens, debut, limite):
+        """Segment (texte, style) du lien « afficher plus » des tokens à partir de debut"""
+        self._suites += 1
+        tag = f"suite{self._suites}"
+        self.tag_bind(tag, '<Button-1>', lambda event: self._afficher_suite(tag, tokens, debut, limite))
+        return (f"▸ Afficher {min(limite, len(tokens) - debut)} tokens de plus "
+                f"({len(tokens) - debut} restants)\n", ('lien', tag))
+
+    def _afficher_suite(self, tag, tokens, debut, limite):
+        """Remplace le lien tag par les tokens suivants (et un nouveau lien s'il en reste)"""
+        etendue = self.tag_ranges(tag)
+        if not etendue:
+            return
+        self.mark_set('suite', etendue[0])
+        self.delete(*etendue)
+        self.tag_delete(tag)
+        self.configure(cursor='')
+        segments = []
+        for token in tokens[debut:debut + limite]:
+            segments += self._segments_token(*token)
+        if debut + limite < len(tokens):
+            segments += self._lien_suite(tokens, debut + limite, limite)
+        # Un seul appel Tk ; la marque suit le texte inséré
+        self.insert('suite', *segments)
+        self.mark_unset('suite')
 
     def add_code(self, code):
         """Ajoute du code avec formatage spécial"""
-        self.insert(tk.END, f"{code}\n", 'code')
+        self.ajouter(f"{code}\n", 'code')
 
 
 class AnalyseurApp:
@@ -605,9 +287,10 @@ class AnalyseurApp:
     Attributs:
         root (tk.Tk): Fenêtre principale
         proverbes (dict): Dictionnaire des proverbes chargés
+        index (ProverbIndex): Index du catalogue de proverbes
         lexer: Analyseur lexical
-        parser: Analyseur syntaxique
         symbol_table (dict): Table des symboles
+        analyse_incrementale (AnalyseIncrementale): Cache de l'analyse incrémentale
     """
 
     def __init__(self, root):
@@ -619,7 +302,12 @@ class AnalyseurApp:
         # Charger les proverbes
         init_proverbes_file()
         self.proverbes = charger_proverbes()
-        self.lexer, self.parser, self.symbol_table = init_analyzer(self.proverbes)
+        self.index = ProverbIndex(self.proverbes)
+        self.lexer = construire_lexer()
+        self.symbol_table = {}
+        self.analyse_incrementale = AnalyseIncrementale(self.index)
+        self.analyse_planifiee = None
+        self.cache = CacheCompilation()
 
         # Configuration du style
         self.setup_style()
@@ -698,6 +386,9 @@ class AnalyseurApp:
         ttk.Button(btn_frame, text="Analyser (Ctrl+Enter)", command=self.analyser_grammaire).pack(side='left', padx=5)
         ttk.Button(btn_frame, text="Effacer", command=self.effacer_resultats).pack(side='left', padx=5)
         ttk.Button(btn_frame, text="Exporter résultats", command=self.exporter_resultats).pack(side='left', padx=5)
+        self.incremental_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(btn_frame, text="Analyse incrémentale", variable=self.incremental_var,
+                        command=self.planifier_analyse).pack(side='left', padx=5)
         main_paned.add(btn_frame)
 
         # Résultats (60%)
@@ -710,6 +401,9 @@ class AnalyseurApp:
         # Raccourci clavier
         self.root.bind('<Control-Return>', lambda e: self.analyser_grammaire())
 
+        # Réanalyse incrémentale après chaque modification (si activée)
+        self.input_text.bind('<KeyRelease>', self.planifier_analyse, add='+')
+
     def setup_proverbes_tab(self):
         """Configure l'onglet Proverbes avec la liste et les options de filtrage"""
         # Frame principale
@@ -876,7 +570,7 @@ class AnalyseurApp:
             ("Test conseil simple (valide)", """si humeur == "triste":
     afficher PROVERBE("أسمع كلام اللي يبكيك وماتسمعش كلام اللي يضحكك")"""),
             ("Test condition numérique (valide)", """si age > 60:
-    afficher PROVERBE("إسأل مجرب ولا تسأل طبيب")"""),
+    afficher PROVERBE("الكبير كبير ولو طار")"""),
             ("Test santé (valide)", """si sante == "fragile":
     afficher PROVERBE("الصحة تاج على رؤوس الأصحاء")"""),
             ("Test finances (valide)", """si richesse == "abondante":
@@ -936,7 +630,7 @@ sinon si age > 30:
 
     def run_semantic_tests(self):
         """Exécute une batterie de tests sémantiques avec 2 tests non valides de chaque type"""
-        self.result_text.delete(1.0, tk.END)
+        self.result_text.effacer()
         self.result_text.add_section("TESTS COMPLETS (12 tests)")
         self.result_text.add_info(
             "Incluant 8 tests valides, 2 non valides lexicaux, 2 non valides syntaxiques et 2 non valides sémantiques")
@@ -958,10 +652,10 @@ sinon si age > 30:
             {
                 "name": "Test condition numérique",
                 "code": """si age > 60:
-    afficher PROVERBE("إسأل مجرب ولا تسأل طبيب")""",
+    afficher PROVERBE("الكبير كبير ولو طار")""",
                 "expected": {
                     "symbols": {"age": "number"},
-                    "proverbs": ["SAGESSE"],
+                    "proverbs": ["AGE"],
                     "errors": 0,
                     "warnings": 0
                 }
@@ -1122,17 +816,7 @@ sinon si age > 30:
         self.result_text.add_info(f"Code:\n{test['code']}")
 
         try:
-            # Réinitialisation
-            self.symbol_table.clear()
-            analyzer = SemanticAnalyzer(self.proverbes)
-
-            # Analyse
-            result = self.parser.parse(test['code'])
-
-            # Vérification sémantique
-            if isinstance(result, list):
-                for condition in result:
-                    analyzer.check_condition(condition)
+            analyzer = self.analyser_test(test['code'])
 
             # Vérification des résultats
             test_passed = True
@@ -1222,18 +906,64 @@ sinon si age > 30:
             else:
                 self.result_text.add_error("\nTEST ÉCHOUÉ!")
 
-            self.result_text.insert(tk.END, "\n" + "=" * 80 + "\n")
+            self.result_text.ajouter("\n" + "=" * 80 + "\n")
 
         except Exception as e:
             if test['expected'].get('lexical_error', False) or test['expected'].get('syntax_error', False):
                 self.result_text.add_success(f"\nErreur détectée comme attendue: {str(e)}")
             else:
                 self.result_text.add_error(f"\nErreur d'exécution: {str(e)}")
-            self.result_text.insert(tk.END, "\n" + "=" * 80 + "\n")
+            self.result_text.ajouter("\n" + "=" * 80 + "\n")
+
+    def analyser_test(self, code):
+        """
+        Analyse syntaxique et sémantique d'un code de test
+
+        Le résultat est mis en cache selon le code, le catalogue et les règles
+        sémantiques : relancer la batterie de tests ne réanalyse que les
+        tests modifiés.
+
+        Returns:
+            SemanticAnalyzer: Analyseur après vérification (à ne pas modifier)
+
+        Raises:
+            SyntaxError: En cas d'erreur lexicale ou syntaxique
+        """
+        regles = REGLES.actuelles()
+        cle = cle_compilation(code, self.index, regles, etape='test')
+        analyzer = self.cache.obtenir(cle)
+        if analyzer is None:
+            # Réinitialisation
+            self.symbol_table.clear()
+            analyzer = SemanticAnalyzer(self.proverbes, regles)
+
+            # Analyse et vérification sémantique (une erreur syntaxique est
+            # mise en cache à la place de l'analyseur)
+            try:
+                result = parse(code, self.index, self.symbol_table)
+            except SyntaxError as e:
+                analyzer = e
+            else:
+                if isinstance(result, list):
+                    for condition in result:
+                        analyzer.check_condition(condition)
+            self.cache.enregistrer(cle, analyzer)
+
+        if isinstance(analyzer, SyntaxError):
+            raise SyntaxError(str(analyzer))
+        return analyzer
 
     def actualiser_proverbes(self):
         """Recharge les proverbes depuis le fichier"""
+        # Libérer l'ancienne projection avant que le fichier binaire soit remplacé
+        if isinstance(self.proverbes, CatalogueBinaire):
+            self.proverbes.close()
+        # Les chaînes internées pour l'ancien catalogue sont libérées (les
+        # caches d'analyse se vident avec la table, voir chaines)
+        CHAINES.vider()
         self.proverbes = charger_proverbes()
+        self.index = ProverbIndex(self.proverbes)
+        self.analyse_incrementale = AnalyseIncrementale(self.index)
         self.afficher_proverbes()
         messagebox.showinfo("Info", "Proverbes actualisés avec succès!")
 
@@ -1291,13 +1021,13 @@ sinon si age > 30:
     def effacer_tout(self):
         """Efface toutes les zones de texte"""
         self.input_text.delete(1.0, tk.END)
-        self.result_text.delete(1.0, tk.END)
+        self.result_text.effacer()
         self.test_var.set("")
 
     def effacer_resultats(self):
         """Efface les zones de saisie et de résultats"""
         self.input_text.delete(1.0, tk.END)
-        self.result_text.delete(1.0, tk.END)
+        self.result_text.effacer()
 
     def analyser_grammaire(self):
         """Analyse complète avec vérification sémantique et gestion des proverbes partiels"""
@@ -1309,75 +1039,136 @@ sinon si age > 30:
         try:
             # Réinitialisation
             self.symbol_table.clear()
-            self.result_text.delete(1.0, tk.END)
+            self.result_text.effacer()
+            # Le rapport est inséré par paquets à la fin de l'analyse
+            self.result_text.debut_lot()
             analyzer = SemanticAnalyzer(self.proverbes)
 
-            # Analyse lexicale
+            # Analyse lexicale et syntaxique en une seule passe : les tokens
+            # sont relevés au fur et à mesure qu'ils sont fournis au parser
             self.result_text.add_header("Analyse Lexicale")
-            self.lexer.input(code)
-            tokens = list(self.lexer)
-
             self.result_text.add_section("Tokens détectés")
-            for tok in tokens:
-                self.result_text.add_token(tok.type, tok.value, tok.lineno)
+            # Une erreur lexicale ou syntaxique n'arrête pas l'analyse : toutes
+            # sont signalées dans diagnostics (reprise au SI / SINON suivant)
+            diagnostics = Diagnostics(code)
+            tokens = []
+            result = parse(code, self.index, self.symbol_table, self.lexer,
+                           observateur=lambda tok: tokens.append((tok.type, tok.value, tok.lineno)),
+                           diagnostics=diagnostics)
+            self.result_text.add_tokens(tokens)
 
             # Analyse syntaxique
             self.result_text.add_header("Analyse Syntaxique")
-            result = self.parser.parse(code)
 
             self.result_text.add_section("Arbre syntaxique généré")
-            self.result_text.insert(tk.END, pformat(result, width=80, indent=2), 'code')
+            self.result_text.ajouter(pformat(result, width=80, indent=2), 'code')
 
             # Analyse sémantique
             self.result_text.add_header("Analyse Sémantique")
-            if isinstance(result, list):
-                for condition in result:
-                    analyzer.check_condition(condition)
-                    # Vérification des avertissements sur les proverbes partiels
-                    actions = condition[4] if len(condition) == 5 else condition[6]
-                    for action in actions:
-                        if isinstance(action, tuple) and action[0] == 'WARNING':
-                            analyzer.warnings.append(action[1])
+            for condition in result:
+                # Vérification (et avertissements sur les proverbes partiels)
+                diagnostics.verifier(analyzer, condition)
 
             # Affichage des résultats sémantiques
-            self.result_text.add_section("Table des symboles")
-            if analyzer.symbol_table:
-                for var, typ in analyzer.symbol_table.items():
-                    self.result_text.add_symbol(var, typ)
-            else:
-                self.result_text.add_info("Aucune variable déclarée")
-
-            # Erreurs et avertissements
-            self.result_text.add_section("Vérifications sémantiques")
-            if analyzer.errors or analyzer.warnings:
-                if analyzer.errors:
-                    self.result_text.add_subsection("Erreurs détectées")
-                    for err in analyzer.errors:
-                        self.result_text.add_error(err)
-                if analyzer.warnings:
-                    self.result_text.add_subsection("Avertissements détectés")
-                    for warn in analyzer.warnings:
-                        self.result_text.add_warning(warn)
-            else:
-                self.result_text.add_success("Aucune erreur sémantique détectée")
-
-            # Proverbes utilisés
-            self.result_text.add_header("Proverbes Utilisés")
-            if analyzer.used_proverbs:
-                for theme in sorted(analyzer.used_proverbs):
-                    self.result_text.add_proverb(theme, self.proverbes[theme])
-            else:
-                self.result_text.add_info("Aucun proverbe valide utilisé dans ce code")
+            self.afficher_semantique(analyzer.symbol_table, analyzer.errors,
+                                     analyzer.warnings, analyzer.used_proverbs)
+            self.afficher_diagnostics(diagnostics)
 
             self.result_text.add_divider()
-            messagebox.showinfo("Succès", "Analyse terminée avec succès!")
+            self.result_text.fin_lot()
+            erreurs = len(diagnostics.erreurs())
+            if erreurs:
+                messagebox.showwarning("Attention", f"Analyse terminée: {erreurs} erreur(s) détectée(s)")
+            else:
+                messagebox.showinfo("Succès", "Analyse terminée avec succès!")
 
         except Exception as e:
             self.result_text.add_header("Erreur d'analyse")
             self.result_text.add_error(str(e))
             self.result_text.add_divider()
+            self.result_text.fin_lot()
             messagebox.showerror("Erreur", f"Erreur d'analyse:\n{str(e)}")
 
+    def afficher_semantique(self, symbol_table, errors, warnings, used_proverbs):
+        """Affiche la table des symboles, les diagnostics et les proverbes utilisés"""
+        self.result_text.add_section("Table des symboles")
+        if symbol_table:
+            for var, typ in symbol_table.items():
+                self.result_text.add_symbol(var, typ)
+        else:
+            self.result_text.add_info("Aucune variable déclarée")
+
+        # Erreurs et avertissements
+        self.result_text.add_section("Vérifications sémantiques")
+        if errors or warnings:
+            if errors:
+                self.result_text.add_subsection("Erreurs détectées")
+                for err in errors:
+                    self.result_text.add_error(err)
+            if warnings:
+                self.result_text.add_subsection("Avertissements détectés")
+                for warn in warnings:
+                    self.result_text.add_warning(warn)
+        else:
+            self.result_text.add_success("Aucune erreur sémantique détectée")
+
+        # Proverbes utilisés
+        self.result_text.add_header("Proverbes Utilisés")
+        if used_proverbs:
+            for theme in sorted(used_proverbs):
+                self.result_text.add_proverb(theme, self.proverbes[theme])
+        else:
+            self.result_text.add_info("Aucun proverbe valide utilisé dans ce code")
+
+    def afficher_diagnostics(self, diagnostics):
+        """Affiche tous les diagnostics dans l'ordre du texte et les souligne dans l'éditeur"""
+        self.result_text.add_header("Diagnostics")
+        self.input_text.tag_remove('diagnostic', '1.0', tk.END)
+        if not len(diagnostics):
+            self.result_text.add_success("Aucun diagnostic")
+            return
+        for diagnostic in diagnostics.tries():
+            if diagnostic.niveau == ERREUR:
+                self.result_text.add_error(str(diagnostic))
+            else:
+                self.result_text.add_warning(str(diagnostic))
+            self.input_text.tag_add('diagnostic', f"{diagnostic.ligne}.{diagnostic.colonne - 1}",
+                                    f"{diagnostic.ligne_fin}.{diagnostic.colonne_fin - 1}")
+        self.input_text.tag_config('diagnostic', underline=True, foreground='#c0392b')
+
+    def planifier_analyse(self, event=None):
+        """Planifie l'analyse incrémentale après un court délai sans frappe"""
+        if self.analyse_planifiee is not None:
+            self.root.after_cancel(self.analyse_planifiee)
+            self.analyse_planifiee = None
+        if self.incremental_var.get():
+            self.analyse_planifiee = self.root.after(DELAI_ANALYSE_MS, self.analyser_incrementalement)
+
+    def analyser_incrementalement(self):
+        """Réanalyse uniquement les blocs condition modifiés depuis la dernière analyse"""
+        self.analyse_planifiee = None
+        resultat = self.analyse_incrementale.analyser(self.input_text.get(1.0, 'end-1c'))
+
+        self.result_text.effacer()
+        self.result_text.debut_lot()
+        self.result_text.add_info(
+            f"Analyse incrémentale : {resultat.reanalyses}/{resultat.blocs} bloc(s) "
+            f"réanalysé(s) en {resultat.duree_ms:.1f} ms")
+
+        self.result_text.add_header("Analyse Lexicale")
+        self.result_text.add_section("Tokens détectés")
+        self.result_text.add_tokens(list(resultat.iter_tokens()))
+
+        self.result_text.add_header("Analyse Syntaxique")
+        self.result_text.add_section("Arbre syntaxique généré")
+        self.result_text.ajouter(pformat(resultat.ast, width=80, indent=2), 'code')
+
+        self.result_text.add_header("Analyse Sémantique")
+        self.afficher_semantique(resultat.symbol_table, resultat.errors,
+                                 resultat.warnings, resultat.used_proverbs)
+        self.result_text.add_divider()
+        self.result_text.fin_lot()
+
 # ==================== LANCEMENT DE L'APPLICATION ====================
 
 
@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+"""
+Analyseur lexical à automate (DFA) écrit à la main
+
+Alternative au lexer PLY d'analyseur : il produit le même flux de tokens
+(types, valeurs, lineno, lexpos et fin des PROVERBE, mêmes erreurs
+lexicales) sans passer par l'expression maîtresse de PLY ni par une
+fonction de rappel par token. Chaque token porte en plus sa colonne
+(colno, à partir de 1).
+
+Le premier caractère d'un token donne, par la table CLASSES, l'état de
+départ de l'automate :
+
+    classe      état (token)            suite
+    ESPACE      ignoré                  [ \\t]*
+    SAUT        lignes (lineno += n)    \\n*
+    LETTRE      NOM / mot réservé       [a-zA-Z0-9_éèà]*
+                PROVERBE                (\\s*"[^"]+"\\s*)   après PROVERBE(
+    CHIFFRE     NOMBRE                  \\d*
+    GUILLEMET   STRING                  [^"]+"
+    EGAL        EGAL                    =
+    SUPERIEUR   SUPERIEUR               -
+    DPOINTS     DPOINTS                 -
+    AUTRE       erreur lexicale
+
+Les états qui bouclent sur une classe de caractères (la suite) consomment
+toute la suite d'un coup, par une recherche en C (str.find, expression
+simple ancrée) au lieu d'une transition Python par caractère.
+
+Comme avec PLY, seules les suites de sauts de ligne entre les tokens font
+avancer lineno (un saut de ligne à l'intérieur d'une chaîne ne compte pas) ;
+colno est la colonne réelle dans la ligne du texte.
+"""
+
+import re
+from functools import partial
+
+from analyseur import reserved
+from chaines import CHAINES
+from diagnostics import LEXICALE
+
+# ==================== TABLES ====================
+
+# Classes du premier caractère d'un token
+ESPACE, SAUT, LETTRE, CHIFFRE, GUILLEMET, EGAL, SUPERIEUR, DPOINTS, AUTRE = range(9)
+
+CLASSES = {' ': ESPACE, '\t': ESPACE, '\n': SAUT, '"': GUILLEMET, '=': EGAL, '>': SUPERIEUR, ':': DPOINTS}
+for _c in 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_éèà':
+    CLASSES[_c] = LETTRE
+for _c in '0123456789':
+    CLASSES[_c] = CHIFFRE
+
+# Suites des états qui bouclent (mêmes classes que les règles du lexer PLY)
+_ESPACES = re.compile(r'[ \t]*')
+_SAUTS = re.compile(r'\n*')
+_NOM = re.compile(r'[a-zA-Z0-9_éèà]*')
+_NOMBRE = re.compile(r'\d*')
+_PROVERBE = re.compile(r'\s*"([^"]+)"\s*\)')
+
+DEBUT_PROVERBE = 'PROVERBE('
+
+# Tokens des lignes déjà analysées : texte de la ligne -> (type, valeur,
+# décalage, longueur) de chaque token (partagé par les lexers du processus)
+_LIGNES = {}
+TAILLE_CACHE_LIGNES = 4096
+CHAINES.au_vidage(_LIGNES.clear)
+
+
+def classe(caractere):
+    """Classe d'un caractère (les chiffres Unicode, comme \\d, sont des CHIFFRE)"""
+    valeur = CLASSES.get(caractere)
+    if valeur is None:
+        valeur = CHIFFRE if caractere.isdecimal() else AUTRE
+    return valeur
+
+
+class Token:
+    """
+    Token (mêmes attributs que ply.lex.LexToken, plus colno)
+
+    Attributs:
+        type (str): Type du token ('SI', 'NOM', ...)
+        value: Valeur (texte, nombre ou contenu du proverbe)
+        lineno (int): Numéro de ligne
+        lexpos (int): Position du début du token dans le texte
+        colno (int): Colonne du début du token (1 pour le début de la ligne)
+        fin (int): Position de la fin du token (PROVERBE seulement)
+        lexer: Lexer d'origine (fixé par le parseur PLY sur un token en erreur)
+    """
+
+    __slots__ = ('type', 'value', 'lineno', 'lexpos', 'colno', 'fin', 'lexer')
+
+    def __init__(self, type, value, lineno, lexpos, colno):
+        self.type = type
+        self.value = value
+        self.lineno = lineno
+        self.lexpos = lexpos
+        self.colno = colno
+
+    def __str__(self):
+        return f"LexToken({self.type},{self.value!r},{self.lineno},{self.lexpos})"
+
+    __repr__ = __str__
+
+
+class LexerDFA:
+    """
+    Lexer à automate, utilisable à la place du lexer PLY (input, token,
+    clone, itération ; lineno et lexpos sont tenus à jour)
+
+    Attributs:
+        lineno (int): Ligne en cours (numéro de la première ligne avant input)
+        lexpos (int): Position après le dernier token lu
+        lexdata (str): Texte analysé
+        diagnostics (Diagnostics): Collecteur des erreurs lexicales (None :
+            SyntaxError à la première, voir analyseur.parse)
+    """
+
+    def __init__(self):
+        self.lineno = 1
+        self.lexpos = 0
+        self.lexdata = ''
+        self.diagnostics = None
+        self._tokens = iter(())
+
+    def clone(self):
+        """Nouveau lexer indépendant (même interface que Lexer.clone de PLY)"""
+        lexer = LexerDFA()
+        lexer.lineno = self.lineno
+        return lexer
+
+    def input(self, data):
+        """Fournit le texte à analyser (les tokens sont produits à la demande)"""
+        self.lexdata = data
+        self.lexpos = 0
+        self._tokens = self._automate(data)
+        # token() appelle directement le générateur (sans méthode intermédiaire)
+        self.token = partial(next, self._tokens, None)
+
+    def token(self):
+        """Token suivant (None à la fin du texte)"""
+        return next(self._tokens, None)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        tok = self.token()
+        if tok is None:
+            raise StopIteration
+        return tok
+
+    def _automate(self, code):
+        """
+        Générateur des tokens de code
+
+        Raises:
+            SyntaxError: Caractère qui ne commence aucun token (même message
+                que le lexer PLY) ; avec des diagnostics, l'erreur y est
+                signalée et le caractère ignoré
+        """
+        n = len(code)
+        pos = 0
+        lineno = self.lineno
+        debut_ligne = 0  # position du premier caractère de la ligne en cours
+        classes = CLASSES
+        canonique = CHAINES.canonique
+        ids, chaines = CHAINES.ids, CHAINES.chaines  # canonique() sans appel si la chaîne est connue
+        mots_reserves = reserved
+        nouveau = object.__new__
+        lignes = _LIGNES
+        modele = None  # tokens de la ligne en cours d'analyse, pour _LIGNES
+        fin_ligne = 0
+        while pos < n:
+            if pos == debut_ligne:
+                # Début de ligne : une ligne déjà analysée est reproduite
+                fin_ligne = code.find('\n', pos)
+                if fin_ligne < 0:
+                    fin_ligne = n
+                texte_ligne = code[pos:fin_ligne]
+                connue = lignes.get(texte_ligne)
+                if connue is not None and fin_ligne > pos:
+                    for type_token, valeur, decalage, longueur in connue:
+                        tok = nouveau(Token)
+                        tok.type = type_token
+                        tok.value = valeur
+                        tok.lineno = lineno
+                        tok.lexpos = pos + decalage
+                        tok.colno = decalage + 1
+                        self.lexpos = pos + decalage + longueur
+                        if type_token == 'PROVERBE':
+                            tok.fin = self.lexpos
+                        yield tok
+                    modele = None
+                    pos = fin_ligne
+                    if pos == n:
+                        break
+                    continue
+                if len(lignes) >= TAILLE_CACHE_LIGNES:
+                    lignes.clear()
+                modele = []
+
+            c = code[pos]
+            etat = classes.get(c)
+            if etat is None:
+                etat = CHIFFRE if c.isdecimal() else AUTRE
+
+            if etat == ESPACE:
+                pos = _ESPACES.match(code, pos + 1).end()
+                continue
+            if etat == SAUT:
+                if modele is not None and pos == fin_ligne:
+                    lignes[texte_ligne] = modele
+                fin = _SAUTS.match(code, pos + 1).end()
+                lineno += fin - pos
+                self.lineno = lineno
+                debut_ligne = pos = fin
+                continue
+
+            # Le token est construit sans appel de fonction (voir Token)
+            tok = nouveau(Token)
+            tok.lineno = lineno
+            tok.lexpos = pos
+            tok.colno = pos - debut_ligne + 1
+            if etat == LETTRE:
+                m = None
+                if c == 'P' and code.startswith(DEBUT_PROVERBE, pos):
+                    m = _PROVERBE.match(code, pos + len(DEBUT_PROVERBE))
+                if m is not None:
+                    fin = tok.fin = m.end()
+                    tok.type = 'PROVERBE'
+                    tok.value = code[pos + 9:fin - 1].strip('"\' ')
+                    saut = code.rfind('\n', pos, fin)
+                    if saut >= 0:
+                        debut_ligne = saut + 1
+                else:
+                    fin = _NOM.match(code, pos + 1).end()
+                    texte = code[pos:fin]
+                    type_token = mots_reserves.get(texte.lower())
+                    if type_token is None:
+                        ident = ids.get(texte)
+                        tok.type = 'NOM'
+                        tok.value = chaines[ident] if ident is not None else canonique(texte)
+                    else:
+                        tok.type = type_token
+                        tok.value = texte
+            elif etat == GUILLEMET and code.find('"', pos + 1) > pos + 1:
+                fin = code.find('"', pos + 1)
+                texte = code[pos + 1:fin]
+                ident = ids.get(texte)
+                tok.type = 'STRING'
+                tok.value = chaines[ident] if ident is not None else canonique(texte)
+                saut = code.rfind('\n', pos, fin)
+                if saut >= 0:
+                    debut_ligne = saut + 1
+                fin += 1
+            elif etat == CHIFFRE:
+                fin = _NOMBRE.match(code, pos + 1).end()
+                tok.type = 'NOMBRE'
+                tok.value = int(code[pos:fin])
+            elif etat == EGAL and code.startswith('==', pos):
+                fin = pos + 2
+                tok.type = 'EGAL'
+                tok.value = '=='
+            elif etat == SUPERIEUR:
+                fin = pos + 1
+                tok.type = 'SUPERIEUR'
+                tok.value = '>'
+            elif etat == DPOINTS:
+                fin = pos + 1
+                tok.type = 'DPOINTS'
+                tok.value = ':'
+            else:
+                # Aucun token ne commence ici (AUTRE, '=' seul, chaîne vide ou non fermée)
+                self.lexpos = pos
+                if self.diagnostics is None:
+                    raise SyntaxError(f"Erreur lexicale: '{c}' (ligne {lineno})")
+                self.diagnostics.signaler(LEXICALE, f"Erreur lexicale: '{c}' (ligne {lineno})", pos)
+                modele = None
+                pos += 1
+                continue
+
+            if modele is not None:
+                if fin <= fin_ligne:
+                    decalage = pos - debut_ligne
+                    modele.append((tok.type, tok.value, decalage, fin - pos))
+                else:
+                    modele = None  # token à cheval sur plusieurs lignes : ligne non mémorisée
+            self.lexpos = pos = fin
+            yield tok
+        if modele is not None and pos == fin_ligne:
+            lignes[texte_ligne] = modele
+        self.lexpos = pos
@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+"""
+Nœuds de l'arbre syntaxique des conseils
+
+Classes compactes (__slots__, sans dictionnaire d'attributs) construites par
+le parser et parcourues par l'analyseur sémantique et les générateurs de
+code. Les variables, thèmes et textes de proverbes sont désignés par leur
+identifiant dans la table des chaînes du compilateur (chaines.CHAINES) : un
+proverbe cité mille fois n'est stocké qu'une fois. Chaque nœud porte sa
+position dans le texte analysé : numéro de ligne et décalages de début et de
+fin (en caractères).
+
+    [Condition('humeur', '==', 'triste', [Display('CONSEIL', 'أسمع كلام ...')]),
+     ElseIfCondition('age', '>', 30, [Display('SAGESSE', '...', 'partiel'),
+                                      Avertissement('Le proverbe saisi est partiel')])]
+
+Les nœuds sont sérialisés (pickle) avec leurs chaînes et non leurs
+identifiants, qui n'ont de sens que dans le processus qui les a attribués.
+"""
+
+import re
+
+from chaines import CHAINES
+from index_proverbes import EXACT, INCONNU, PARTIEL, normaliser_texte
+
+
+class Noeud:
+    """
+    Base des nœuds : position dans le source, affichage, comparaison et
+    sérialisation
+
+    La position n'intervient ni dans l'affichage ni dans la comparaison.
+    """
+
+    __slots__ = ('ligne', 'debut', 'fin')
+
+    # Champs affichés, comparés et sérialisés (arguments du constructeur)
+    champs = ()
+
+    def __repr__(self):
+        valeurs = ', '.join(repr(getattr(self, champ)) for champ in self.champs)
+        return f"{type(self).__name__}({valeurs})"
+
+    def __eq__(self, autre):
+        if type(autre) is not type(self):
+            return NotImplemented
+        return all(getattr(self, champ) == getattr(autre, champ) for champ in self.champs)
+
+    __hash__ = None
+
+    def __reduce__(self):
+        arguments = tuple(getattr(self, champ) for champ in self.champs)
+        return type(self), arguments + (self.ligne, self.debut, self.fin)
+
+
+class Condition(Noeud):
+    """
+    Condition "si var == "valeur":" ou "si var > nombre:" et ses actions
+
+    Attributs:
+        var_id (int): Identifiant de la variable testée (propriété var)
+        op (str): Opérateur ('==' ou '>')
+        val (str/int): Valeur comparée
+        actions (list): Nœuds Display et Avertissement
+    """
+
+    __slots__ = ('var_id', 'op', 'val', 'actions')
+    champs = ('var', 'op', 'val', 'actions')
+
+    def __init__(self, var, op, val, actions, ligne=None, debut=None, fin=None):
+        self.var_id = CHAINES.identifiant(var)
+        self.op = CHAINES.canonique(op)
+        self.val = CHAINES.canonique(val) if isinstance(val, str) else val
+        self.actions = actions
+        self.ligne, self.debut, self.fin = ligne, debut, fin
+
+    @property
+    def var(self):
+        """Nom de la variable testée"""
+        return CHAINES.chaine(self.var_id)
+
+
+class ElseIfCondition(Condition):
+    """Condition "sinon si var > nombre:" (mêmes attributs que Condition)"""
+
+    __slots__ = ()
+
+
+class Display(Noeud):
+    """
+    Affichage d'un proverbe, déjà résolu dans le catalogue
+
+    Attributs:
+        theme_id (int): Identifiant du thème (None si le proverbe est inconnu)
+        texte_id (int): Identifiant du texte complet (texte saisi s'il est inconnu)
+        statut (str): EXACT, PARTIEL ou INCONNU
+    """
+
+    __slots__ = ('theme_id', 'texte_id', 'statut')
+    champs = ('theme', 'texte', 'statut')
+
+    def __init__(self, theme, texte, statut=EXACT, ligne=None, debut=None, fin=None):
+        self.theme_id = CHAINES.identifiant(theme) if theme is not None else None
+        self.texte_id = CHAINES.identifiant(texte)
+        self.statut = statut
+        self.ligne, self.debut, self.fin = ligne, debut, fin
+
+    def __repr__(self):
+        if self.statut == EXACT:
+            return f"Display({self.theme!r}, {self.texte!r})"
+        return super().__repr__()
+
+    @property
+    def theme(self):
+        """Thème du proverbe (None s'il est inconnu)"""
+        return CHAINES.chaine(self.theme_id) if self.theme_id is not None else None
+
+    @property
+    def texte(self):
+        """Texte complet du proverbe"""
+        return CHAINES.chaine(self.texte_id)
+
+    @property
+    def verifie(self):
+        """Proverbe vérifié sous forme de texte (voir ProverbIndex.verifier)"""
+        if self.statut == EXACT:
+            return f"{self.theme}: {self.texte}"
+        if self.statut == PARTIEL:
+            return f"ATTENTION: Partiel - {self.theme}: {self.texte}"
+        return f"PROVERBE INCONNU: {self.texte}"
+
+
+class Avertissement(Noeud):
+    """
+    Avertissement émis par le parser (position du proverbe concerné)
+
+    Attributs:
+        message (str): Texte de l'avertissement
+    """
+
+    __slots__ = ('message',)
+    champs = __slots__
+
+    def __init__(self, message, ligne=None, debut=None, fin=None):
+        self.message = message
+        self.ligne, self.debut, self.fin = ligne, debut, fin
+
+# ==================== COMPATIBILITE (ARBRES EN TUPLES) ====================
+
+# Appel PROVERBE("texte") non résolu, tel qu'écrit dans le source
+APPEL_PROVERBE = re.compile(r'PROVERBE\(\s*"([^"]+)"\s*\)$')
+
+
+def _display_depuis_texte(texte):
+    """Reconstruit un Display depuis un proverbe vérifié sous forme de texte"""
+    if texte.startswith("PROVERBE INCONNU:"):
+        return Display(None, texte.split(':', 1)[1].strip(), INCONNU)
+    if texte.startswith("ATTENTION: Partiel - "):
+        theme, val = texte[len("ATTENTION: Partiel - "):].split(':', 1)
+        return Display(theme.strip(), val.strip(), PARTIEL)
+    appel = APPEL_PROVERBE.match(texte)
+    if appel:
+        return Display(None, normaliser_texte(appel.group(1)), INCONNU)
+    if ':' in texte:
+        theme, val = texte.split(':', 1)
+        return Display(theme.strip(), val.strip())
+    return Display(None, texte, INCONNU)
+
+
+def depuis_tuples(ast):
+    """
+    Convertit un arbre de l'ancien format en nœuds
+
+    Ancien format : ('CONDITION', var, op, val, actions),
+    ('CONDITION', 'sinon', var, op, val, actions), ('AFFICHER', texte) et
+    ('WARNING', message), où texte est un proverbe vérifié ("THEME: texte")
+    ou un appel PROVERBE("...") non résolu, et où une valeur chaîne peut
+    être écrite entre guillemets ('"triste"'). Les nœuds déjà convertis sont
+    conservés.
+
+    Args:
+        ast (list): Liste de conditions
+
+    Returns:
+        list: Liste de Condition/ElseIfCondition
+    """
+    conditions = []
+    for condition in ast:
+        if isinstance(condition, Noeud):
+            conditions.append(condition)
+            continue
+        if len(condition) == 5:
+            _, var, op, val, actions = condition
+            classe = Condition
+        else:
+            _, _, var, op, val, actions = condition
+            classe = ElseIfCondition
+        if isinstance(val, str) and len(val) >= 2 and val[0] == val[-1] == '"':
+            val = val[1:-1]
+        noeuds = []
+        for action in actions:
+            if isinstance(action, Noeud):
+                noeuds.append(action)
+            elif action[0] == 'AFFICHER':
+                noeuds.append(_display_depuis_texte(action[1]))
+            elif action[0] == 'WARNING':
+                noeuds.append(Avertissement(action[1]))
+        conditions.append(classe(var, op, val, noeuds))
+    return conditions
@@ -0,0 +1,439 @@
+# -*- coding: utf-8 -*-
+"""
+Optimiseur du code intermédiaire (code à trois adresses)
+
+Le code est découpé en blocs de base reliés par un graphe de flot de
+contrôle (CFG), sur lequel s'appliquent des passes indépendantes :
+
+- constantes : propagation des constantes et des conditions connues
+  (après "ifFalse t goto L", t est vrai sur le chemin qui continue et faux
+  sur celui qui saute), pliage des comparaisons dont le résultat est connu
+  et des branchements sur une constante
+- redondances : comparaison déjà calculée sur tous les chemins (les
+  variables du conseil ne sont jamais modifiées), remplacée par son résultat
+- sauts : enfilage des sauts (saut vers un saut) et suppression des sauts
+  vers l'instruction suivante
+- inaccessibles : suppression des blocs inaccessibles depuis l'entrée
+- code_mort : suppression des temporaires calculés mais jamais utilisés
+- etiquettes : fusion des étiquettes consécutives et suppression des
+  étiquettes jamais référencées
+
+Chaque passe rapporte le nombre d'instructions supprimées.
+
+Utilisation:
+    code, rapport = optimiser(code)                       # toutes les passes
+    code, rapport = optimiser(code, ['constantes', 'code_mort'])
+"""
+
+from collections import deque
+
+from instructions import COMPARAISONS, SAUTS, Op, Quadruplet, Temp, copie, est_litteral, saut
+
+COMPARER = {
+    Op.EGAL: lambda a, b: a == b,
+    Op.DIFFERENT: lambda a, b: a != b,
+    Op.SUPERIEUR: lambda a, b: a > b,
+    Op.INFERIEUR: lambda a, b: a < b,
+    Op.SUP_EGAL: lambda a, b: a >= b,
+    Op.INF_EGAL: lambda a, b: a <= b,
+}
+
+# Instructions sans effet de bord : supprimées si leur résultat n'est pas lu
+PURES = COMPARAISONS | {Op.COPIE, Op.ALLOUER}
+
+
+def cle_comparaison(instr):
+    """Clé d'une comparaison (les types distinguent 1 de t1 et "x" de x)"""
+    return (instr.op, instr.arg1, type(instr.arg1), instr.arg2, type(instr.arg2))
+
+
+def renommer(instr, renommage):
+    """Remplace les temporaires lus par une instruction selon renommage"""
+    arg1 = renommage.get(instr.arg1, instr.arg1) if type(instr.arg1) is Temp else instr.arg1
+    arg2 = renommage.get(instr.arg2, instr.arg2) if type(instr.arg2) is Temp else instr.arg2
+    if arg1 is instr.arg1 and arg2 is instr.arg2:
+        return instr
+    return Quadruplet(instr.op, arg1, arg2, instr.resultat)
+
+# ==================== GRAPHE DE FLOT DE CONTROLE ====================
+
+
+class Bloc:
+    """
+    Bloc de base : suite d'instructions sans saut entrant ni sortant au milieu
+
+    Attributs:
+        instrs (list): Instructions du bloc
+        succ (list): Indices des blocs successeurs (suite du code en premier)
+        pred (list): Indices des blocs prédécesseurs
+    """
+
+    __slots__ = ('instrs', 'succ', 'pred')
+
+    def __init__(self, instrs):
+        self.instrs = instrs
+        self.succ = []
+        self.pred = []
+
+
+class CFG:
+    """
+    Graphe de flot de contrôle d'une liste d'instructions
+
+    Un saut vers une étiquette absente du code mène à la sortie du programme.
+
+    Attributs:
+        blocs (list): Blocs de base dans l'ordre du code (le premier est l'entrée)
+        etiquettes (dict): Étiquette -> indice du bloc qui la porte
+    """
+
+    def __init__(self, instrs):
+        self.blocs = []
+        courant = []
+        for instr in instrs:
+            if instr.op is Op.LABEL and courant:
+                self.blocs.append(Bloc(courant))
+                courant = []
+            courant.append(instr)
+            if instr.op in SAUTS:
+                self.blocs.append(Bloc(courant))
+                courant = []
+        if courant:
+            self.blocs.append(Bloc(courant))
+
+        self.etiquettes = {}
+        for i, bloc in enumerate(self.blocs):
+            if bloc.instrs[0].op is Op.LABEL:
+                self.etiquettes[bloc.instrs[0].arg1] = i
+
+        for i, bloc in enumerate(self.blocs):
+            dernier = bloc.instrs[-1]
+            if dernier.op is not Op.SAUT and i + 1 < len(self.blocs):
+                bloc.succ.append(i + 1)
+            if dernier.op in SAUTS and dernier.resultat in self.etiquettes:
+                cible = self.etiquettes[dernier.resultat]
+                if cible not in bloc.succ:
+                    bloc.succ.append(cible)
+            for s in bloc.succ:
+                self.blocs[s].pred.append(i)
+
+    def instructions(self):
+        """Instructions de tous les blocs, dans l'ordre du code"""
+        return [instr for bloc in self.blocs for instr in bloc.instrs]
+
+    def accessibles(self):
+        """Indices des blocs accessibles depuis l'entrée"""
+        vus = set()
+        pile = [0] if self.blocs else []
+        while pile:
+            i = pile.pop()
+            if i not in vus:
+                vus.add(i)
+                pile.extend(self.blocs[i].succ)
+        return vus
+
+# ==================== PASSES ====================
+
+
+def _intersection(etats):
+    """Faits vrais sur tous les chemins (rencontre de plusieurs états)"""
+    etats = [e for e in etats if e is not None]
+    if not etats:
+        return None
+    commun = etats[0].items()
+    for etat in etats[1:]:
+        if etat is not etats[0]:
+            commun = commun & etat.items()
+    return dict(commun)
+
+
+def _flot_avant(cfg, transfert):
+    """
+    Analyse de flot de données vers l'avant jusqu'au point fixe
+
+    transfert(i, bloc, etat) retourne l'état en fin du bloc i sous forme d'un
+    dictionnaire {successeur: état} (l'état peut dépendre de l'arc suivi).
+
+    Returns:
+        list: État à l'entrée de chaque bloc (None si inaccessible)
+    """
+    entrees = [None] * len(cfg.blocs)
+    sorties = [{} for _ in cfg.blocs]
+    a_traiter = deque(range(len(cfg.blocs)))
+    en_attente = set(a_traiter)
+    while a_traiter:
+        i = a_traiter.popleft()
+        en_attente.discard(i)
+        bloc = cfg.blocs[i]
+        etat = {} if i == 0 else _intersection(sorties[p].get(i) for p in bloc.pred)
+        if etat is None:
+            continue
+        entrees[i] = etat
+        nouvelles = transfert(i, bloc, dict(etat))
+        if nouvelles != sorties[i]:
+            sorties[i] = nouvelles
+            for s in bloc.succ:
+                if s not in en_attente:
+                    en_attente.add(s)
+                    a_traiter.append(s)
+    return entrees
+
+
+def _evaluer(faits, instr):
+    """
+    Valeur connue d'une comparaison d'après les faits établis
+
+    Les faits sont de deux sortes : t -> valeur constante du temporaire t,
+    et clé de comparaison (voir cle_comparaison) -> bool pour une
+    comparaison dont le résultat est connu. Outre les faits identiques, on
+    déduit : var == "x" vrai rend faux var == "y", et var > n vrai (resp.
+    faux) rend vrai var > m pour m <= n (resp. faux pour m >= n).
+
+    Returns:
+        int: 1 ou 0 si la comparaison est connue, None sinon
+    """
+    a, b = instr.arg1, instr.arg2
+    va = faits.get(a) if type(a) is Temp else a if est_litteral(a) else None
+    vb = faits.get(b) if type(b) is Temp else b if est_litteral(b) else None
+    if va is not None and vb is not None and type(va) is type(vb):
+        return int(COMPARER[instr.op](va, vb))
+    connu = faits.get(cle_comparaison(instr))
+    if connu is not None:
+        return int(connu)
+    if vb is None or instr.op not in (Op.EGAL, Op.SUPERIEUR):
+        return None
+    for cle, vrai in faits.items():
+        if type(cle) is not tuple or cle[0] is not instr.op or cle[1] != a or cle[2] is not type(a):
+            continue
+        v_fait = cle[3]
+        if instr.op is Op.EGAL and vrai and type(v_fait) is type(vb) and v_fait != vb:
+            return 0
+        if instr.op is Op.SUPERIEUR and type(vb) is int and type(v_fait) is int:
+            if vrai and vb <= v_fait:
+                return 1
+            if not vrai and vb >= v_fait:
+                return 0
+    return None
+
+
+def passe_constantes(instrs):
+    """Propagation des constantes et des conditions connues, pliage des branchements"""
+    cfg = CFG(instrs)
+    comparaisons = {instr.resultat: cle_comparaison(instr) for instr in instrs if instr.op in COMPARAISONS}
+
+    # Temporaires lus hors du bloc qui les définit : les seuls dont la valeur
+    # constante doit suivre les arcs (les autres faits sont oubliés en fin de
+    # bloc, ce qui garde les états petits)
+    definitions = {}
+    for i, bloc in enumerate(cfg.blocs):
+        for instr in bloc.instrs:
+            if instr.ecrit() is not None:
+                definitions[instr.resultat] = i
+    globaux = {t for i, bloc in enumerate(cfg.blocs) for instr in bloc.instrs
+               for t in instr.lus() if definitions.get(t, i) != i}
+
+    def executer(bloc, faits):
+        """Applique les instructions du bloc aux faits et retourne le bloc réécrit"""
+        resultat = []
+        for instr in bloc.instrs:
+            op = instr.op
+            if op in COMPARAISONS:
+                valeur = _evaluer(faits, instr)
+                if valeur is not None:
+                    faits[instr.resultat] = valeur
+                    instr = copie(instr.resultat, valeur)
+            elif op is Op.COPIE and est_litteral(instr.arg1):
+                faits[instr.resultat] = instr.arg1
+            elif op is Op.SI_FAUX and instr.arg1 in faits:
+                if faits[instr.arg1]:
+                    continue  # condition toujours vraie : le saut disparaît
+                instr = saut(instr.resultat)  # toujours fausse : saut inconditionnel
+            resultat.append(instr)
+        return resultat
+
+    def transfert(i, bloc, faits):
+        reecrit = executer(bloc, faits)
+        for cle in [cle for cle in faits if type(cle) is Temp and cle not in globaux]:
+            del faits[cle]
+        sorties = {s: faits for s in bloc.succ}
+        dernier = reecrit[-1] if reecrit else None
+        if dernier is not None and dernier.op is Op.SI_FAUX and dernier.arg1 in comparaisons:
+            cible = cfg.etiquettes.get(dernier.resultat)
+            if cible != i + 1:
+                condition = comparaisons[dernier.arg1]
+                if i + 1 in sorties:
+                    sorties[i + 1] = dict(faits)
+                    sorties[i + 1][condition] = True
+                if cible is not None:
+                    sorties[cible] = dict(faits)
+                    sorties[cible][condition] = False
+        return sorties
+
+    entrees = _flot_avant(cfg, transfert)
+    for bloc, etat in zip(cfg.blocs, entrees):
+        if etat is not None:
+            bloc.instrs = executer(bloc, dict(etat))
+    resultat = cfg.instructions()
+    return resultat, len(instrs) - len(resultat)
+
+
+def passe_redondances(instrs):
+    """Suppression des comparaisons déjà calculées sur tous les chemins"""
+    cfg = CFG(instrs)
+
+    def transfert(i, bloc, disponibles):
+        for instr in bloc.instrs:
+            if instr.op in COMPARAISONS:
+                disponibles.setdefault(cle_comparaison(instr), instr.resultat)
+        return {s: disponibles for s in bloc.succ}
+
+    entrees = _flot_avant(cfg, transfert)
+    renommage = {}
+    supprimees = 0
+    for bloc, disponibles in zip(cfg.blocs, entrees):
+        if disponibles is None:
+            continue
+        disponibles = dict(disponibles)
+        gardees = []
+        for instr in bloc.instrs:
+            if instr.op in COMPARAISONS:
+                cle = cle_comparaison(instr)
+                deja = disponibles.get(cle)
+                if deja is not None and deja != instr.resultat:
+                    renommage[instr.resultat] = deja
+                    supprimees += 1
+                    continue
+                disponibles[cle] = instr.resultat
+            gardees.append(instr)
+        bloc.instrs = gardees
+    resultat = cfg.instructions()
+    if renommage:
+        resultat = [renommer(instr, renommage) for instr in resultat]
+    return resultat, supprimees
+
+
+def _cible_finale(etiquette, premieres):
+    """Suit une chaîne de sauts (étiquette suivie directement d'un goto)"""
+    vues = set()
+    while etiquette in premieres and etiquette not in vues:
+        vues.add(etiquette)
+        etiquette = premieres[etiquette]
+    return etiquette
+
+
+def passe_sauts(instrs):
+    """Enfilage des sauts et suppression des sauts vers l'instruction suivante"""
+    # Étiquette -> cible du goto qui la suit immédiatement
+    premieres = {}
+    for i, instr in enumerate(instrs):
+        if instr.op is Op.LABEL:
+            j = i + 1
+            while j < len(instrs) and instrs[j].op is Op.LABEL:
+                j += 1
+            if j < len(instrs) and instrs[j].op is Op.SAUT:
+                premieres[instr.arg1] = instrs[j].resultat
+
+    resultat = []
+    for i, instr in enumerate(instrs):
+        if instr.op in SAUTS:
+            cible = _cible_finale(instr.resultat, premieres)
+            if cible != instr.resultat:
+                instr = Quadruplet(instr.op, instr.arg1, None, cible)
+            # Saut vers les étiquettes qui suivent immédiatement : inutile
+            j = i + 1
+            while j < len(instrs) and instrs[j].op is Op.LABEL and instrs[j].arg1 != cible:
+                j += 1
+            if j < len(instrs) and instrs[j].op is Op.LABEL:
+                continue
+        resultat.append(instr)
+    return resultat, len(instrs) - len(resultat)
+
+
+def passe_inaccessibles(instrs):
+    """Suppression des blocs inaccessibles depuis l'entrée"""
+    cfg = CFG(instrs)
+    accessibles = cfg.accessibles()
+    resultat = [instr for i, bloc in enumerate(cfg.blocs) if i in accessibles for instr in bloc.instrs]
+    return resultat, len(instrs) - len(resultat)
+
+
+def passe_code_mort(instrs):
+    """Suppression des temporaires jamais lus (jusqu'au point fixe)"""
+    resultat = instrs
+    while True:
+        lus = {t for instr in resultat for t in instr.lus()}
+        gardees = [instr for instr in resultat if instr.op not in PURES or instr.resultat in lus]
+        if len(gardees) == len(resultat):
+            return resultat, len(instrs) - len(resultat)
+        resultat = gardees
+
+
+def passe_etiquettes(instrs):
+    """Fusion des étiquettes consécutives et suppression des étiquettes inutilisées"""
+    renommage = {}
+    precedente = None
+    for instr in instrs:
+        if instr.op is Op.LABEL:
+            if precedente is not None:
+                renommage[instr.arg1] = precedente
+            else:
+                precedente = instr.arg1
+        else:
+            precedente = None
+
+    referencees = {renommage.get(instr.resultat, instr.resultat) for instr in instrs if instr.op in SAUTS}
+    resultat = []
+    for instr in instrs:
+        if instr.op is Op.LABEL:
+            if instr.arg1 in renommage or instr.arg1 not in referencees:
+                continue
+        elif instr.op in SAUTS and instr.resultat in renommage:
+            instr = Quadruplet(instr.op, instr.arg1, None, renommage[instr.resultat])
+        resultat.append(instr)
+    return resultat, len(instrs) - len(resultat)
+
+
+# Passes disponibles, dans l'ordre d'application par défaut
+PASSES = {
+    'constantes': passe_constantes,
+    'redondances': passe_redondances,
+    'sauts': passe_sauts,
+    'inaccessibles': passe_inaccessibles,
+    'code_mort': passe_code_mort,
+    'etiquettes': passe_etiquettes,
+}
+
+
+def optimiser(code, passes=None, iterations=4):
+    """
+    Optimise du code intermédiaire
+
+    Les passes sont appliquées dans l'ordre donné, et la suite est répétée
+    tant qu'elle supprime des instructions (au plus `iterations` fois).
+
+    Args:
+        code (list): Instructions (Quadruplet)
+        passes (list): Noms des passes à appliquer (défaut: toutes, voir PASSES)
+        iterations (int): Nombre maximal d'applications de la suite de passes
+
+    Returns:
+        tuple: (code optimisé, {passe: nombre d'instructions supprimées})
+
+    Raises:
+        ValueError: Si une passe est inconnue
+    """
+    passes = list(PASSES) if passes is None else list(passes)
+    inconnues = [nom for nom in passes if nom not in PASSES]
+    if inconnues:
+        raise ValueError(f"Passe(s) d'optimisation inconnue(s): {', '.join(inconnues)}")
+
+    rapport = dict.fromkeys(passes, 0)
+    for _ in range(iterations):
+        supprimees = 0
+        for nom in passes:
+            code, n = PASSES[nom](code)
+            rapport[nom] += n
+            supprimees += n
+        if not supprimees:
+            break
+    return list(code), rapport
@@ -0,0 +1,328 @@
+# -*- coding: utf-8 -*-
+"""
+Optimisation à lucarne (peephole) de l'assembleur produit par
+TargetCodeGenerator
+
+Les instructions sont des tuples (mnémonique, opérandes...) ; une étiquette
+est ('label', nom).
+
+Règles locales (sans analyse) :
+
+- mov X, X est supprimé
+- setCC al / movzx eax, al / mov X, eax / cmp X, 0 / je L : le saut teste
+  directement les drapeaux de la comparaison (jNCC L)
+- jmp L ou jCC L vers l'étiquette qui suit immédiatement est supprimé
+
+Règles qui dépendent de la vivacité des emplacements (registres, mots de
+pile des temporaires, drapeaux) sur le graphe de flot de l'assembleur :
+
+- une instruction sans effet de bord dont aucun résultat n'est plus lu est
+  supprimée (c'est le cas de setCC / movzx / mov X, eax après la règle
+  précédente quand X ne sert qu'au saut)
+- mov R, S suivi de cmp R, B, mov X, R ou push R : S est utilisé
+  directement quand le registre R n'est plus lu ensuite
+
+Les registres ebp/esp et la mémoire des variables du conseil ne sont pas
+suivis : ils ne sont jamais considérés comme morts.
+"""
+
+from collections import deque
+
+REGISTRES = frozenset({'eax', 'ebx', 'ecx', 'edx', 'esi', 'edi'})
+DRAPEAUX = 'drapeaux'
+
+# Condition inverse de chaque setCC, sous forme de saut
+SAUT_INVERSE = {
+    'sete': 'jne',
+    'setne': 'je',
+    'setg': 'jle',
+    'setl': 'jge',
+    'setge': 'jl',
+    'setle': 'jg',
+}
+SAUTS_CONDITIONNELS = frozenset(SAUT_INVERSE.values())
+
+# Instructions sans effet de bord (supprimables si leurs résultats sont morts)
+SANS_EFFET = frozenset({'mov', 'movzx', 'cmp', 'test'}) | frozenset(SAUT_INVERSE)
+
+
+def est_emplacement(operande):
+    """Vrai pour un registre ou un emplacement de pile d'un temporaire"""
+    return operande in REGISTRES or operande.startswith('dword [ebp-')
+
+
+def est_memoire(operande):
+    return '[' in operande
+
+
+def est_immediat(operande):
+    return operande.lstrip('-').isdigit()
+
+
+def effets(instr):
+    """
+    Emplacements lus et écrits par une instruction
+
+    Returns:
+        tuple: (lus, ecrits) ; pour une écriture partielle (setCC al) le
+               registre est à la fois lu et écrit
+    """
+    mnemonique = instr[0]
+    if mnemonique == 'mov':
+        lus = {instr[2]} if est_emplacement(instr[2]) else ()
+        return frozenset(lus), frozenset({instr[1]} if est_emplacement(instr[1]) else ())
+    if mnemonique == 'movzx':
+        return frozenset({'eax'}), frozenset({instr[1]})
+    if mnemonique in SAUT_INVERSE:
+        return frozenset({DRAPEAUX, 'eax'}), frozenset({'eax'})
+    if mnemonique in ('cmp', 'test'):
+        return frozenset(op for op in instr[1:] if est_emplacement(op)), frozenset({DRAPEAUX})
+    if mnemonique in SAUTS_CONDITIONNELS:
+        return frozenset({DRAPEAUX}), frozenset()
+    if mnemonique == 'push':
+        return frozenset({instr[1]} if est_emplacement(instr[1]) else ()), frozenset()
+    if mnemonique == 'call':
+        return frozenset(), frozenset({'eax', 'ecx', 'edx', DRAPEAUX})
+    if mnemonique in ('add', 'sub', 'xor'):
+        return frozenset(), frozenset({DRAPEAUX})
+    return frozenset(), frozenset()
+
+
+class Masques:
+    """
+    Effets des instructions sous forme de masques d'entiers, un bit par
+    emplacement suivi (registre, mot de pile, drapeaux)
+
+    Les bits sont numérotés pour une analyse (voir vivacite) : les masques
+    restent de la taille des emplacements de la fonction analysée.
+
+    Attributs:
+        bits (dict): Emplacement -> bit
+        effets (dict): Instruction -> (lus, ecrits, supprimable)
+    """
+
+    def __init__(self):
+        self.bits = {}
+        self.effets = {}
+
+    def bit(self, emplacement):
+        """Bit représentant un emplacement"""
+        valeur = self.bits.get(emplacement)
+        if valeur is None:
+            valeur = self.bits[emplacement] = 1 << len(self.bits)
+        return valeur
+
+    def masque(self, emplacements):
+        """Masque d'un ensemble d'emplacements"""
+        resultat = 0
+        for emplacement in emplacements:
+            resultat |= self.bit(emplacement)
+        return resultat
+
+    def instruction(self, instr):
+        """
+        Effets d'une instruction sous forme de masques
+
+        Returns:
+            tuple: (lus, ecrits, supprimable) ; supprimable est vrai si
+                   l'instruction n'a d'autre effet que d'écrire des
+                   emplacements suivis
+        """
+        resultat = self.effets.get(instr)
+        if resultat is None:
+            lus, ecrits = effets(instr)
+            resultat = self.effets[instr] = (self.masque(lus), self.masque(ecrits),
+                                             instr[0] in SANS_EFFET and bool(ecrits))
+        return resultat
+
+
+def vivacite(instrs, exterieurs=()):
+    """
+    Emplacements vivants après chaque instruction et instructions mortes
+
+    Une instruction supprimable dont aucun résultat n'est vivant est morte :
+    ses lectures ne rendent rien vivant, ce qui propage la suppression aux
+    instructions qui ne servaient qu'à elle dans le même bloc.
+
+    Args:
+        instrs (list): Instructions assembleur (tuples)
+        exterieurs (iterable): Emplacements vivants à la sortie des
+            instructions (après la dernière, ou au saut vers une étiquette
+            qui n'en fait pas partie)
+
+    Returns:
+        tuple: (apres, morts, masques) ; apres[i] est le masque des
+               emplacements lus plus loin sur un chemin après l'instruction
+               i (bits de masques, propres à cet appel), morts l'ensemble
+               des indices des instructions mortes
+    """
+    n = len(instrs)
+    labels = {instr[1]: i for i, instr in enumerate(instrs) if instr[0] == 'label'}
+
+    # Blocs de base : [début, fin[ et successeurs
+    debuts = sorted({0} | set(labels.values())
+                    | {i + 1 for i, instr in enumerate(instrs) if instr[0] == 'jmp' or instr[0] in SAUTS_CONDITIONNELS})
+    debuts = [d for d in debuts if d < n]
+    bloc_de = {}
+    blocs = []
+    for k, debut in enumerate(debuts):
+        fin = debuts[k + 1] if k + 1 < len(debuts) else n
+        bloc_de[debut] = k
+        blocs.append((debut, fin))
+    masques = Masques()
+    masque_exterieurs = masques.masque(exterieurs)
+    succ = []
+    sorties = []  # emplacements vivants à la sortie des instructions, par bloc
+    for k, (debut, fin) in enumerate(blocs):
+        dernier = instrs[fin - 1]
+        suivants = []
+        sortie_exterieure = 0
+        if dernier[0] != 'jmp':
+            if k + 1 < len(blocs):
+                suivants.append(k + 1)
+            else:
+                sortie_exterieure = masque_exterieurs
+        if dernier[0] == 'jmp' or dernier[0] in SAUTS_CONDITIONNELS:
+            if dernier[1] in labels:
+                suivants.append(bloc_de[labels[dernier[1]]])
+            else:
+                sortie_exterieure = masque_exterieurs
+        succ.append(suivants)
+        sorties.append(sortie_exterieure)
+    pred = [[] for _ in blocs]
+    for k, suivants in enumerate(succ):
+        for s in suivants:
+            pred[s].append(k)
+
+    # Point fixe sur les sorties des blocs, puis détail par instruction
+    effets_instrs = [masques.instruction(instr) for instr in instrs]
+    apres = [0] * n
+    morts = set()
+
+    def transfert(k, vivants, detail):
+        debut, fin = blocs[k]
+        for i in range(fin - 1, debut - 1, -1):
+            lus, ecrits, supprimable = effets_instrs[i]
+            if detail:
+                apres[i] = vivants
+            if supprimable and not vivants & ecrits:
+                if detail:
+                    morts.add(i)
+            else:
+                vivants = (vivants & ~ecrits) | lus
+        return vivants
+
+    def sortie(k):
+        vivants = sorties[k]
+        for s in succ[k]:
+            vivants |= entrees[s]
+        return vivants
+
+    entrees = [0] * len(blocs)
+    a_traiter = deque(reversed(range(len(blocs))))
+    en_attente = set(a_traiter)
+    while a_traiter:
+        k = a_traiter.popleft()
+        en_attente.discard(k)
+        vivants = transfert(k, sortie(k), False)
+        if vivants != entrees[k]:
+            entrees[k] = vivants
+            for p in pred[k]:
+                if p not in en_attente:
+                    en_attente.add(p)
+                    a_traiter.append(p)
+    for k in range(len(blocs)):
+        transfert(k, sortie(k), True)
+    return apres, morts, masques
+
+
+def _locales(instrs):
+    """Règles locales ; retourne la nouvelle liste d'instructions"""
+    resultat = []
+    i = 0
+    n = len(instrs)
+    while i < n:
+        instr = instrs[i]
+        mnemonique = instr[0]
+
+        # mov X, X
+        if mnemonique == 'mov' and instr[1] == instr[2]:
+            i += 1
+            continue
+
+        # setCC al / movzx eax, al / mov X, eax / cmp X, 0 / je L -> ... / jNCC L
+        if (mnemonique in SAUT_INVERSE and i + 4 < n and instrs[i + 1] == ('movzx', 'eax', 'al')
+                and instrs[i + 2][0] == 'mov' and instrs[i + 2][2] == 'eax'
+                and instrs[i + 3] == ('cmp', instrs[i + 2][1], '0') and instrs[i + 4][0] == 'je'):
+            resultat.extend(instrs[i:i + 3])
+            resultat.append((SAUT_INVERSE[mnemonique], instrs[i + 4][1]))
+            i += 5
+            continue
+
+        # Saut vers l'étiquette qui suit
+        if mnemonique == 'label':
+            while resultat and resultat[-1][1:] == instr[1:] \
+                    and (resultat[-1][0] == 'jmp' or resultat[-1][0] in SAUTS_CONDITIONNELS):
+                resultat.pop()
+
+        resultat.append(instr)
+        i += 1
+    return resultat
+
+
+def _vivantes(instrs, exterieurs):
+    """Règles fondées sur la vivacité ; retourne la nouvelle liste d'instructions"""
+    vivants, morts, masques = vivacite(instrs, exterieurs)
+    resultat = []
+    i = 0
+    n = len(instrs)
+    while i < n:
+        instr = instrs[i]
+
+        # Instruction sans effet de bord dont le résultat est mort
+        if i in morts:
+            i += 1
+            continue
+
+        # mov R, S puis cmp R, B / mov X, R / push R, avec R mort ensuite
+        if instr[0] == 'mov' and instr[1] in REGISTRES and i + 1 < n and i + 1 not in morts \
+                and not vivants[i + 1] & masques.bit(instr[1]):
+            suivant = instrs[i + 1]
+            registre, source = instr[1], instr[2]
+            remplace = None
+            if suivant[0] == 'cmp' and suivant[1] == registre and suivant[2] != registre \
+                    and not (est_memoire(source) and est_memoire(suivant[2])) and not est_immediat(source):
+                remplace = ('cmp', source, suivant[2])
+            elif suivant[0] == 'mov' and suivant[2] == registre and suivant[1] != registre \
+                    and not (est_memoire(source) and est_memoire(suivant[1])):
+                remplace = ('mov', suivant[1], source)
+            elif suivant == ('push', registre):
+                remplace = ('push', source)
+            if remplace is not None:
+                resultat.append(remplace)
+                i += 2
+                continue
+
+        resultat.append(instr)
+        i += 1
+    return resultat
+
+
+def optimiser_asm(instrs, exterieurs=()):
+    """
+    Applique les règles locales, puis celles fondées sur la vivacité, puis
+    de nouveau les règles locales (pour les sauts que la suppression des
+    instructions mortes place juste avant leur étiquette)
+
+    La vivacité tient compte des instructions mortes (une lecture par une
+    instruction morte ne rend pas vivant) : une seule analyse suffit.
+
+    Args:
+        instrs (list): Instructions assembleur (tuples)
+        exterieurs (iterable): Emplacements vivants à la sortie des
+            instructions (voir vivacite) ; aucun pour un programme entier
+
+    Returns:
+        list: Instructions optimisées
+    """
+    return _locales(_vivantes(_locales(instrs), exterieurs))
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+Pool des chaînes constantes de l'assembleur (section .data)
+
+Chaque texte distinct reçoit un label, retrouvé en O(1) par l'identifiant
+du texte dans la table chaines.CHAINES. À l'écriture de la section .data,
+un texte qui est la fin d'un autre n'est pas stocké à part : son label
+est placé à l'intérieur du texte le plus long (fusion des suffixes), comme
+le font les éditeurs de liens pour les chaînes C.
+
+Un pool propre à une unité de compilation numérote ses labels (str_0,
+str_1, ...). Un pool partagé par un lot de compilation nomme chaque label
+d'après le contenu du texte : deux unités compilées séparément (dans deux
+processus, ou à partir du cache) désignent un même proverbe par le même
+label, déclaré extern dans leur .asm et défini une seule fois dans le
+fichier de données commun (voir assembleur_donnees).
+"""
+
+import hashlib
+
+from chaines import CHAINES
+
+
+class PoolChaines:
+    """
+    Labels des chaînes constantes
+
+    Attributs:
+        partage (bool): Labels nommés d'après le contenu (pool d'un lot)
+        labels (dict): Identifiant du texte dans CHAINES -> label
+    """
+
+    def __init__(self, partage=False):
+        self.partage = partage
+        self.labels = {}
+
+    def __len__(self):
+        return len(self.labels)
+
+    def label(self, texte):
+        """Retourne le label d'un texte (ajouté au pool si besoin)"""
+        return self.label_identifiant(CHAINES.identifiant(texte))
+
+    def label_identifiant(self, ident):
+        """Retourne le label du texte d'identifiant ident dans CHAINES"""
+        label = self.labels.get(ident)
+        if label is None:
+            label = self.labels[ident] = self._nouveau_label(CHAINES.chaine(ident))
+        return label
+
+    def _nouveau_label(self, texte):
+        if self.partage:
+            return "str_" + hashlib.blake2b(texte.encode('utf-8'), digest_size=8).hexdigest()
+        return f"str_{len(self.labels)}"
+
+    def textes(self):
+        """Couples (label, texte) dans l'ordre d'ajout"""
+        return [(label, CHAINES.chaine(ident)) for ident, label in self.labels.items()]
+
+    def donnees(self):
+        """
+        Lignes db de la section .data, suffixes fusionnés
+
+        Yields:
+            str: Lignes d'assembleur
+        """
+        textes = self.textes()
+        # Textes triés à l'envers : un suffixe précède immédiatement, dans
+        # cet ordre, l'un des textes dont il est la fin
+        ordre = sorted(range(len(textes)), key=lambda k: textes[k][1][::-1])
+        hote = list(range(len(textes)))
+        for position in range(len(ordre) - 2, -1, -1):
+            k, suivant = ordre[position], ordre[position + 1]
+            if textes[suivant][1].endswith(textes[k][1]):
+                hote[k] = hote[suivant]
+
+        # Suffixes logés dans chaque texte hôte, du plus long au plus court
+        suffixes = {}
+        for k, h in enumerate(hote):
+            if h != k:
+                suffixes.setdefault(h, []).append(k)
+
+        for h, (label, texte) in enumerate(textes):
+            if hote[h] != h:
+                continue
+            # Le texte hôte est découpé au début de chaque suffixe
+            debut = 0
+            for k in sorted(suffixes.get(h, ()), key=lambda k: -len(textes[k][1])):
+                coupure = len(texte) - len(textes[k][1])
+                yield f'{label}: db "{texte[debut:coupure]}"'
+                label, debut = textes[k][0], coupure
+            yield f'{label}: db "{texte[debut:]}", 0'
+
+
+def assembleur_donnees(pool):
+    """
+    Fichier de données commun d'un lot compilé avec un pool partagé
+
+    Returns:
+        str: Assembleur NASM (labels globaux, section .data)
+    """
+    lignes = ["; Chaînes constantes partagées, générées automatiquement par le compilateur"]
+    if len(pool):
+        lignes.append("global " + ", ".join(label for label, _ in pool.textes()))
+    lignes.append("\nsection .data")
+    lignes.extend(pool.donnees())
+    return "\n".join(lignes)
@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+"""
+Tables de règles sémantiques (thèmes attendus pour chaque condition)
+
+Les règles sont lues depuis un fichier JSON (ou TOML) et compilées une seule
+fois en structures de recherche (IndexThemes). Le fichier est surveillé par
+sa date de modification : une table modifiée est rechargée puis substituée
+d'un seul coup à l'ancienne. Un analyseur garde la table avec laquelle il a
+été créé, les analyses en cours ne sont donc jamais affectées.
+
+Format du fichier (voir regles_semantiques.json) :
+    {"variables": {
+        "humeur": {"type": "texte", "valeurs": {"triste": ["CONSEIL", ...]}},
+        "age": {"type": "tranches", "tranches": [
+            {"min": 0, "max": 18, "themes": ["JEUNESSE", ...]},
+            {"min": 61, "max": null, "themes": [...]}]}}}
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from bisect import bisect_left, bisect_right
+
+# Fichier des règles livré avec le compilateur
+REGLES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "regles_semantiques.json")
+
+# Aucun thème attendu (partagé, pour ne pas allouer à chaque recherche)
+AUCUN_THEME = frozenset()
+
+# ==================== INDEX DES THEMES ====================
+
+
+def _union(ensembles):
+    """Union de frozensets, sans copie quand il n'y en a qu'un"""
+    if not ensembles:
+        return AUCUN_THEME
+    if len(ensembles) == 1:
+        return ensembles[0]
+    return frozenset().union(*ensembles)
+
+
+class IndexThemes:
+    """
+    Index précalculé des thèmes attendus, construit une seule fois par table
+
+    - variables à valeurs textuelles : valeur -> frozenset des thèmes
+    - variables à tranches numériques [min, max] : bornes triées, recherche
+      par dichotomie (bisect) d'une valeur exacte ou d'un seuil "> valeur"
+
+    Toutes les recherches sont en O(log n) et renvoient des frozensets
+    construits à l'avance (aucune allocation par appel).
+
+    Attributs:
+        themes_attendus (dict): Règles de correspondance condition/proverbe
+        version (str): Empreinte de la table (None si construite en mémoire)
+        chaines (dict): variable -> (dict valeur -> thèmes, tous les thèmes)
+        tranches (dict): variable -> structure de recherche des tranches
+    """
+
+    def __init__(self, themes_attendus, version=None):
+        self.themes_attendus = themes_attendus
+        self.version = version
+        self.chaines = {}
+        self.tranches = {}
+
+        for var, regles in themes_attendus.items():
+            tous = frozenset(theme for themes in regles.values() for theme in themes)
+            if regles and all(isinstance(cle, tuple) for cle in regles):
+                self.tranches[var] = self._indexer_tranches(regles, tous)
+            else:
+                par_valeur = {val: frozenset(themes) for val, themes in regles.items()}
+                self.chaines[var] = (par_valeur, tous)
+
+    @staticmethod
+    def _indexer_tranches(regles, tous):
+        """
+        Construit la structure de recherche des tranches [min, max] d'une variable
+
+        Les bornes découpent l'axe en segments élémentaires (chaque borne, puis
+        chaque intervalle ouvert entre deux bornes consécutives) auxquels on
+        associe, par balayage, l'union des thèmes des tranches qui les
+        couvrent. Les suffixes (tranches dont le max dépasse un seuil) servent
+        aux conditions "> seuil".
+        """
+        tranches = [(min_val, max_val, frozenset(themes)) for (min_val, max_val), themes in regles.items()]
+        debuts, fins = {}, {}
+        for i, (min_val, max_val, _) in enumerate(tranches):
+            debuts.setdefault(min_val, []).append(i)
+            fins.setdefault(max_val, []).append(i)
+        bornes = sorted(debuts.keys() | fins.keys())
+
+        # Balayage des bornes : tranches actives sur chaque segment
+        actives = {}
+        points, ouverts = [], [AUCUN_THEME]
+        for borne in bornes:
+            for i in debuts.get(borne, ()):
+                actives[i] = tranches[i][2]
+            points.append(_union(list(actives.values())))
+            for i in fins.get(borne, ()):
+                del actives[i]
+            ouverts.append(_union(list(actives.values())))
+
+        # Unions des thèmes des tranches par_fin[i:] (max >= fins_triees[i])
+        par_fin = sorted(tranches, key=lambda tranche: tranche[1])
+        fins_triees = [max_val for _, max_val, _ in par_fin]
+        suffixes = [AUCUN_THEME]
+        for _, _, themes in reversed(par_fin):
+            if not themes <= suffixes[-1]:
+                suffixes.append(suffixes[-1] | themes)
+            else:
+                suffixes.append(suffixes[-1])
+        suffixes.reverse()
+        return bornes, points, ouverts, fins_triees, suffixes, tous
+
+    def themes(self, var, val=None, op=None):
+        """
+        Retourne les thèmes attendus pour une variable et valeur donnée
+
+        Args:
+            var (str): Nom de la variable conditionnelle
+            val (str/int/float): Valeur de la variable (optionnel)
+            op (str): Opérateur de la condition ('==' ou '>', optionnel)
+
+        Returns:
+            frozenset: Thèmes de proverbes attendus
+        """
+        # Pour les variables string
+        regle = self.chaines.get(var)
+        if regle is not None:
+            par_valeur, tous = regle
+            if val and isinstance(val, str) and val in par_valeur:
+                return par_valeur[val]
+            # Si pas de valeur spécifique, prendre tous les thèmes possibles
+            return tous
+
+        # Pour les variables numériques
+        regle = self.tranches.get(var)
+        if regle is not None:
+            bornes, points, ouverts, fins, suffixes, tous = regle
+            if not isinstance(val, (int, float)) or isinstance(val, bool):
+                return tous
+            if op == '>':
+                # Tranches dont le max dépasse strictement le seuil
+                return suffixes[bisect_right(fins, val)]
+            i = bisect_left(bornes, val)
+            if i < len(bornes) and bornes[i] == val:
+                return points[i]
+            return ouverts[i]
+
+        return AUCUN_THEME
+
+# ==================== CHARGEMENT ====================
+
+
+def compiler_regles(document, version=None):
+    """
+    Compile un document de règles (JSON/TOML décodé) en IndexThemes
+
+    Raises:
+        ValueError: Si le document ne respecte pas le format attendu
+    """
+    variables = document.get('variables') if isinstance(document, dict) else None
+    if not isinstance(variables, dict):
+        raise ValueError("Règles: clé 'variables' manquante ou invalide")
+
+    themes_attendus = {}
+    for var, regle in variables.items():
+        type_regle = regle.get('type') if isinstance(regle, dict) else None
+        if type_regle == 'texte':
+            themes_attendus[var] = {str(val): list(themes) for val, themes in regle['valeurs'].items()}
+        elif type_regle == 'tranches':
+            tranches = {}
+            for tranche in regle['tranches']:
+                max_val = tranche.get('max')
+                cle = (tranche['min'], float('inf') if max_val is None else max_val)
+                if cle[0] > cle[1]:
+                    raise ValueError(f"Règles: tranche vide pour '{var}': {cle}")
+                tranches[cle] = list(tranche['themes'])
+            themes_attendus[var] = tranches
+        else:
+            raise ValueError(f"Règles: type inconnu pour '{var}': {type_regle!r}")
+    return IndexThemes(themes_attendus, version)
+
+
+def charger_regles(chemin=REGLES_FILE):
+    """
+    Lit et compile un fichier de règles (.json, ou .toml)
+
+    Returns:
+        IndexThemes: Table compilée, versionnée par l'empreinte du fichier
+
+    Raises:
+        OSError: Si le fichier ne peut pas être lu
+        ValueError: Si son contenu est invalide
+    """
+    with open(chemin, 'rb') as f:
+        contenu = f.read()
+    version = hashlib.sha256(contenu).hexdigest()[:16]
+    try:
+        if chemin.endswith('.toml'):
+            import tomllib
+            document = tomllib.loads(contenu.decode('utf-8'))
+        else:
+            document = json.loads(contenu)
+        return compiler_regles(document, version)
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"Règles invalides dans {chemin}: {e}") from e
+
+
+class ReglesSurveillees:
+    """
+    Table de règles rechargée quand son fichier change
+
+    La date de modification est vérifiée au plus une fois par intervalle. La
+    nouvelle table est compilée à part puis substituée par une simple
+    affectation : les analyseurs déjà créés gardent l'ancienne. Un fichier
+    invalide est signalé dans `erreur` et l'ancienne table reste en service.
+
+    Attributs:
+        chemin (str): Fichier de règles surveillé
+        intervalle (float): Délai minimal entre deux vérifications (secondes)
+        index (IndexThemes): Table en service
+        erreur (str): Dernière erreur de rechargement (None si aucune)
+    """
+
+    def __init__(self, chemin=REGLES_FILE, intervalle=1.0):
+        self.chemin = chemin
+        self.intervalle = intervalle
+        self.index = None
+        self.erreur = None
+        self._signature = None
+        self._prochaine_verification = 0.0
+        self._verrou = threading.Lock()
+
+    def actuelles(self):
+        """Retourne la table en service (rechargée si le fichier a changé)"""
+        maintenant = time.monotonic()
+        if self.index is None or maintenant >= self._prochaine_verification:
+            self.verifier(maintenant)
+        return self.index
+
+    def verifier(self, maintenant=None):
+        """Recharge la table si la date ou la taille du fichier a changé"""
+        with self._verrou:
+            self._prochaine_verification = (maintenant or time.monotonic()) + self.intervalle
+            try:
+                etat = os.stat(self.chemin)
+                signature = (etat.st_mtime_ns, etat.st_size)
+                if signature == self._signature:
+                    return
+                index = charger_regles(self.chemin)
+            except (OSError, ValueError) as e:
+                if self.index is None:
+                    raise
+                self.erreur = str(e)
+                return
+            self.index, self._signature, self.erreur = index, signature, None
+
+
+# Règles par défaut, partagées par tous les analyseurs du processus
+REGLES = ReglesSurveillees()
@@ -0,0 +1,38 @@
+
+# tables_conseil.py
+# This file is automatically generated. Do not edit.
+# pylint: disable=W,C,R
+_tabversion = '3.10'
+
+_lr_method = 'LALR'
+
+_lr_signature = 'AFFICHER DPOINTS EGAL ET NOM NOMBRE PROVERBE SI SINON STRING SUPERIEURconseil : condition\n              | conseil conditioncondition : SI NOM EGAL STRING DPOINTS actions\n                | SI NOM SUPERIEUR NOMBRE DPOINTS actions\n                | SINON SI NOM SUPERIEUR NOMBRE DPOINTS actionsactions : AFFICHER PROVERBE\n            | actions ET PROVERBEcondition : error'
+    
+_lr_action_items = {'SI':([0,1,2,4,5,6,18,20,23,24,25,],[3,3,-1,8,-8,-2,-3,-4,-6,-5,-7,]),'SINON':([0,1,2,5,6,18,20,23,24,25,],[4,4,-1,-8,-2,-3,-4,-6,-5,-7,]),'error':([0,1,2,5,6,18,20,23,24,25,],[5,5,-1,-8,-2,-3,-4,-6,-5,-7,]),'$end':([1,2,5,6,18,20,23,24,25,],[0,-1,-8,-2,-3,-4,-6,-5,-7,]),'NOM':([3,8,],[7,11,]),'EGAL':([7,],[9,]),'SUPERIEUR':([7,11,],[10,14,]),'STRING':([9,],[12,]),'NOMBRE':([10,14,],[13,17,]),'DPOINTS':([12,13,17,],[15,16,21,]),'AFFICHER':([15,16,21,],[19,19,19,]),'ET':([18,20,23,24,25,],[22,22,-6,22,-7,]),'PROVERBE':([19,22,],[23,25,]),}
+
+_lr_action = {}
+for _k, _v in _lr_action_items.items():
+   for _x,_y in zip(_v[0],_v[1]):
+      if not _x in _lr_action:  _lr_action[_x] = {}
+      _lr_action[_x][_k] = _y
+del _lr_action_items
+
+_lr_goto_items = {'conseil':([0,],[1,]),'condition':([0,1,],[2,6,]),'actions':([15,16,21,],[18,20,24,]),}
+
+_lr_goto = {}
+for _k, _v in _lr_goto_items.items():
+   for _x, _y in zip(_v[0], _v[1]):
+       if not _x in _lr_goto: _lr_goto[_x] = {}
+       _lr_goto[_x][_k] = _y
+del _lr_goto_items
+_lr_productions = [
+  ("S' -> conseil","S'",1,None,None,None),
+  ('conseil -> condition','conseil',1,'p_conseil','analyseur.py',114),
+  ('conseil -> conseil condition','conseil',2,'p_conseil','analyseur.py',115),
+  ('condition -> SI NOM EGAL STRING DPOINTS actions','condition',6,'p_condition','analyseur.py',132),
+  ('condition -> SI NOM SUPERIEUR NOMBRE DPOINTS actions','condition',6,'p_condition','analyseur.py',133),
+  ('condition -> SINON SI NOM SUPERIEUR NOMBRE DPOINTS actions','condition',7,'p_condition','analyseur.py',134),
+  ('actions -> AFFICHER PROVERBE','actions',2,'p_actions','analyseur.py',149),
+  ('actions -> actions ET PROVERBE','actions',3,'p_actions','analyseur.py',150),
+  ('condition -> error','condition',1,'p_condition_erreur','analyseur.py',167),
+]
@@ -0,0 +1,329 @@
+# -*- coding: utf-8 -*-
+"""
+Tests de non-régression du compilateur de conseils (pytest)
+
+Comparent les implémentations interchangeables entre elles : lexer PLY et
+lexer à automate, machine virtuelle et évaluation vectorielle, compilation
+en deux passes et en une passe, recherche des tranches de IndexThemes et
+parcours linéaire. Les mesures de performance sont dans benchmarks.
+
+Usage:
+    python -m pytest interface
+"""
+
+import json
+import random
+import sys
+import threading
+
+import pytest
+
+from analyseur import construire_lexer, parse
+from benchmarks import compiler_regles, conseil_profils, generer_conseil, generer_profils
+from catalogue import DEFAULT_PROVERBES, CatalogueBinaire, lire_proverbes, ouvrir_catalogue
+from chaines import CHAINES, TableChaines
+from compilateur import compiler_intermediaire, valider_source
+from index_proverbes import ProverbIndex
+from instructions import Op
+from regles import ReglesSurveillees, charger_regles
+from vm import compiler_programme
+
+
+@pytest.fixture(scope='module')
+def index():
+    return ProverbIndex(DEFAULT_PROVERBES)
+
+# ==================== REGLES SEMANTIQUES ====================
+
+
+def themes_lineaires(regles, var, val, op):
+    """Thèmes attendus par parcours de toutes les tranches (référence de IndexThemes.themes)"""
+    themes = set()
+    for (min_val, max_val), themes_tranche in regles.themes_attendus[var].items():
+        if (max_val > val) if op == '>' else (min_val <= val <= max_val):
+            themes.update(themes_tranche)
+    return themes
+
+
+def verifier_index_themes(regles):
+    """
+    Compare les recherches de tranches de IndexThemes au parcours linéaire
+    sur chaque borne et ses voisines, pour '==' et '>'
+    """
+    for var in regles.tranches:
+        valeurs = set()
+        for min_val, max_val in regles.themes_attendus[var]:
+            for borne in (min_val, max_val):
+                if borne != float('inf'):
+                    valeurs.update((borne - 1, borne, borne + 1))
+        for val in sorted(valeurs):
+            for op in ('==', '>'):
+                assert regles.themes(var, val, op) == themes_lineaires(regles, var, val, op), f"{var} {op} {val}"
+
+
+def test_index_themes_regles_livrees():
+    regles = charger_regles()
+    verifier_index_themes(regles)
+    # Un seuil égal au max d'une tranche ne l'atteint pas
+    for var, val, exclus in (('age', 18, 'JEUNESSE'), ('age', 150, 'AGE'), ('richesse', 100000, 'CHARITE')):
+        assert exclus not in regles.themes(var, val, '>')
+
+
+def test_index_themes_rechargement(tmp_path):
+    themes = sorted(DEFAULT_PROVERBES)
+    variables = {
+        'texte': {'type': 'texte', 'valeurs': {
+            f"valeur_{i}": themes[i % len(themes):i % len(themes) + 3] for i in range(20)}},
+        'nombre': {'type': 'tranches', 'tranches': [
+            {'min': i * 10, 'max': i * 10 + 15, 'themes': themes[i % len(themes):i % len(themes) + 2]}
+            for i in range(20)]},
+    }
+    chemin = tmp_path / 'regles.json'
+    chemin.write_text(json.dumps({'variables': variables}), encoding='utf-8')
+    regles = ReglesSurveillees(str(chemin), intervalle=0)
+    ancienne = regles.actuelles()
+    verifier_index_themes(ancienne)
+
+    # Modification du fichier : nouvelle table, l'ancienne reste intacte
+    variables['texte']['valeurs']['valeur_0'] = ['CONSEIL']
+    chemin.write_text(json.dumps({'variables': variables}), encoding='utf-8')
+    nouvelle = regles.actuelles()
+    assert nouvelle is not ancienne and nouvelle.version != ancienne.version
+    assert nouvelle.themes('texte', 'valeur_0', '==') == {'CONSEIL'}
+    assert ancienne.themes('texte', 'valeur_0', '==') != {'CONSEIL'}
+    verifier_index_themes(nouvelle)
+
+# ==================== CATALOGUE ====================
+
+
+def test_catalogue_binaire_non_inscriptible(tmp_path):
+    """Sans fichier binaire inscriptible, le catalogue est gardé en mémoire"""
+    texte = tmp_path / 'proverbes.txt'
+    texte.write_text("".join(f"{theme}:{val}\n" for theme, val in DEFAULT_PROVERBES.items()), encoding='utf-8')
+    attendus = lire_proverbes(str(texte))
+    proverbes = ouvrir_catalogue(str(texte), str(tmp_path / 'absent' / 'proverbes.bin'))
+    assert proverbes == attendus and not isinstance(proverbes, CatalogueBinaire)
+
+    catalogue = ouvrir_catalogue(str(texte))
+    assert isinstance(catalogue, CatalogueBinaire) and dict(catalogue.items()) == attendus
+    catalogue.close()
+
+# ==================== TABLE DES CHAINES ====================
+
+
+def test_table_chaines_threads():
+    """Des threads qui internent les mêmes chaînes obtiennent des identifiants cohérents"""
+    textes = [f"chaine {k}" for k in range(2000)]
+
+    def interner(table, graine, depart, resultats):
+        ordre = random.Random(graine).sample(textes, len(textes))
+        depart.wait()
+        resultats.append({texte: table.identifiant(texte) for texte in ordre})
+
+    intervalle = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        for essai in range(10):
+            table, depart, resultats = TableChaines(), threading.Barrier(8), []
+            threads = [threading.Thread(target=interner, args=(table, essai * 8 + k, depart, resultats))
+                       for k in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            assert len(table) == len(textes)
+            for ids in resultats:
+                assert ids == resultats[0]
+                assert all(table.chaine(ident) == texte for texte, ident in ids.items())
+    finally:
+        sys.setswitchinterval(intervalle)
+
+# ==================== LEXER ====================
+
+# Fragments du corpus aléatoire du lexer : tokens valides (mots réservés dans
+# toutes les casses, chiffres Unicode, chaînes et proverbes sur plusieurs
+# lignes) et erreurs lexicales
+FRAGMENTS_LEXER = [
+    'si', 'SI', 'Si', 'sinon', 'SINON', 'afficher', 'Afficher', 'et', 'ET', 'age', 'humeur', '_x1', 'éà',
+    'nom2', '12', '007', '٣٤', ' ', '  ', '\t', '\n', '\n\n', '==', '=', '>', '>=', ':', '"triste"', '""',
+    '"a\nb"', '"', 'PROVERBE("abc")', 'PROVERBE( "x y" )', 'PROVERBE(\t"z"\n)', 'PROVERBE("\'q\'")',
+    'PROVERBE("")', 'PROVERBE(', 'PROVERBEx', 'PROVERBE("a\nb")', '(', '\r', '#', 'ü', 'proverbe("a")',
+]
+
+
+def corpus_lexer(nombre, graine=0):
+    """
+    Textes aléatoires pour comparer les lexers : suites de fragments, puis
+    lignes tirées d'un petit ensemble (lignes répétées, voir lexer_dfa)
+    """
+    rng = random.Random(graine)
+    textes = [''.join(rng.choice(FRAGMENTS_LEXER) for _ in range(rng.randrange(30)))
+              for _ in range(nombre // 2)]
+    lignes = [''.join(rng.choice(FRAGMENTS_LEXER) for _ in range(rng.randrange(6))) for _ in range(20)]
+    textes += ['\n'.join(rng.choice(lignes) for _ in range(rng.randrange(12)))
+               for _ in range(nombre - len(textes))]
+    return textes
+
+
+def tokens_lexer(lexer, texte, premiere_ligne=1):
+    """Tokens (type, valeur, ligne, position, fin) d'un texte, terminés par l'erreur lexicale éventuelle"""
+    lexer.lineno = premiere_ligne
+    lexer.input(texte)
+    resultat = []
+    try:
+        for tok in iter(lexer.token, None):
+            resultat.append((tok.type, tok.value, tok.lineno, tok.lexpos, getattr(tok, 'fin', None)))
+    except SyntaxError as e:
+        resultat.append(('erreur', str(e)))
+    return resultat
+
+
+def test_lexer_dfa_tokens():
+    """Le lexer à automate produit les mêmes tokens et erreurs que PLY, et colno est la colonne du token"""
+    ply, dfa = construire_lexer('ply'), construire_lexer('dfa')
+    for k, texte in enumerate(corpus_lexer(4000)):
+        premiere_ligne = 1 + k % 3
+        assert tokens_lexer(dfa, texte, premiere_ligne) == tokens_lexer(ply, texte, premiere_ligne), repr(texte)
+        dfa.lineno = premiere_ligne
+        dfa.input(texte)
+        try:
+            for tok in iter(dfa.token, None):
+                assert tok.colno == tok.lexpos - texte.rfind('\n', 0, tok.lexpos), f"{tok} dans {texte!r}"
+        except SyntaxError:
+            pass
+
+
+def test_lexer_dfa_diagnostics(index):
+    """Avec reprise sur erreur, les deux lexers donnent les mêmes diagnostics"""
+    ply, dfa = construire_lexer('ply'), construire_lexer('dfa')
+    for texte in corpus_lexer(1000, graine=1) + [generer_conseil(20)]:
+        attendus = [d.vers_dict() for d in valider_source(texte, index, lexer=ply).tries()]
+        obtenus = [d.vers_dict() for d in valider_source(texte, index, lexer=dfa).tries()]
+        assert obtenus == attendus, repr(texte)
+
+# ==================== REPRISE SUR ERREUR ====================
+
+# Lignes erronées injectées (erreur syntaxique, puis lexicale)
+LIGNES_ERRONEES = ('si humeur == :', 'sinon si age > 50 #:')
+
+
+def test_reprise_signale_chaque_ligne_erronee(index):
+    lignes = generer_conseil(500).splitlines()
+    erronees = {k * 100 + 2 * (k % 2): LIGNES_ERRONEES[k % 2] for k in range(20)}
+    texte = "\n".join(erronees.get(k, ligne) for k, ligne in enumerate(lignes))
+    signalees = {diagnostic.ligne - 1 for diagnostic in valider_source(texte, index).erreurs()}
+    assert signalees == set(erronees)
+
+# ==================== COMPILATION EN UNE PASSE ====================
+
+
+@pytest.mark.parametrize('source', [generer_conseil(500), conseil_profils()], ids=['conseil', 'profils'])
+def test_une_passe_meme_code(index, source):
+    diagnostics, deux_passes = compiler_intermediaire(source, index, arbre=True)
+    assert not diagnostics['erreurs']
+    diagnostics, une_passe = compiler_intermediaire(source, index, arbre=False)
+    assert not diagnostics['erreurs']
+    assert (une_passe.code, une_passe.chaines) == (deux_passes.code, deux_passes.chaines)
+
+def test_generateur_reutilise_apres_vidage(index):
+    """Un générateur réutilisé après CHAINES.vider() n'émet pas d'identifiants périmés"""
+    def textes_stockes(generateur):
+        return [CHAINES.chaine(instr.arg2) for instr in generateur.code if instr.op is Op.STOCKE]
+
+    # Les deux compilations partent d'une table vide : mêmes identifiants
+    # pour les thèmes et les textes, décalés pour les proverbes vérifiés
+    source = conseil_profils()
+    CHAINES.vider()
+    diagnostics, generateur = compiler_intermediaire(source, index)
+    assert not diagnostics['erreurs']
+    attendus = textes_stockes(generateur)
+    CHAINES.vider()
+    ast = parse(source, index)
+    CHAINES.identifiant("décale les identifiants suivants")
+    generateur.generate(ast)
+    assert textes_stockes(generateur) == attendus
+
+# ==================== MACHINE VIRTUELLE ET EVALUATION VECTORIELLE ====================
+
+
+def textes_vm(programme, profils):
+    """Proverbes affichés par la machine virtuelle pour chaque profil"""
+    return [[programme.proverbes[numero] for numero in resultat] for resultat in programme.executer_lot(profils)]
+
+
+def textes_vectoriels(evaluateur, colonnes):
+    """Proverbes retenus par l'évaluation vectorielle pour chaque profil"""
+    selection = evaluateur.evaluer(colonnes)
+    return [[selection.proverbes[numero] for numero in liste] for liste in selection.listes()]
+
+
+def test_vm_compare_par_valeur(index):
+    np = pytest.importorskip('numpy')
+    diagnostics, generateur = compiler_intermediaire(
+        f'si age > 18:\n    afficher PROVERBE("{DEFAULT_PROVERBES["TRAVAIL"]}")\n', index)
+    assert not diagnostics['erreurs']
+    programme = compiler_programme(generateur.code)
+    for age in (30, 18.5, 30.0, np.int64(30), np.float64(18.5), np.float32(18.5)):
+        assert programme.executer({'age': age}) == [0], repr(age)
+    # Seuil non dépassé, chaîne, booléen ou variable absente : condition fausse
+    for age in (18, 18.0, np.int64(18), "30", True, None):
+        assert programme.executer({'age': age}) == [], repr(age)
+
+    # Chaînes NumPy comparées comme des chaînes
+    diagnostics, generateur = compiler_intermediaire(
+        f'si humeur == "triste":\n    afficher PROVERBE("{DEFAULT_PROVERBES["CONSEIL"]}")\n', index)
+    programme = compiler_programme(generateur.code)
+    assert programme.executer({'humeur': np.str_("triste")}) == [0]
+    assert programme.executer({'humeur': np.array(["joyeux"])[0]}) == []
+
+
+def test_vectoriel_comme_vm():
+    np = pytest.importorskip('numpy')
+    from evaluation_vectorielle import Colonne, EvaluateurVectoriel
+
+    ast, code = compiler_regles(conseil_profils())
+    evaluateur = EvaluateurVectoriel(ast)
+    programme = compiler_programme(code)
+
+    nombre = 5000
+    rng = np.random.default_rng(0)
+    colonnes = {
+        'age': rng.integers(0, 100, nombre),
+        'humeur': rng.choice(np.array(["triste", "joyeux", "calme"]), nombre),
+        'besoin': rng.choice(np.array(["conseil", "repos"]), nombre),
+    }
+    profils = [{nom: valeurs[k].item() for nom, valeurs in colonnes.items()} for k in range(nombre)]
+    encodees = {nom: Colonne.depuis_valeurs(valeurs) for nom, valeurs in colonnes.items()}
+    assert textes_vectoriels(evaluateur, encodees) == textes_vm(programme, profils)
+
+    # Âges fractionnaires et infinis (NaN pour un âge manquant), en tableau,
+    # en liste de flottants et en liste de scalaires NumPy ; la machine
+    # virtuelle reçoit les scalaires NumPy (âges et humeurs) tels quels
+    ages = colonnes['age'] + rng.choice(np.array([0.0, 0.25, 0.5, 0.75]), nombre)
+    ages[rng.random(nombre) < 0.1] = np.nan
+    ages[rng.random(nombre) < 0.01] = np.inf
+    for profil, age, humeur in zip(profils, ages, colonnes['humeur']):
+        profil['age'] = None if np.isnan(age) else age
+        profil['humeur'] = humeur
+    attendus = textes_vm(programme, profils)
+    flottantes = dict(colonnes, age=ages)
+    for forme in (flottantes, {nom: valeurs.tolist() for nom, valeurs in flottantes.items()},
+                  {nom: list(valeurs) for nom, valeurs in flottantes.items()}):
+        assert textes_vectoriels(evaluateur, forme) == attendus
+
+    # Âges entiers NumPy (int64 et int32) dans les profils et les colonnes
+    for type_entier in (np.int64, np.int32):
+        ages = colonnes['age'].astype(type_entier)
+        for profil, age in zip(profils, ages):
+            profil['age'] = age
+        attendus = textes_vm(programme, profils)
+        assert textes_vectoriels(evaluateur, dict(colonnes, age=ages)) == attendus
+        assert textes_vectoriels(evaluateur, dict(colonnes, age=list(ages))) == attendus
+
+
+def test_vm_profils_aleatoires():
+    """La machine virtuelle exécute un profil seul comme dans un lot"""
+    _, code = compiler_regles(conseil_profils())
+    programme = compiler_programme(code)
+    profils = generer_profils(2000)
+    assert [programme.executer(profil) for profil in profils] == programme.executer_lot(profils)
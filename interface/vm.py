@@ -0,0 +1,343 @@
+# -*- coding: utf-8 -*-
+"""
+Machine virtuelle : exécution d'un conseil compilé sur des profils
+
+Le code intermédiaire (voir instructions) est traduit en un bytecode
+compact : un tableau d'entiers où chaque instruction occupe INSTRUCTION
+mots (code, a, b, c). Les opérandes sont des indices dans les registres de
+l'exécution, rangés ainsi :
+
+    [variables du conseil] [constantes] [temporaires]
+
+Les variables sont chargées depuis le profil (dict nom -> valeur) avant
+chaque exécution ; une variable absente vaut None. Deux nombres réels
+(int, float, entiers et flottants NumPy, mais pas bool) se comparent par
+leur valeur, de même que deux chaînes (str et ses sous-classes, comme les
+chaînes NumPy) ; toute autre comparaison entre deux valeurs de types
+différents (chaîne et nombre, variable absente) est fausse. Un saut vers
+une étiquette absente du code termine le programme.
+
+    code            a           b           c
+    SI_NON_xx       gauche      droite      cible   saut si non (gauche xx droite)
+    xx (EGAL, ...)  gauche      droite      dest    dest = gauche xx droite
+    SI_FAUX         condition   -           cible
+    SAUT            -           -           cible
+    COPIE           source      -           dest
+    STOCKE          proverbe    -           dest    dest = numéro du proverbe
+    SYSTEME         tampon      -           -       affiche le proverbe du tampon
+    AFFICHER        proverbe    -           -       stocke_chaine + appel_systeme
+
+Une comparaison dont le résultat ne sert qu'au ifFalse qui la suit devient
+un SI_NON_xx, et stocke_chaine suivi de l'affichage du même tampon un
+AFFICHER. allouer_tampon ne produit rien (le tampon est le proverbe).
+
+Le résultat d'une exécution est la liste des numéros des proverbes
+affichés, dans l'ordre : des indices dans Programme.proverbes.
+"""
+
+from array import array
+from numbers import Real
+
+from chaines import CHAINES
+from instructions import COMPARAISONS, Etiquette, Op, Temp, Var
+
+# Mots par instruction du bytecode
+INSTRUCTION = 4
+
+# -------- Codes d'opération --------
+
+# Comparaison suivie du saut qui la teste (saut si la comparaison est fausse)
+SI_NON_EGAL = 0
+SI_NON_DIFFERENT = 1
+SI_NON_SUPERIEUR = 2
+SI_NON_INFERIEUR = 3
+SI_NON_SUP_EGAL = 4
+SI_NON_INF_EGAL = 5
+# Comparaison dont le résultat est gardé dans un registre
+EGAL = 6
+DIFFERENT = 7
+SUPERIEUR = 8
+INFERIEUR = 9
+SUP_EGAL = 10
+INF_EGAL = 11
+AFFICHER = 12
+SAUT = 13
+SI_FAUX = 14
+COPIE = 15
+STOCKE = 16
+SYSTEME = 17
+
+COMPARAISON = {
+    Op.EGAL: EGAL,
+    Op.DIFFERENT: DIFFERENT,
+    Op.SUPERIEUR: SUPERIEUR,
+    Op.INFERIEUR: INFERIEUR,
+    Op.SUP_EGAL: SUP_EGAL,
+    Op.INF_EGAL: INF_EGAL,
+}
+
+# Comparaison -> comparaison fusionnée avec le saut
+SI_NON = {EGAL: SI_NON_EGAL, DIFFERENT: SI_NON_DIFFERENT, SUPERIEUR: SI_NON_SUPERIEUR,
+          INFERIEUR: SI_NON_INFERIEUR, SUP_EGAL: SI_NON_SUP_EGAL, INF_EGAL: SI_NON_INF_EGAL}
+
+NOMS = {
+    SI_NON_EGAL: 'si_non ==', SI_NON_DIFFERENT: 'si_non !=', SI_NON_SUPERIEUR: 'si_non >',
+    SI_NON_INFERIEUR: 'si_non <', SI_NON_SUP_EGAL: 'si_non >=', SI_NON_INF_EGAL: 'si_non <=',
+    EGAL: '==', DIFFERENT: '!=', SUPERIEUR: '>', INFERIEUR: '<', SUP_EGAL: '>=', INF_EGAL: '<=',
+    AFFICHER: 'afficher', SAUT: 'saut', SI_FAUX: 'si_faux', COPIE: 'copie',
+    STOCKE: 'stocke', SYSTEME: 'systeme',
+}
+
+
+class Programme:
+    """
+    Bytecode d'un conseil et tables de ses opérandes
+
+    Attributs:
+        code (array): Bytecode (INSTRUCTION entiers par instruction, les
+            cibles de saut sont des positions dans ce tableau)
+        variables (tuple): Noms des variables (registres 0, 1, ...)
+        constantes (tuple): Constantes (registres suivant les variables)
+        nb_temporaires (int): Registres des temporaires (après les constantes)
+        proverbes (tuple): Textes des proverbes affichés, par numéro
+    """
+
+    __slots__ = ('code', 'variables', 'constantes', 'nb_temporaires', 'proverbes', '_instructions', '_reste')
+
+    def __init__(self, code, variables, constantes, nb_temporaires, proverbes):
+        self.code = code
+        self.variables = variables
+        self.constantes = constantes
+        self.nb_temporaires = nb_temporaires
+        self.proverbes = proverbes
+        # Forme exécutée : une liste (lecture plus rapide que dans un array)
+        self._instructions = code.tolist()
+        self._reste = list(constantes) + [None] * nb_temporaires
+
+    def __len__(self):
+        return len(self.code) // INSTRUCTION
+
+    def __reduce__(self):
+        return Programme, (self.code, self.variables, self.constantes, self.nb_temporaires, self.proverbes)
+
+    def executer(self, profil):
+        """
+        Exécute le conseil sur un profil
+
+        Args:
+            profil (dict): Nom de variable -> valeur (nombre ou str)
+
+        Returns:
+            list: Numéros des proverbes affichés (indices dans self.proverbes)
+        """
+        registres = list(map(profil.get, self.variables))
+        registres += self._reste
+        return _executer(self._instructions, registres)
+
+    def executer_lot(self, profils):
+        """
+        Exécute le conseil sur chaque profil d'un lot
+
+        Returns:
+            list: Pour chaque profil, numéros des proverbes affichés
+        """
+        instructions, variables, reste = self._instructions, self.variables, self._reste
+        resultats = []
+        for profil in profils:
+            registres = list(map(profil.get, variables))
+            registres += reste
+            resultats.append(_executer(instructions, registres))
+        return resultats
+
+    def lister(self):
+        """Forme lisible du bytecode (une ligne par instruction)"""
+        lignes = []
+        code = self.code
+        for pc in range(0, len(code), INSTRUCTION):
+            op, a, b, c = code[pc:pc + INSTRUCTION]
+            lignes.append(f"{pc:5d}  {NOMS[op]:<12} {a} {b} {c}")
+        return lignes
+
+
+# ==================== TRADUCTION ====================
+
+
+def compiler_programme(code):
+    """
+    Traduit le code intermédiaire en bytecode
+
+    Args:
+        code (list): Instructions (Quadruplet)
+
+    Returns:
+        Programme: Bytecode et tables
+    """
+    variables = {}    # Var -> indice parmi les variables
+    constantes = {}   # (type, valeur) -> indice parmi les constantes
+    temporaires = {}  # Temp -> indice parmi les temporaires
+    proverbes = {}    # identifiant dans CHAINES -> numéro du proverbe
+
+    # Lectures de chaque temporaire (toutes, puis par les affichages)
+    lectures = {}
+    affichages = {}
+    for instr in code:
+        for temp in (instr.arg1, instr.arg2):
+            if type(temp) is Temp:
+                lectures[temp] = lectures.get(temp, 0) + 1
+        if instr.op is Op.SYSTEME and type(instr.arg2) is Temp:
+            affichages[instr.arg2] = affichages.get(instr.arg2, 0) + 1
+
+    # Instructions (tuples) : les registres sont d'abord des couples
+    # (table, indice), les cibles des étiquettes
+    sortie = []
+    positions = {}  # étiquette -> position dans le bytecode
+
+    def registre(valeur):
+        if type(valeur) is Var:
+            return 0, variables.setdefault(valeur, len(variables))
+        if type(valeur) is Temp:
+            return 2, temporaires.setdefault(valeur, len(temporaires))
+        return 1, constantes.setdefault((type(valeur), valeur), len(constantes))
+
+    def proverbe(ident):
+        return proverbes.setdefault(ident, len(proverbes))
+
+    i = 0
+    n = len(code)
+    while i < n:
+        instr = code[i]
+        op = instr.op
+        suivant = code[i + 1] if i + 1 < n else None
+        if op in COMPARAISONS:
+            a, b = registre(instr.arg1), registre(instr.arg2)
+            if (suivant is not None and suivant.op is Op.SI_FAUX and suivant.arg1 == instr.resultat
+                    and lectures.get(instr.resultat) == 1):
+                sortie.append((SI_NON[COMPARAISON[op]], a, b, suivant.resultat))
+                i += 2
+                continue
+            sortie.append((COMPARAISON[op], a, b, registre(instr.resultat)))
+        elif op is Op.COPIE:
+            sortie.append((COPIE, registre(instr.arg1), 0, registre(instr.resultat)))
+        elif op is Op.STOCKE:
+            if (suivant is not None and suivant.op is Op.SYSTEME and suivant.arg1 == 'afficher'
+                    and suivant.arg2 == instr.arg1 and affichages.get(instr.arg1) == 1):
+                sortie.append((AFFICHER, proverbe(instr.arg2), 0, 0))
+                i += 2
+                continue
+            sortie.append((STOCKE, proverbe(instr.arg2), 0, registre(instr.arg1)))
+        elif op is Op.SYSTEME:
+            if instr.arg1 == 'afficher':
+                sortie.append((SYSTEME, registre(instr.arg2), 0, 0))
+        elif op is Op.SI_FAUX:
+            sortie.append((SI_FAUX, registre(instr.arg1), 0, instr.resultat))
+        elif op is Op.SAUT:
+            sortie.append((SAUT, 0, 0, instr.resultat))
+        elif op is Op.LABEL:
+            positions[instr.arg1] = len(sortie) * INSTRUCTION
+        i += 1
+
+    # Registres définitifs (variables, constantes, temporaires) et positions
+    # des cibles ; un saut hors du code termine le programme
+    bases = (0, len(variables), len(variables) + len(constantes))
+    fin = len(sortie) * INSTRUCTION
+    bytecode = array('i')
+    for instruction in sortie:
+        for mot in instruction:
+            if type(mot) is tuple:
+                mot = bases[mot[0]] + mot[1]
+            elif type(mot) is Etiquette:
+                mot = positions.get(mot, fin)
+            bytecode.append(mot)
+
+    return Programme(
+        bytecode,
+        tuple(var.nom for var in variables),
+        tuple(valeur for _, valeur in constantes),
+        len(temporaires),
+        tuple(CHAINES.chaine(ident) for ident in proverbes),
+    )
+
+
+# ==================== EXÉCUTION ====================
+
+
+def _comparables(a, b):
+    """Vrai si a et b, de types différents, se comparent par valeur (deux chaînes ou deux nombres réels)"""
+    if isinstance(a, str):
+        return isinstance(b, str)
+    return (isinstance(a, Real) and isinstance(b, Real)
+            and type(a) is not bool and type(b) is not bool)
+
+
+def _executer(code, r):
+    """
+    Boucle d'interprétation
+
+    Args:
+        code (list): Bytecode (voir Programme)
+        r (list): Registres, variables déjà chargées
+
+    Returns:
+        list: Numéros des proverbes affichés
+    """
+    affiches = []
+    pc = 0
+    fin = len(code)
+    while pc < fin:
+        op = code[pc]
+        if op < EGAL:
+            a = r[code[pc + 1]]
+            b = r[code[pc + 2]]
+            if type(a) is not type(b) and not _comparables(a, b):
+                vrai = False
+            elif op == SI_NON_EGAL:
+                vrai = a == b
+            elif op == SI_NON_SUPERIEUR:
+                vrai = a > b
+            elif op == SI_NON_DIFFERENT:
+                vrai = a != b
+            elif op == SI_NON_INFERIEUR:
+                vrai = a < b
+            elif op == SI_NON_SUP_EGAL:
+                vrai = a >= b
+            else:
+                vrai = a <= b
+            pc = pc + INSTRUCTION if vrai else code[pc + 3]
+        elif op == AFFICHER:
+            affiches.append(code[pc + 1])
+            pc += INSTRUCTION
+        elif op == SAUT:
+            pc = code[pc + 3]
+        elif op < AFFICHER:
+            a = r[code[pc + 1]]
+            b = r[code[pc + 2]]
+            if type(a) is not type(b) and not _comparables(a, b):
+                vrai = False
+            elif op == EGAL:
+                vrai = a == b
+            elif op == SUPERIEUR:
+                vrai = a > b
+            elif op == DIFFERENT:
+                vrai = a != b
+            elif op == INFERIEUR:
+                vrai = a < b
+            elif op == SUP_EGAL:
+                vrai = a >= b
+            else:
+                vrai = a <= b
+            r[code[pc + 3]] = int(vrai)
+            pc += INSTRUCTION
+        elif op == SI_FAUX:
+            pc = pc + INSTRUCTION if r[code[pc + 1]] else code[pc + 3]
+        elif op == COPIE:
+            r[code[pc + 3]] = r[code[pc + 1]]
+            pc += INSTRUCTION
+        elif op == STOCKE:
+            r[code[pc + 3]] = code[pc + 1]
+            pc += INSTRUCTION
+        else:  # SYSTEME
+            proverbe = r[code[pc + 1]]
+            if proverbe is not None:
+                affiches.append(proverbe)
+            pc += INSTRUCTION
+    return affiches